@@ -11,7 +11,25 @@ def main():
     ).fetchall()
     tables = [r[0] for r in rows]
     print("TABLES =", tables)
+
+    rows = conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx_%' ORDER BY name"
+    ).fetchall()
+    print("INDEXES =", [r[0] for r in rows])
+    print("USER_VERSION =", conn.execute("PRAGMA user_version").fetchone()[0])
     conn.close()
 
+    # 핫 쿼리 실행계획 자가 점검 (인덱스 세트가 없으면 여기서 생성됨)
+    from timeclock.db import DB
+    db = DB(DB_PATH)
+    offenders = db.check_query_plans()
+    if offenders:
+        print("QUERY PLAN = FULL SCAN 발견")
+        for name, detail in offenders:
+            print(f"  - {name}: {detail}")
+    else:
+        print("QUERY PLAN = OK")
+    db.close()
+
 if __name__ == "__main__":
     main()
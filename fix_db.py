@@ -52,7 +52,7 @@ def run_final_fix():
         from timeclock import sync_manager
 
         # 강제 업로드
-        success = sync_manager.upload_current_db()
+        success = sync_manager.upload_base_db()
 
         if success:
             print("\n🎉 [대성공] 구글 드라이브 파일까지 완벽하게 교체했습니다.")
@@ -22,6 +22,8 @@ def main():
 
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # exe 에서 명세서 일괄 발급용 프로세스 풀이 앱을 다시 띄우지 않도록
     main()
 
 
@@ -0,0 +1,146 @@
+# tests/baseline_salary.py
+# -*- coding: utf-8 -*-
+"""
+급여 계산 기준값: 최적화 이전 SalaryCalculator.calculate_period 를 그대로 옮긴 것 (정시 단위 야간 루프 포함)
+새 계산 경로(Python/numpy/주별 집계)는 결과 dict 가 이것과 완전히 같아야 한다.
+"""
+from datetime import datetime, timedelta
+
+from timeclock import salary
+
+
+def night_hours_loop(start_dt, end_dt):
+    """22:00 ~ 06:00 사이의 겹치는 시간 계산"""
+    night = 0.0
+    curr = start_dt
+    while curr < end_dt:
+        h = curr.hour
+        is_night = (h >= 22 or h < 6)
+        nxt = curr.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        if nxt <= curr:
+            nxt += timedelta(hours=1)
+
+        chunk = min(end_dt, nxt)
+        if is_night:
+            night += (chunk - curr).total_seconds() / 3600.0
+        curr = chunk
+    return night
+
+
+def calculate_period(wage, work_logs):
+    if not work_logs:
+        return None
+
+    # 1. 날짜순 정렬
+    logs = sorted(work_logs, key=lambda x: x['approved_start'] or x['start_time'])
+
+    total_work_seconds = 0
+    total_break_seconds = 0
+    total_actual_seconds = 0
+
+    # 급여 합계
+    total_base_pay = 0
+    total_overtime_pay = 0
+    total_night_pay = 0
+    total_holiday_pay = 0
+    total_ju_hyu_pay = 0
+
+    sum_overtime_hours = 0.0
+    sum_night_hours = 0.0
+    sum_holiday_hours = 0.0
+
+    weeks = {}
+
+    # ★ 가산 배율 설정 (5인 미만이면 0.0, 아니면 0.5)
+    premium_rate = 0.0 if salary.IS_UNDER_5_EMPLOYEES else 0.5
+
+    for log in logs:
+        s_str = log.get('approved_start') or log.get('start_time')
+        e_str = log.get('approved_end') or log.get('end_time')
+        if not s_str or not e_str: continue
+
+        start_dt = datetime.strptime(s_str, "%Y-%m-%d %H:%M:%S")
+        end_dt = datetime.strptime(e_str, "%Y-%m-%d %H:%M:%S")
+
+        duration = (end_dt - start_dt).total_seconds()
+        hours = duration / 3600.0
+
+        # 휴게 공제 (4시간/8시간 룰)
+        break_sec = 0
+        if hours >= 8:
+            break_sec = 3600
+        elif hours >= 4:
+            break_sec = 1800
+
+        actual_sec = max(0, duration - break_sec)
+        actual_hours = actual_sec / 3600.0
+
+        total_work_seconds += duration
+        total_break_seconds += break_sec
+        total_actual_seconds += actual_sec
+
+        # 1) 기본급 (시급 x 실 근로시간)
+        total_base_pay += actual_hours * wage
+
+        # 2) 연장 수당 (일 8시간 초과)
+        if actual_hours > 8:
+            over = actual_hours - 8
+            total_overtime_pay += over * wage * premium_rate
+            sum_overtime_hours += over  # 시간 누적
+
+        # 3) 야간 수당
+        n_hours = night_hours_loop(start_dt, end_dt)
+        total_night_pay += n_hours * wage * premium_rate
+        sum_night_hours += n_hours  # 시간 누적
+
+        # 주별 집계
+        yr, wk, _ = start_dt.isocalendar()
+        week_key = (yr, wk)
+        if week_key not in weeks:
+            weeks[week_key] = {"hours": 0, "days": set()}
+        weeks[week_key]["hours"] += actual_hours
+        weeks[week_key]["days"].add(start_dt.date())
+
+    # 주단위 계산 (주휴, 주 연장)
+    ju_hyu_details = []
+
+    for wk_key, data in weeks.items():
+        w_hours = data["hours"]
+        w_days = len(data["days"])
+
+        # 주 연장 (주 40시간 초과)
+        if w_hours > 40:
+            w_over = w_hours - 40
+            total_overtime_pay += w_over * wage * premium_rate
+            sum_overtime_hours += w_over  # 시간 누적
+
+        # 주휴수당 (5인 미만도 지급 의무 있음)
+        if w_hours >= 15:
+            day_avg = w_hours / w_days if w_days > 0 else 0
+            if day_avg > 8: day_avg = 8
+            jh_amt = int(day_avg * wage)
+            total_ju_hyu_pay += jh_amt
+            ju_hyu_details.append(jh_amt)
+
+    grand_total = total_base_pay + total_overtime_pay + total_night_pay + total_holiday_pay + total_ju_hyu_pay
+
+    return {
+        "start_date": logs[0].get('work_date'),
+        "end_date": logs[-1].get('work_date'),
+        "total_hours": round(total_work_seconds / 3600.0, 1),  # 총 체류
+        "actual_hours": round(total_actual_seconds / 3600.0, 1),  # 실 근로
+        "break_hours": round(total_break_seconds / 3600.0, 1),  # 휴게 시간
+
+        # 금액
+        "base_pay": int(total_base_pay),
+        "overtime_pay": int(total_overtime_pay),
+        "night_pay": int(total_night_pay),
+        "holiday_pay": int(total_holiday_pay),
+        "ju_hyu_pay": int(total_ju_hyu_pay),
+        "grand_total": int(grand_total),
+        "ju_hyu_details": ju_hyu_details,
+
+        "overtime_hours": round(sum_overtime_hours, 1),
+        "night_hours": round(sum_night_hours, 1),
+        "holiday_hours": round(sum_holiday_hours, 1)
+    }
@@ -0,0 +1,53 @@
+# tests/conftest.py
+# -*- coding: utf-8 -*-
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def isolated_app_data(tmp_path, monkeypatch):
+    """
+    테스트가 저장소의 app_data/ 와 구글 드라이브를 건드리지 않도록
+    데이터/백업 경로를 tmp_path 아래로 돌리고, 전역 동기화 스케줄러 알림은 기록만 한다.
+    반환: 받은 알림 [(db, tag), ...]
+    """
+    from timeclock import backup_manager, delta_sync, settings, sync_manager, sync_scheduler, utils
+
+    data_dir = tmp_path / "app_data"
+    paths = {
+        "DATA_DIR": data_dir,
+        "EXPORT_DIR": data_dir / "exports",
+        "BACKUP_DIR": data_dir / "backups",
+        "ARCHIVE_DIR": data_dir / "archives",
+    }
+    for name, path in paths.items():
+        monkeypatch.setattr(settings, name, path)
+        monkeypatch.setattr(utils, name, path)
+    monkeypatch.setattr(backup_manager, "BACKUP_DIR", paths["BACKUP_DIR"])
+    monkeypatch.setattr(backup_manager, "BACKUP_ID_FILE", data_dir / "backup_id.txt")
+    monkeypatch.setattr(delta_sync, "DEVICE_ID_FILE", data_dir / "device_id.txt")
+    monkeypatch.setattr(sync_manager, "DB_PATH", data_dir / "timeclock.db")  # 동기화 마커/임시 파일 위치
+    monkeypatch.setattr(sync_manager, "DISPUTE_FEED_DIR", data_dir / "dispute_feeds")
+
+    notified = []
+    monkeypatch.setattr(sync_scheduler, "notify", lambda db, tag="change": notified.append((db, tag)))
+    monkeypatch.setattr(sync_scheduler, "flush", lambda timeout=10.0: True)
+    return notified
+
+
+@pytest.fixture
+def db(tmp_path):
+    """빈 임시 DB (마이그레이션 + 기본 계정까지 적용된 상태)"""
+    from timeclock.db import DB
+
+    d = DB(tmp_path / "timeclock.db")
+    try:
+        yield d
+    finally:
+        d.close()
@@ -0,0 +1,75 @@
+# tests/test_counts.py
+# -*- coding: utf-8 -*-
+"""배지 건수 캐시(CountersCache): 쓰기 메서드마다 get_pending_counts() 가 실제 COUNT 와 같은지"""
+from timeclock import sync_manager
+from timeclock.settings import DEFAULT_OWNER_USER
+
+
+def _raw_counts(db):
+    one = lambda sql: db.conn.execute(sql).fetchone()[0]
+    return {
+        "work": one("SELECT COUNT(*) FROM work_logs WHERE status = 'PENDING'"),
+        "dispute": one("SELECT COUNT(*) FROM disputes WHERE status IN ('PENDING', 'IN_REVIEW')"),
+        "signup": one("SELECT COUNT(*) FROM signup_requests WHERE status = 'PENDING'"),
+    }
+
+
+def test_pending_counts_follow_writes(db, monkeypatch):
+    monkeypatch.setattr(sync_manager, "append_dispute_feed", lambda *a, **k: True)
+    owner_id = db.get_user_by_username(DEFAULT_OWNER_USER)["id"]
+    seen = []
+
+    def check():
+        # 캐시가 채워진 상태에서 다음 쓰기가 일어나도록 매 단계 읽어 둔다
+        counts = db.get_pending_counts()
+        assert counts == _raw_counts(db)
+        seen.append(counts)
+
+    check()
+    workers = []
+    for i in range(3):
+        db.create_user(f"count_worker{i}", "worker", "pw1234")
+        workers.append(db.get_user_by_username(f"count_worker{i}")["id"])
+
+    # 출근 (PENDING)
+    for uid in workers:
+        db.start_work(uid)
+        check()
+    logs = {r["user_id"]: r["id"] for r in db.conn.execute("SELECT id, user_id FROM work_logs")}
+
+    # 출근 승인 (WORKING) → 퇴근 (다시 PENDING) → 최종 승인 (APPROVED)
+    w0 = workers[0]
+    db.approve_work_log(logs[w0], owner_id, "2025-03-03 09:00:00", None, "")
+    check()
+    db.end_work(w0)
+    check()
+    db.approve_work_log(logs[w0], owner_id, "2025-03-03 09:00:00", "2025-03-03 18:00:00", "")
+    check()
+
+    # 반려
+    db.reject_work_log(logs[workers[1]])
+    check()
+
+    # 이의제기 생성 → 검토중 → 완료
+    dispute_id = db.create_dispute(logs[workers[2]], workers[2], "시간", "퇴근 누락")
+    check()
+    db.resolve_dispute(dispute_id, owner_id, "IN_REVIEW", "")
+    check()
+    db.resolve_dispute(dispute_id, owner_id, "RESOLVED", "확인했습니다")
+    check()
+
+    # 가입 신청 → 승인 / 반려
+    for name in ("new_a", "new_b"):
+        db.create_signup_request(name, "x", name, "01000000000", "2000-01-01")
+        check()
+    reqs = {r["username"]: r["id"] for r in db.conn.execute("SELECT id, username FROM signup_requests")}
+    db.approve_signup_request(reqs["new_a"], owner_id, "")
+    check()
+    db.reject_signup_request(reqs["new_b"], owner_id)
+    check()
+
+    # 건수가 실제로 오르내렸는지 (항상 0 이면 의미 없는 검사)
+    assert max(c["work"] for c in seen) == 3
+    assert max(c["dispute"] for c in seen) == 1
+    assert max(c["signup"] for c in seen) == 2
+    assert seen[-1] == {"work": 1, "dispute": 0, "signup": 0}
@@ -0,0 +1,201 @@
+# tests/test_delta_sync.py
+# -*- coding: utf-8 -*-
+"""행 단위 델타 동기화 / 기준본 반영"""
+import json
+import sqlite3
+from pathlib import Path
+
+from timeclock import backup_manager
+
+
+def _pending_changes(db):
+    return db.conn.execute("SELECT COUNT(*) FROM sync_changes").fetchone()[0]
+
+
+def test_apply_snapshot_keeps_unpushed_local_changes(db, tmp_path):
+    db.run_write(lambda conn: (conn.execute("DELETE FROM sync_changes"), conn.commit()))  # 전송 완료 상태에서 출발
+
+    # 다른 PC(base)가 만든 새 기준본: 자기 변경 로그(bob)가 딸려 있다
+    base = _copy_db(db, tmp_path / "base.db")
+    try:
+        base.create_user("bob", "worker", "pw")
+        snap = backup_manager.snapshot_db(tmp_path / "snap.db", src_path=base.db_path)
+    finally:
+        base.close()
+    assert sqlite3.connect(snap).execute("SELECT COUNT(*) FROM sync_changes").fetchone()[0] > 0
+
+    # 이 PC의 아직 올리지 않은 변경 (새 행 + 기존 행 수정)
+    db.create_user("alice", "worker", "pw")
+    worker = db.get_user_by_username("worker")
+    db.update_user_wage(worker["id"], 12345)
+
+    db.apply_snapshot(snap)
+
+    assert db.get_user_by_username("bob") is not None
+    assert db.get_user_by_username("alice") is not None
+    assert db.get_user_by_username("worker")["hourly_wage"] == 12345
+
+    # 변경 로그에는 이 PC의 변경만 남아 다음 업로드 때 전송된다
+    pending = {r[0] for r in db.conn.execute(
+        "SELECT u.username FROM sync_changes c JOIN users u ON u.uid = c.row_uid WHERE c.tbl = 'users'"
+    ).fetchall()}
+    assert pending == {"alice", "worker"}
+    assert not db._local_changes_path().exists()
+
+
+def test_interrupted_snapshot_replays_on_open(db, tmp_path):
+    # 기준본 복사 후 다시 쓰기 전에 종료된 경우: 다음 실행 때 보관 파일로 복구
+    from timeclock import delta_sync
+    from timeclock.db import DB
+
+    db.create_user("alice", "worker", "pw")
+    delta, _max_seq = delta_sync.export_delta(db.conn)
+    path = db.db_path
+    db.run_write(lambda conn: (conn.execute("DELETE FROM users WHERE username = 'alice'"),
+                               conn.execute("DELETE FROM sync_changes"), conn.commit()))
+    db._local_changes_path().write_text(json.dumps(delta), encoding="utf-8")
+    db.close()
+
+    reopened = DB(path)
+    try:
+        assert reopened.get_user_by_username("alice") is not None
+        assert _pending_changes(reopened) > 0
+        assert not reopened._local_changes_path().exists()
+    finally:
+        reopened.close()
+
+
+def _copy_db(src, path):
+    from timeclock.db import DB
+
+    backup_manager.snapshot_db(path, src_path=src.db_path)
+    return DB(path)
+
+
+def test_concurrent_inserts_do_not_overwrite(db, tmp_path):
+    from timeclock import delta_sync
+
+    db.run_write(lambda conn: (conn.execute("DELETE FROM sync_changes"), conn.commit()))
+    a = _copy_db(db, tmp_path / "a.db")
+    b = _copy_db(db, tmp_path / "b.db")
+    try:
+        # 두 PC가 각자 같은 로컬 id 로 직원/근무기록을 만든다
+        a.create_user("alice", "worker", "pw")
+        b.create_user("bob", "worker", "pw")
+        alice = a.get_user_by_username("alice")["id"]
+        bob = b.get_user_by_username("bob")["id"]
+        assert alice == bob
+        a.start_work(alice)
+        b.start_work(bob)
+
+        # 같은 행을 양쪽에서 수정
+        a.update_user_wage(1, 11000)
+        b.update_user_wage(1, 12000)
+
+        delta, max_seq = delta_sync.export_delta(a.conn)
+        a.run_write(lambda conn: delta_sync.ack_delta(conn, "delta_a", max_seq))
+        assert a.conn.execute("SELECT COUNT(*) FROM sync_changes").fetchone()[0] == 0
+
+        assert b.run_write(lambda conn: delta_sync.apply_delta(conn, "delta_a", delta))
+
+        owners = dict(b.conn.execute(
+            "SELECT u.username, w.user_id FROM work_logs w JOIN users u ON u.id = w.user_id"
+        ).fetchall())
+        assert set(owners) == {"alice", "bob"}
+        assert b.get_user_by_username("bob")["id"] == bob
+
+        # 미전송 로컬 수정은 덮어쓰지 않고 충돌로 기록
+        assert b.get_user_by_id(1)["hourly_wage"] == 12000
+        reasons = [r[0] for r in b.conn.execute("SELECT reason FROM sync_conflicts WHERE tbl='users'")]
+        assert reasons == ["both_changed"]
+
+        # 받은 델타는 다시 올라가지 않는다
+        echo, _ = delta_sync.export_delta(b.conn)
+        assert a.get_user_by_username("alice")["uid"] not in {c["uid"] for c in echo["changes"]}
+    finally:
+        a.close()
+        b.close()
+
+
+class _FakeFile(dict):
+    """PyDrive GoogleDriveFile 대역 (내용은 _FakeDrive.files 에 보관)"""
+
+    def __init__(self, drive, meta):
+        super().__init__(meta)
+        self._drive = drive
+
+    def SetContentFile(self, path):
+        self._content = Path(path).read_bytes()
+
+    def Upload(self):
+        self.setdefault("id", self["title"])
+        self._drive.files[self["title"]] = (self, self._content)
+
+    def GetContentString(self):
+        return self._drive.files[self["title"]][1].decode("utf-8")
+
+    def Trash(self):
+        self._drive.files.pop(self["title"], None)
+
+
+class _FakeDrive:
+    def __init__(self):
+        self.files = {}
+
+    def CreateFile(self, meta):
+        return _FakeFile(self, meta)
+
+
+def test_push_after_remote_compaction_sends_local_changes(db, tmp_path, monkeypatch):
+    # 다른 PC가 압축해 클라우드 기준본이 바뀐 뒤에도 이 PC의 미전송 변경이 지워지지 않고 올라가야 한다
+    from timeclock import delta_sync, sync_manager
+
+    drive = _FakeDrive()
+    state = {"base_ts": 200}
+    monkeypatch.setattr(sync_manager, "HAS_GOOGLE_DRIVE", True)
+    monkeypatch.setattr(sync_manager, "_get_drive", lambda: drive)
+    monkeypatch.setattr(sync_manager, "_get_folder_id", lambda _drive, _name: "folder")
+    monkeypatch.setattr(
+        sync_manager, "_get_cloud_db_file_and_ts",
+        lambda _drive, _folder: (drive.files["timeclock.db"][0], state["base_ts"]),
+    )
+    monkeypatch.setattr(
+        sync_manager, "_list_cloud_deltas",
+        lambda _drive, _folder: sorted(
+            (f for f, _c in drive.files.values() if f["title"].startswith(delta_sync.DELTA_PREFIX)),
+            key=lambda f: f["title"],
+        ),
+    )
+
+    def download(gfile, dest):
+        Path(dest).write_bytes(drive.files[gfile["title"]][1])
+        return True, dest
+
+    monkeypatch.setattr(sync_manager, "_download_gfile", download)
+
+    db.run_write(lambda conn: (conn.execute("DELETE FROM sync_changes"), conn.commit()))
+    sync_manager._save_last_sync_ts(100)  # 이 PC는 예전 기준본(100)에서 작업 중
+
+    # 다른 PC의 새 기준본 (bob 포함)
+    other = _copy_db(db, tmp_path / "other.db")
+    try:
+        other.create_user("bob", "worker", "pw")
+        snap = backup_manager.snapshot_db(tmp_path / "base.db", src_path=other.db_path)
+    finally:
+        other.close()
+    base = drive.CreateFile({"title": "timeclock.db"})
+    base.SetContentFile(snap)
+    base.Upload()
+
+    db.create_user("alice", "worker", "pw")
+    assert sync_manager.push_local_changes(db)
+
+    assert db.get_user_by_username("bob") is not None
+    assert db.get_user_by_username("alice") is not None
+    assert _pending_changes(db) == 0
+    assert sync_manager._load_last_sync_ts() == 200
+
+    deltas = [f for f in drive.files if f.startswith(delta_sync.DELTA_PREFIX)]
+    assert len(deltas) == 1
+    sent = json.loads(drive.files[deltas[0]][1])
+    assert {c["row"]["username"] for c in sent["changes"] if c["table"] == "users"} == {"alice"}
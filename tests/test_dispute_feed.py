@@ -0,0 +1,101 @@
+# tests/test_dispute_feed.py
+# -*- coding: utf-8 -*-
+"""이의제기 대화 피드 merge: 오래된 상태로 되돌리지 않기 + 읽은 위치 DB 저장"""
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+from timeclock import sync_manager
+from timeclock.db import DB
+from timeclock.settings import DISPUTE_FEED_MAX_INFLIGHT
+
+
+def _make_dispute(db, status="RESOLVED", at="2025-05-02 10:00:00"):
+    db.create_user("feed_worker", "worker", "pw1234")
+    uid = db.get_user_by_username("feed_worker")["id"]
+    db.start_work(uid)
+    log_id = db.conn.execute("SELECT id FROM work_logs WHERE user_id=?", (uid,)).fetchone()["id"]
+    dispute_id = db.create_dispute(log_id, uid, "시간", "출근 시각 정정")
+    t_col, _ = db._dispute_time_by_cols()
+
+    def write(conn):
+        conn.execute(f"UPDATE disputes SET status=?, {t_col}=? WHERE id=?", (status, at, dispute_id))
+        conn.commit()
+
+    db.run_write(write)
+    return dispute_id
+
+
+def _status(db, dispute_id):
+    return db.conn.execute("SELECT status FROM disputes WHERE id=?", (dispute_id,)).fetchone()["status"]
+
+
+def test_stale_status_does_not_roll_back(db):
+    dispute_id = _make_dispute(db)
+
+    old = {"kind": "status", "status": "IN_REVIEW", "at": "2025-05-01 09:00:00"}
+    assert db._merge_dispute_feed(dispute_id, [old]) is False
+    assert _status(db, dispute_id) == "RESOLVED"
+
+    # 시각 없는 상태 레코드도 반영하지 않음
+    assert db._merge_dispute_feed(dispute_id, [{"kind": "status", "status": "PENDING", "at": None}]) is False
+    assert _status(db, dispute_id) == "RESOLVED"
+
+    newer = {"kind": "status", "status": "REJECTED", "at": "2025-05-03 08:00:00"}
+    assert db._merge_dispute_feed(dispute_id, [old, newer]) is True
+    assert _status(db, dispute_id) == "REJECTED"
+
+
+def test_feed_read_position_survives_restart(db, tmp_path, monkeypatch):
+    dispute_id = _make_dispute(db)
+    seen = []
+
+    def fake_fetch(dispute_uid, state=None):
+        seen.append(state)
+        return [], {"feed-file": {"offset": 10, "tail": b"x", "last_id": 3}}
+
+    monkeypatch.setattr(sync_manager, "fetch_dispute_feed", fake_fetch)
+
+    assert db.sync_dispute_thread_from_cloud(dispute_id) is False
+    assert seen[-1] == {}
+
+    db.close()
+    reopened = DB(tmp_path / "timeclock.db")
+    try:
+        reopened.sync_dispute_thread_from_cloud(dispute_id)
+        assert seen[-1] == {"feed-file": {"offset": 10, "tail": b"x", "last_id": 3}}
+    finally:
+        reopened.close()
+
+
+def test_feed_upload_releases_slots_without_qt(db, monkeypatch):
+    dispute_id = _make_dispute(db)
+    worker_id = db.get_user_by_username("feed_worker")["id"]
+    gate = threading.Event()
+    uploaded = []
+
+    def fake_append(dispute_uid, records):
+        gate.wait(5)
+        uploaded.append(records)
+        return True
+
+    monkeypatch.setattr(sync_manager, "append_dispute_feed", fake_append)
+
+    # 업로드가 막혀 있으면 상한까지만 받고 나머지는 건너뜀
+    for i in range(DISPUTE_FEED_MAX_INFLIGHT + 2):
+        db.add_dispute_message(dispute_id, worker_id, "worker", f"메시지 {i}")
+    assert db._feeds.inflight == DISPUTE_FEED_MAX_INFLIGHT
+
+    # QApplication 없이도 완료되면 자리가 돌아온다
+    gate.set()
+    db._feeds.stop(wait=True)
+    assert db._feeds.inflight == 0
+    assert len(uploaded) == DISPUTE_FEED_MAX_INFLIGHT
+
+
+def test_core_does_not_import_ui():
+    """timeclock 데이터 계층은 ui 패키지 없이 import 된다"""
+    code = "import sys, timeclock.db; sys.exit(any(m == 'ui' or m.startswith('ui.') for m in sys.modules))"
+    root = Path(__file__).resolve().parent.parent
+    assert subprocess.run([sys.executable, "-c", code], cwd=str(root)).returncode == 0
@@ -0,0 +1,159 @@
+# tests/test_dispute_latest.py
+# -*- coding: utf-8 -*-
+"""dispute_latest(트리거로 유지)가 예전 MAX(id) 서브쿼리와 같은 목록을 만드는지: 생성 / 상태 변경 / 삭제"""
+import pytest
+
+from timeclock.settings import DEFAULT_OWNER_USER
+
+# 최적화 이전 list_my_disputes / list_disputes SQL (비교용, 그대로 옮김)
+_OLD_MY_DISPUTES_SQL = """
+    SELECT d.*, w.work_date, w.status as work_status
+    FROM disputes d
+    JOIN work_logs w ON w.id = d.work_log_id
+    JOIN (
+        SELECT work_log_id, MAX(id) as max_id FROM disputes WHERE user_id=? GROUP BY work_log_id
+    ) AS latest ON d.id = latest.max_id
+    WHERE d.user_id=? AND date(d.created_at) >= date(?) AND date(d.created_at) <= date(?) AND {status_cond}
+    ORDER BY d.id DESC LIMIT ?
+"""
+
+_OLD_DISPUTES_SQL = """
+    SELECT d.*, u.username as worker_username, w.work_date, w.start_time, w.end_time
+    FROM disputes d
+    JOIN users u ON u.id = d.user_id
+    JOIN work_logs w ON w.id = d.work_log_id
+    JOIN (
+        SELECT work_log_id, MAX(id) as max_id FROM disputes
+        WHERE date(created_at) >= date(?) AND date(created_at) <= date(?) GROUP BY work_log_id
+    ) AS latest ON d.id = latest.max_id
+    WHERE {status_cond}
+    ORDER BY d.id DESC LIMIT ?
+"""
+
+_DAYS = ["2025-04-01", "2025-04-02", "2025-04-03"]
+_RANGES = [("2025-01-01", "2025-12-31")] + [(d, d) for d in _DAYS]
+
+
+def _status_cond(filter_type):
+    return "d.status IN ('RESOLVED','REJECTED')" if filter_type == "CLOSED" else "d.status IN ('PENDING','IN_REVIEW')"
+
+
+def _ids(rows):
+    return [r["id"] for r in rows]
+
+
+def _assert_same_as_old(db, workers):
+    conn = db.conn
+    latest = {tuple(r) for r in conn.execute("SELECT work_log_id, dispute_id FROM dispute_latest")}
+    expected = {tuple(r) for r in conn.execute(
+        "SELECT work_log_id, MAX(id) FROM disputes WHERE work_log_id IS NOT NULL GROUP BY work_log_id"
+    )}
+    assert latest == expected
+
+    for filter_type in ("ACTIVE", "CLOSED"):
+        cond = _status_cond(filter_type)
+        for d1, d2 in _RANGES:
+            old = conn.execute(_OLD_DISPUTES_SQL.format(status_cond=cond), (d1, d2, 1000)).fetchall()
+            assert _ids(db.list_disputes(d1, d2, filter_type)) == _ids(old)
+            for uid in workers:
+                old = conn.execute(_OLD_MY_DISPUTES_SQL.format(status_cond=cond), (uid, uid, d1, d2, 2000)).fetchall()
+                assert _ids(db.list_my_disputes(uid, d1, d2, filter_type)) == _ids(old)
+
+
+@pytest.fixture
+def setup(db):
+    """근로자 2명 x 근무기록 3건 (이의제기는 아직 없음)"""
+    workers, logs = [], []
+    for i in range(2):
+        db.create_user(f"latest_worker{i}", "worker", "pw1234")
+        workers.append(db.get_user_by_username(f"latest_worker{i}")["id"])
+
+    def write(conn):
+        for uid in workers:
+            for day in _DAYS:
+                cur = conn.execute(
+                    "INSERT INTO work_logs (user_id, work_date, start_time, end_time, status, created_at) "
+                    "VALUES (?, ?, ?, ?, 'PENDING', ?)",
+                    (uid, day, f"{day} 09:00:00", f"{day} 18:00:00", f"{day} 18:00:00"),
+                )
+                logs.append((cur.lastrowid, uid, day))
+        conn.commit()
+
+    db.run_write(write)
+    return db, workers, logs
+
+
+def _insert_dispute(db, log, status="PENDING", hour=19):
+    log_id, uid, day = log
+
+    def write(conn):
+        cur = conn.execute(
+            "INSERT INTO disputes (work_log_id, user_id, work_date, dispute_type, comment, created_at, status) "
+            "VALUES (?, ?, ?, '시간', '정정 요청', ?, ?)",
+            (log_id, uid, day, f"{day} {hour:02d}:00:00", status),
+        )
+        conn.commit()
+        return cur.lastrowid
+
+    return db.run_write(write)
+
+
+def _exec(db, sql, params=()):
+    def write(conn):
+        conn.execute(sql, params)
+        conn.commit()
+
+    db.run_write(write)
+
+
+def _delete_disputes(db, where="1=1", params=()):
+    def write(conn):
+        conn.execute(f"DELETE FROM dispute_messages WHERE dispute_id IN (SELECT id FROM disputes WHERE {where})", params)
+        conn.execute(f"DELETE FROM disputes WHERE {where}", params)
+        conn.commit()
+
+    db.run_write(write)
+
+
+def test_insert_status_change_delete_match_old_query(setup):
+    db, workers, logs = setup
+    _assert_same_as_old(db, workers)
+
+    # 생성: 근무기록마다 1건, 일부는 같은 근무기록에 2건째
+    first = {log[0]: _insert_dispute(db, log) for log in logs}
+    _assert_same_as_old(db, workers)
+    second = {log[0]: _insert_dispute(db, log, status="IN_REVIEW", hour=20) for log in logs[::2]}
+    _assert_same_as_old(db, workers)
+
+    # 상태 변경: 최신 건 / 최신이 아닌 건 / DB 메서드(resolve_dispute, 재오픈)
+    owner_id = db.get_user_by_username(DEFAULT_OWNER_USER)["id"]
+    some_log = logs[0]
+    db.resolve_dispute(second[some_log[0]], owner_id, "RESOLVED", "처리 완료")
+    _assert_same_as_old(db, workers)
+    _exec(db, "UPDATE disputes SET status='REJECTED' WHERE id=?", (first[some_log[0]],))
+    _assert_same_as_old(db, workers)
+    db.create_dispute(some_log[0], some_log[1], "시간", "다시 확인 부탁드립니다")
+    _assert_same_as_old(db, workers)
+    for dispute_id in list(first.values())[1::2]:
+        _exec(db, "UPDATE disputes SET status='RESOLVED' WHERE id=?", (dispute_id,))
+    _assert_same_as_old(db, workers)
+
+    # 같은 근로자의 다른 날 근무기록으로 정정 (옛 근무기록은 이전 건으로, 새 근무기록은 옮긴 건으로)
+    # 한 근무기록의 이의제기는 같은 날 생긴다고 본다. (create_dispute 는 기존 건을 재오픈)
+    # 날짜 범위가 한 근무기록의 이의제기들을 가르면 예전 사업주 쿼리는 범위 안의 최신 건을 보여줬으므로 비교하지 않는다.
+    target = logs[1]
+    _exec(db, "UPDATE disputes SET work_log_id=?, work_date=?, created_at=? WHERE id=?",
+          (target[0], target[2], f"{target[2]} 20:00:00", second[logs[2][0]]))
+    _assert_same_as_old(db, workers)
+
+    # 삭제: 최신 건을 지우면 이전 건이 다시 최신, 유일한 건을 지우면 행이 사라짐
+    for dispute_id in second.values():
+        _delete_disputes(db, "id=?", (dispute_id,))
+        _assert_same_as_old(db, workers)
+    _delete_disputes(db, "id=?", (first[logs[1][0]],))
+    _assert_same_as_old(db, workers)
+    assert db.conn.execute("SELECT COUNT(*) FROM dispute_latest").fetchone()[0] > 0
+
+    _delete_disputes(db)
+    _assert_same_as_old(db, workers)
+    assert db.conn.execute("SELECT COUNT(*) FROM dispute_latest").fetchone()[0] == 0
@@ -0,0 +1,58 @@
+# tests/test_payroll.py
+# -*- coding: utf-8 -*-
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+import baseline_salary
+from timeclock import payroll, salary
+
+
+def _insert_logs(db, user_id, rng, n, year=2025, grid=1):
+    """APPROVED 근무기록 n건 (가끔 work_date 가 전날인 새벽 기록 = 주가 어긋나는 기록 포함, grid: 시각 단위 초)"""
+    rows = []
+    day0 = datetime(year, 1, 1)
+    for i in range(n):
+        s = day0 + timedelta(days=i * 365 // n, seconds=rng.randint(0, 86399) // grid * grid)
+        e = s + timedelta(seconds=rng.randint(10 * 60, 15 * 3600) // grid * grid)
+        work_date = s.date()
+        if s.hour < 6 and rng.random() < 0.1:
+            work_date -= timedelta(days=1)
+        approved = rng.random() < 0.9
+        st, et = s.strftime("%Y-%m-%d %H:%M:%S"), e.strftime("%Y-%m-%d %H:%M:%S")
+        rows.append((user_id, work_date.isoformat(), st, et, st if approved else None, et if approved else None))
+
+    def write(conn):
+        conn.executemany(
+            """
+            INSERT INTO work_logs (user_id, work_date, start_time, end_time, approved_start, approved_end,
+                                   status, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, 'APPROVED', '2025-01-01 00:00:00')
+            """,
+            rows,
+        )
+        conn.commit()
+
+    db.run_write(write)
+
+
+@pytest.mark.parametrize("under5", [True, False])
+def test_week_agg_matches_baseline(db, monkeypatch, under5):
+    # 주별 집계 캐시 경로(calculate_user_period)는 최적화 이전 계산(baseline_salary)과 결과 dict 가 같아야 한다.
+    monkeypatch.setattr(salary, "IS_UNDER_5_EMPLOYEES", under5)
+    rng = random.Random(17)
+    user_ids = []
+    for i, grid in enumerate((1, 60, 900)):
+        db.create_user(f"pay{i}", "worker", "pw1234")
+        user_ids.append(db.get_user_by_username(f"pay{i}")["id"])
+        _insert_logs(db, user_ids[-1], rng, rng.randint(150, 400), grid=grid)
+
+    for _ in range(60):
+        uid = rng.choice(user_ids)
+        wage = rng.choice([9860, 10030, 12345, 15000])
+        d1 = date(2025, 1, 1) + timedelta(days=rng.randint(0, 330))
+        d2 = d1 + timedelta(days=rng.randint(0, 120))
+        logs = [dict(r) for r in db.list_approved_work_logs(d1.isoformat(), d2.isoformat(), uid)]
+        expected = baseline_salary.calculate_period(wage, logs)
+        assert payroll.calculate_user_period(db, uid, wage, d1.isoformat(), d2.isoformat()) == expected
@@ -0,0 +1,23 @@
+# tests/test_query_plans.py
+# -*- coding: utf-8 -*-
+"""HOT_QUERIES(= DB 메서드가 실제로 실행하는 SQL)가 전부 인덱스를 타는지 점검"""
+
+
+def test_hot_queries_use_indexes(db):
+    db.assert_query_plans()
+
+
+def test_hot_query_methods_run(db):
+    # HOT_QUERIES 와 같은 SQL 을 쓰는 메서드들이 실제 스키마에서 문제없이 실행되는지
+    uid = db.get_user_by_username("worker")["id"]
+    db.get_today_work_log(uid)
+    db.list_work_logs(uid, "2000-01-01", "2000-12-31")
+    db.list_all_work_logs(uid, "2000-01-01", "2000-12-31", status_filter="APPROVED")
+    db.list_all_work_logs_page(None, "2000-01-01", "2000-12-31", status_filter="PENDING", after=("2000-06-01", 1))
+    db.list_approved_work_logs("2000-01-01", "2000-12-31", uid)
+    db.list_payroll_week_agg("2000-01-01", "2000-12-31", uid)
+    db.get_pending_counts()
+    for ft in ("ACTIVE", "CLOSED"):
+        db.list_disputes("2000-01-01", "2000-12-31", ft)
+        db.list_my_disputes(uid, "2000-01-01", "2000-12-31", ft)
+    db.list_pending_signup_requests()
@@ -0,0 +1,122 @@
+# tests/test_salary.py
+# -*- coding: utf-8 -*-
+"""급여 계산 동등성 검사: 모든 계산 경로가 최적화 이전 알고리즘(baseline_salary)과 같은 결과인지 (벤치마크는 tools/bench_salary.py)"""
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+import baseline_salary
+from timeclock import salary
+from timeclock.salary import SalaryCalculator
+
+
+def _random_shift(rng):
+    base = datetime(2024, 1, 1) + timedelta(days=rng.randint(0, 730))
+    kind = rng.random()
+    if kind < 0.2:
+        # 경계 시각 근처 (21~23시, 05~07시, 자정)
+        start = base.replace(hour=rng.choice([21, 22, 23, 0, 5, 6, 7]), minute=rng.choice([0, 59]),
+                             second=rng.choice([0, 59]))
+    else:
+        start = base + timedelta(seconds=rng.randint(0, 86399))
+
+    if kind < 0.05:
+        length = 0 if rng.random() < 0.5 else -rng.randint(1, 3600)   # 0 / 역전 구간
+    elif kind < 0.9:
+        length = rng.randint(1, 16 * 3600)                            # 일반 근무
+    else:
+        length = rng.randint(16 * 3600, 5 * 86400)                    # 며칠 걸친 기록
+    return start, start + timedelta(seconds=length)
+
+
+def test_night_hours_match_hour_loop():
+    rng = random.Random(20240101)
+    for _ in range(20000):
+        s, e = _random_shift(rng)
+        expected = baseline_salary.night_hours_loop(s, e)
+        got = SalaryCalculator._calc_night_hours(s, e)
+        assert got == expected, (s, e, expected, got)  # 부동소수 끝자리까지
+
+
+def test_night_hours_boundaries():
+    d = datetime(2025, 3, 3)
+    cases = [
+        (d.replace(hour=22), d.replace(hour=23), 1.0),
+        (d.replace(hour=21), d.replace(hour=22), 0.0),
+        (d.replace(hour=6), d.replace(hour=7), 0.0),
+        (d.replace(hour=20), d + timedelta(days=1, hours=7), 8.0),
+        (d.replace(hour=23), d.replace(hour=22), 0.0),
+    ]
+    for s, e, expected in cases:
+        assert SalaryCalculator._calc_night_hours(s, e) == expected
+
+
+def _random_logs(rng, n, year=2025, grid=1):
+    """grid: 시각 단위(초). 1=출퇴근 버튼 그대로, 60=분 단위 수정, 900=15분 단위 확정"""
+    logs = []
+    day0 = datetime(year, 1, 1)
+    for i in range(n):
+        s = day0 + timedelta(days=i * 365 // max(n, 1), seconds=rng.randint(0, 86399) // grid * grid)
+        e = s + timedelta(seconds=rng.randint(10 * 60, 15 * 3600) // grid * grid)
+        approved = rng.random() < 0.9
+        logs.append({
+            "work_date": s.strftime("%Y-%m-%d"),
+            "start_time": s.strftime("%Y-%m-%d %H:%M:%S"),
+            "end_time": e.strftime("%Y-%m-%d %H:%M:%S") if rng.random() < 0.98 else None,
+            "approved_start": s.strftime("%Y-%m-%d %H:%M:%S") if approved else None,
+            "approved_end": e.strftime("%Y-%m-%d %H:%M:%S") if approved else None,
+        })
+    rng.shuffle(logs)
+    return logs
+
+
+@pytest.mark.parametrize("under5", [True, False])
+@pytest.mark.parametrize("grid", [1, 60, 900])
+def test_python_path_matches_baseline(monkeypatch, under5, grid):
+    monkeypatch.setattr(salary, "IS_UNDER_5_EMPLOYEES", under5)
+    rng = random.Random(grid)
+    for _ in range(300):
+        wage = rng.choice([9860, 10030, 12000, 12345, 15000])
+        logs = _random_logs(rng, rng.randint(1, 60), grid=grid)
+        calc = SalaryCalculator(wage)
+        assert calc.calculate_parsed(*calc.parse_logs(logs)) == baseline_salary.calculate_period(wage, logs)
+
+
+@pytest.mark.skipif(not salary.HAS_NUMPY, reason="numpy 미설치")
+@pytest.mark.parametrize("under5", [True, False])
+def test_numpy_kernel_matches_baseline(monkeypatch, under5):
+    monkeypatch.setattr(salary, "IS_UNDER_5_EMPLOYEES", under5)
+    rng = random.Random(7)
+    for _ in range(100):
+        wage = rng.choice([9860, 10030, 12345, 15000])
+        calc = SalaryCalculator(wage)
+        logs = _random_logs(rng, rng.randint(salary.SALARY_NUMPY_MIN_LOGS, 400), grid=rng.choice([1, 60, 900]))
+        spans, d1, d2 = calc._sorted_spans(logs)
+        expected = baseline_salary.calculate_period(wage, logs)
+        assert calc._calculate_spans_np(spans, d1, d2) == expected
+        assert calc.calculate_period(logs) == expected
+
+
+@pytest.mark.parametrize("under5", [True, False])
+@pytest.mark.parametrize("grid", [1, 60, 900])
+def test_week_aggregates_match_baseline(monkeypatch, under5, grid):
+    # 주별 집계 경로는 같은 결과를 내거나, 장담할 수 없으면 ValueError (호출 쪽이 원본 기록으로 다시 계산)
+    monkeypatch.setattr(salary, "IS_UNDER_5_EMPLOYEES", under5)
+    rng = random.Random(100 + grid)
+    fallbacks = 0
+    for _ in range(300):
+        wage = rng.choice([9860, 10030, 12000, 12345, 15000])
+        logs = _random_logs(rng, rng.randint(1, 120), grid=grid)
+        calc = SalaryCalculator(wage)
+        try:
+            got = calc.calculate_from_weeks(SalaryCalculator.aggregate_weeks(logs))
+        except ValueError:
+            fallbacks += 1
+            continue
+        assert got == baseline_salary.calculate_period(wage, logs)
+
+    if grid == 900:
+        assert fallbacks == 0  # 15분 단위 시각 + 정수 시급이면 원래 계산에도 오차가 없어 항상 주 집계로 끝난다
+    else:
+        assert fallbacks < 300
@@ -0,0 +1,88 @@
+# tests/test_sync_scheduler.py
+# -*- coding: utf-8 -*-
+"""동기화 스케줄러: 알림 병합 / 재시도 간격 / flush 결과 / 드라이브 모듈이 없을 때"""
+import threading
+
+import pytest
+
+from timeclock import sync_manager, sync_scheduler
+
+
+@pytest.fixture
+def backups(monkeypatch):
+    tags = []
+    monkeypatch.setattr(sync_scheduler.backup_manager, "run_backup", lambda tag, *a, **k: tags.append(tag) or (True, ""))
+    return tags
+
+
+def test_no_drive_is_permanent_noop(monkeypatch, backups):
+    calls = []
+    monkeypatch.setattr(sync_manager, "HAS_GOOGLE_DRIVE", False)
+    monkeypatch.setattr(sync_manager, "push_local_changes", lambda *a, **k: calls.append(a) or False)
+
+    s = sync_scheduler.SyncScheduler(window_sec=5.0, retry_base_sec=0.01)
+    s.notify(object(), "change")
+    # 업로드하지 못했으므로 flush 결과는 False (재시도도 예약하지 않음)
+    assert s.flush(timeout=5) is False
+
+    assert calls == []
+    assert s._retry_timer == {}
+
+
+def test_notifies_in_one_window_sync_once(monkeypatch, backups):
+    pushes = []
+    monkeypatch.setattr(sync_manager, "HAS_GOOGLE_DRIVE", True)
+    monkeypatch.setattr(sync_manager, "push_local_changes", lambda db: pushes.append(db) or True)
+
+    s = sync_scheduler.SyncScheduler(window_sec=5.0, retry_base_sec=0.01)
+    runs = []
+    orig = s._sync_once
+    monkeypatch.setattr(s, "_sync_once", lambda db, tags: runs.append((db, list(tags))) or orig(db, tags))
+
+    db = object()
+    for i in range(20):
+        s.notify(db, f"change{i}")
+    assert s.flush(timeout=5) is True
+
+    assert len(runs) == 1
+    assert runs[0][0] is db and len(runs[0][1]) == 20
+    assert pushes == [db]
+    assert backups == ["change19_x20"]
+
+    # 올릴 변경이 없는 구간의 flush 는 성공
+    assert s.flush(timeout=5) is True
+    assert len(runs) == 1
+
+
+def test_failed_push_retries_with_backoff(monkeypatch, backups):
+    results = [False, False, False, True]
+    succeeded = threading.Event()
+
+    def push(db):
+        ok = results.pop(0)
+        if ok:
+            succeeded.set()
+        return ok
+
+    monkeypatch.setattr(sync_manager, "HAS_GOOGLE_DRIVE", True)
+    monkeypatch.setattr(sync_manager, "push_local_changes", push)
+
+    s = sync_scheduler.SyncScheduler(window_sec=5.0, retry_base_sec=0.01, retry_max_sec=0.03)
+    delays = []
+    orig = s._schedule_retry
+    monkeypatch.setattr(s, "_schedule_retry", lambda db, delay: delays.append(delay) or orig(db, delay))
+
+    db = object()
+    s.notify(db, "change")
+    assert s.flush(timeout=5) is False
+
+    # 이후 재시도 구간은 짧게
+    s.window_sec = 0.01
+    assert succeeded.wait(5)
+    assert s.flush(timeout=5) is True
+    assert results == []
+    # 두 배씩 늘리되 retry_max_sec 에서 멈춤
+    assert delays == pytest.approx([0.01, 0.02, 0.03])
+    assert db not in s._retry_delay
+    # 재시도만 있는 구간은 백업하지 않는다
+    assert backups == ["change"]
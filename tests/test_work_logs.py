@@ -0,0 +1,103 @@
+# tests/test_work_logs.py
+# -*- coding: utf-8 -*-
+"""근무기록 일괄 승인(approve_work_logs_bulk): 한 트랜잭션 / 실패 시 전부 롤백 / 집계·변경 로그 1회"""
+import sqlite3
+
+import pytest
+
+from timeclock.db import DB
+from timeclock.settings import DEFAULT_OWNER_USER
+
+
+def _pending_logs(db, n=6):
+    """PENDING 근무기록 n건 (2주에 걸쳐 하루 1건), 반환: [(id, start, end), ...]"""
+    db.create_user("bulk_worker", "worker", "pw1234")
+    uid = db.get_user_by_username("bulk_worker")["id"]
+    rows = []
+    for i in range(n):
+        day = f"2025-03-{3 + i * 2:02d}"
+        rows.append((uid, day, f"{day} 09:00:00", f"{day} 18:30:00"))
+
+    def write(conn):
+        conn.executemany(
+            "INSERT INTO work_logs (user_id, work_date, start_time, end_time, status, created_at) "
+            "VALUES (?, ?, ?, ?, 'PENDING', '2025-03-01 00:00:00')",
+            rows,
+        )
+        conn.commit()
+
+    db.run_write(write)
+    return uid, [
+        (r["id"], r["start_time"], r["end_time"])
+        for r in db.conn.execute("SELECT id, start_time, end_time FROM work_logs WHERE user_id=? ORDER BY id", (uid,))
+    ]
+
+
+def _snapshot(db, uid):
+    logs = [tuple(r) for r in db.conn.execute(
+        "SELECT id, status, approved_start, approved_end, owner_comment FROM work_logs WHERE user_id=? ORDER BY id", (uid,)
+    )]
+    agg = [tuple(r) for r in db.conn.execute(
+        "SELECT week_start, work_sec, actual_sec, night_sec, dirty FROM payroll_week_agg WHERE user_id=? ORDER BY week_start",
+        (uid,)
+    )]
+    changes = db.conn.execute("SELECT COUNT(*) FROM sync_changes").fetchone()[0]
+    return logs, agg, changes
+
+
+def test_bulk_approve_one_transaction(db, isolated_app_data, monkeypatch):
+    uid, logs = _pending_logs(db)
+    owner_id = db.get_user_by_username(DEFAULT_OWNER_USER)["id"]
+    _, _, changes_before = _snapshot(db, uid)
+    isolated_app_data.clear()
+
+    rebuilt = []
+    orig = DB._rebuild_week_agg
+    monkeypatch.setattr(DB, "_rebuild_week_agg", lambda self, u, ws, now: rebuilt.append((u, ws)) or orig(self, u, ws, now))
+
+    items = [(log_id, s, e, "일괄") for log_id, s, e in logs]
+    assert db.approve_work_logs_bulk(items, owner_id) == len(logs)
+
+    after, agg, changes_after = _snapshot(db, uid)
+    assert [r[1:] for r in after] == [("APPROVED", s, e, "일괄") for _, s, e in logs]
+
+    # 주별 집계: 근로자×주 마다 1번씩만 다시 계산
+    assert len(rebuilt) == len(set(rebuilt)) == len(agg) == 2
+    assert all(r[-1] == 0 and r[2] > 0 for r in agg)
+
+    # 전부 dirty 로 돌려 처음부터 다시 계산해도 같은 값
+    def mark_dirty(conn):
+        conn.execute("UPDATE payroll_week_agg SET dirty = 1 WHERE user_id=?", (uid,))
+        conn.commit()
+
+    db.run_write(mark_dirty)
+    db.run_write(lambda conn: db.refresh_payroll_week_agg())
+    assert _snapshot(db, uid)[1] == agg
+
+    # 변경 로그: 승인한 행마다 1건, 동기화 알림은 1회
+    assert changes_after - changes_before == len(logs)
+    assert [tag for _, tag in isolated_app_data] == [f"approve_bulk_{len(logs)}"]
+
+
+def test_bulk_approve_rolls_back_everything(db, isolated_app_data):
+    uid, logs = _pending_logs(db)
+    before = _snapshot(db, uid)
+    isolated_app_data.clear()
+
+    # 마지막 행 UPDATE 에서 실패하도록 (쓰기 연결 전용 임시 트리거)
+    bad_id = logs[-1][0]
+
+    def add_trigger(conn):
+        conn.execute(
+            f"CREATE TEMP TRIGGER fail_bulk BEFORE UPDATE ON work_logs WHEN NEW.id = {bad_id} "
+            "BEGIN SELECT RAISE(ABORT, 'boom'); END"
+        )
+
+    db.run_write(add_trigger)
+
+    items = [(log_id, s, e, "일괄") for log_id, s, e in logs]
+    with pytest.raises(sqlite3.IntegrityError, match="boom"):
+        db.approve_work_logs_bulk(items, db.get_user_by_username(DEFAULT_OWNER_USER)["id"])
+
+    assert _snapshot(db, uid) == before
+    assert isolated_app_data == []
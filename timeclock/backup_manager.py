@@ -1,9 +1,14 @@
 # timeclock/backup_manager.py
 # -*- coding: utf-8 -*-
+import os
 import shutil
+import sqlite3
 from datetime import datetime
 from pathlib import Path
-from timeclock.settings import DB_PATH, BACKUP_DIR, APP_DIR
+from timeclock.settings import (
+    DB_PATH, BACKUP_DIR, APP_DIR,
+    SNAPSHOT_PAGES_PER_STEP, SNAPSHOT_STEP_SLEEP_SEC,
+)
 # -----------------------------------------------------------
 # [설정] 파일 경로 절대 경로로 고정
 # -----------------------------------------------------------
@@ -56,6 +61,51 @@ def write_backup_id(backup_id: str):
         return False, str(e)
 
 
+# ---------------------------
+# DB snapshot (sqlite backup API)
+# ---------------------------
+def snapshot_db(dest_path, src_path=None, pages=None, sleep_sec=None):
+    """
+    실행 중인 DB를 sqlite3 backup API로 dest_path 에 복사한다. (스냅샷/백업 공용)
+    - UI 연결과 별개인 연결로 페이지 단위(pages)씩 나눠 복사 → UI 쪽 쓰기가 멈추지 않음
+    - WAL 내용까지 일관된 상태로 복사됨 (파일 복사처럼 찢어진 상태를 잡지 않음)
+    - 완료 후 PRAGMA quick_check 로 검증, 실패하면 예외 (어느 단계에서 실패해도 .part 임시 파일은 지운다)
+    """
+    src_path = Path(src_path or DB_PATH)
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    part_path = dest_path.with_name(dest_path.name + ".part")
+
+    pages = int(pages or SNAPSHOT_PAGES_PER_STEP)
+    sleep_sec = SNAPSHOT_STEP_SLEEP_SEC if sleep_sec is None else sleep_sec
+
+    replaced = False
+    try:
+        src = sqlite3.connect(str(src_path), timeout=30)
+        try:
+            dst = sqlite3.connect(str(part_path))
+            try:
+                src.backup(dst, pages=pages, sleep=sleep_sec)
+                result = dst.execute("PRAGMA quick_check").fetchone()[0]
+                # 스냅샷은 단일 파일로 다루므로 rollback journal 모드로 저장
+                dst.execute("PRAGMA journal_mode = DELETE")
+            finally:
+                dst.close()
+        finally:
+            src.close()
+
+        if result != "ok":
+            raise sqlite3.DatabaseError(f"스냅샷 검증 실패(quick_check): {result}")
+
+        os.replace(str(part_path), str(dest_path))
+        replaced = True
+        return dest_path
+    finally:
+        # backup / quick_check / 교체 중 어디서 실패해도 .part 파일을 남기지 않는다
+        if not replaced:
+            part_path.unlink(missing_ok=True)
+
+
 # ---------------------------
 # local backup / restore
 # ---------------------------
@@ -82,9 +132,9 @@ def run_backup(reason="auto", progress_callback=None):
         filename = f"{now_str}_{reason}.db"
         target_path = target_dir / filename
 
-        # 로컬 백업
-        log(f"로컬 파일 복사 중... ({filename})")
-        shutil.copy2(DB_PATH, target_path)
+        # 로컬 백업 (backup API 스냅샷 + quick_check)
+        log(f"로컬 DB 스냅샷 생성 중... ({filename})")
+        snapshot_db(target_path)
 
         msg = f"백업 완료: {filename}"
 
@@ -9,39 +9,425 @@ import csv
 import threading
 import logging
 import time
+import queue
+import functools
+import concurrent.futures
 from timeclock import backup_manager
 from timeclock import sync_manager
+from timeclock import delta_sync
+from timeclock import sync_scheduler
+from timeclock.salary import SalaryCalculator
 from timeclock.auth import pbkdf2_hash_password, pbkdf2_verify_password
 from timeclock.utils import now_str, normalize_date_range, ensure_dirs
 from timeclock.settings import (
     DEFAULT_OWNER_USER, DEFAULT_OWNER_PASS,
     DEFAULT_WORKER_USER, DEFAULT_WORKER_PASS,
+    WORK_LOG_PAGE_SIZE,
+    PENDING_COUNTS_MAX_AGE_SEC,
+    DISPUTE_FEED_MAX_INFLIGHT,
 )
 
-# [추가] 백그라운드 스레드 실행 함수 (파일 맨 끝에 붙여넣기)
-def run_sync_background(tag):
+# ----------------------------------------------------------------
+# 보조 인덱스 세트
+# - DB._migration_002_index_set 단계에서 생성된다.
+# - 인덱스를 추가/변경할 때는 새 마이그레이션 단계를 추가한다. (PRAGMA user_version 으로 관리)
+# ----------------------------------------------------------------
+INDEX_SET = [
+    # 근로자별 조회 / 오늘 근무 / 출근 중복 체크 / 퇴근 대상 조회
+    ("idx_work_logs_user_date_status", "work_logs(user_id, work_date, status)"),
+    # 상태별 목록 + 승인대기 건수
+    ("idx_work_logs_status_date", "work_logs(status, work_date)"),
+    # 사업주 전체 목록(기간 조회, work_date DESC, id DESC 정렬)
+    ("idx_work_logs_date", "work_logs(work_date)"),
+    # 근무기록별 이의제기 / 최신 이의제기
+    ("idx_disputes_work_log", "disputes(work_log_id, id)"),
+    # 이의제기 진행 건수
+    ("idx_disputes_status", "disputes(status)"),
+    # 대화 메시지
+    ("idx_dispute_messages_dispute", "dispute_messages(dispute_id, id)"),
+    # 가입 승인 대기
+    ("idx_signup_requests_status", "signup_requests(status, id)"),
+]
+
+# 배지/KPI 건수: 한 문장으로 세 건수를 모두 센다. (각각 상태 인덱스만 읽는 COVERING INDEX 검색)
+_PENDING_COUNTS_SQL = """
+    SELECT
+        (SELECT COUNT(*) FROM work_logs WHERE status = 'PENDING') AS work,
+        (SELECT COUNT(*) FROM disputes WHERE status IN ('PENDING', 'IN_REVIEW')) AS dispute,
+        (SELECT COUNT(*) FROM signup_requests WHERE status = 'PENDING') AS signup
+"""
+
+# ----------------------------------------------------------------
+# 핫 쿼리 SQL (DB 메서드와 HOT_QUERIES 점검이 같은 문자열을 쓴다)
+# - 조건이 붙었다 빠졌다 하는 쿼리는 조건 조합별 SQL 을 만드는 함수로 둔다.
+# ----------------------------------------------------------------
+_TODAY_WORK_LOG_SQL = "SELECT * FROM work_logs WHERE user_id=? AND work_date=? ORDER BY id DESC LIMIT 1"
+
+_ACTIVE_WORK_LOG_CHECK_SQL = """
+    SELECT 1 FROM work_logs
+    WHERE user_id = ? AND work_date = ? AND status IN ('PENDING', 'WORKING', 'APPROVED')
+"""
+
+_WORKING_LOG_SQL = "SELECT * FROM work_logs WHERE user_id=? AND status='WORKING' ORDER BY id DESC LIMIT 1"
+
+_LIST_WORK_LOGS_SQL = """
+    SELECT * FROM work_logs
+    WHERE user_id=? AND work_date >= ? AND work_date <= ?
+    ORDER BY work_date DESC, id DESC
+    LIMIT ?
+"""
+
+_LATEST_DISPUTE_SQL = "SELECT * FROM disputes WHERE work_log_id=? AND user_id=? ORDER BY id DESC LIMIT 1"
+
+_DISPUTE_TIMELINE_SQL = """
+    SELECT m.*, u.username AS sender_username
+    FROM dispute_messages m
+    LEFT JOIN users u ON u.id = m.sender_user_id
+    WHERE m.dispute_id IN (SELECT id FROM disputes WHERE work_log_id=?)
+    ORDER BY m.id ASC
+"""
+
+_PENDING_SIGNUPS_SQL = "SELECT * FROM signup_requests WHERE status='PENDING' ORDER BY id ASC LIMIT ?"
+
+
+def _all_work_logs_sql(by_worker=False, by_status=False, after=False):
+    """사업주 근무기록 목록 (list_all_work_logs / list_all_work_logs_page)"""
+    sql = """
+        SELECT w.*, u.username as worker_username, u.name as worker_name
+        FROM work_logs w
+        JOIN users u ON u.id = w.user_id
+        WHERE w.work_date >= ? AND w.work_date <= ?
+    """
+    if by_worker:
+        sql += " AND w.user_id = ?"
+    if by_status:
+        sql += " AND w.status = ?"
+    if after:
+        sql += " AND (w.work_date, w.id) < (?, ?)"
+    return sql + " ORDER BY w.work_date DESC, w.id DESC LIMIT ?"
+
+
+def _approved_work_logs_sql(by_user=False):
+    sql = """
+        SELECT w.*, u.username AS worker_username, u.name AS worker_name,
+               u.hourly_wage AS hourly_wage, u.job_title AS job_title
+        FROM work_logs w
+        JOIN users u ON u.id = w.user_id
+        WHERE w.status = 'APPROVED' AND w.work_date >= ? AND w.work_date <= ?
+    """
+    if by_user:
+        sql += " AND w.user_id = ?"
+    return sql + " ORDER BY w.user_id, w.id"
+
+
+def _payroll_week_agg_sql(by_user=False):
+    sql = "SELECT * FROM payroll_week_agg WHERE week_start >= ? AND week_start <= ?"
+    if by_user:
+        sql += " AND user_id = ?"
+    return sql + " ORDER BY user_id, week_start"
+
+
+def _dispute_status_cond(filter_type):
+    if filter_type == "CLOSED":
+        return "l.status IN ('RESOLVED','REJECTED')"
+    return "l.status IN ('PENDING','IN_REVIEW')"
+
+
+def _disputes_sql(filter_type="ACTIVE"):
+    """사업주 이의제기 탭: 근무기록별 최신 이의제기 (dispute_latest: 트리거로 유지, status/created_date 인덱스)"""
+    return f"""
+        SELECT d.*, u.username as worker_username, w.work_date, w.start_time, w.end_time
+        FROM dispute_latest l
+        JOIN disputes d ON d.id = l.dispute_id
+        JOIN users u ON u.id = d.user_id
+        JOIN work_logs w ON w.id = d.work_log_id
+        WHERE {_dispute_status_cond(filter_type)}
+          AND l.created_date >= date(?) AND l.created_date <= date(?)
+        ORDER BY l.dispute_id DESC LIMIT ?
     """
-    DB 변경 직후 백그라운드로:
-    1) 로컬 백업
-    2) 구글드라이브 업로드
 
-    단, 클라우드 DB가 마지막 동기화 이후 변경되었으면(충돌 위험)
-    upload_current_db()가 False를 반환하며 업로드가 차단됩니다.
+
+def _my_disputes_sql(filter_type="ACTIVE"):
+    """근로자 이의제기 탭 (dispute_latest: user_id/status/created_date 인덱스)"""
+    return f"""
+        SELECT d.*, w.work_date, w.status as work_status
+        FROM dispute_latest l
+        JOIN disputes d ON d.id = l.dispute_id
+        JOIN work_logs w ON w.id = d.work_log_id
+        WHERE l.user_id=? AND {_dispute_status_cond(filter_type)}
+          AND l.created_date >= date(?) AND l.created_date <= date(?)
+        ORDER BY l.dispute_id DESC LIMIT ?
+    """
+
+
+_D1, _D2 = "2000-01-01", "2000-12-31"
+
+# EXPLAIN QUERY PLAN 자가 점검 대상 (위 SQL 을 그대로 사용, tests/test_query_plans.py 에서 자동 점검)
+HOT_QUERIES = [
+    ("get_today_work_log", _TODAY_WORK_LOG_SQL, (1, _D1)),
+    ("start_work", _ACTIVE_WORK_LOG_CHECK_SQL, (1, _D1)),
+    ("end_work", _WORKING_LOG_SQL, (1,)),
+    ("list_work_logs", _LIST_WORK_LOGS_SQL, (1, _D1, _D2, 1000)),
+    ("list_all_work_logs", _all_work_logs_sql(), (_D1, _D2, 2000)),
+    ("list_all_work_logs(status)", _all_work_logs_sql(by_status=True), (_D1, _D2, "PENDING", 2000)),
+    ("list_all_work_logs(worker,status)", _all_work_logs_sql(by_worker=True, by_status=True),
+     (_D1, _D2, 1, "APPROVED", 2000)),
+    ("list_all_work_logs_page", _all_work_logs_sql(after=True), (_D1, _D2, "2000-06-01", 100, 200)),
+    ("list_all_work_logs_page(status)", _all_work_logs_sql(by_status=True, after=True),
+     (_D1, _D2, "PENDING", "2000-06-01", 100, 200)),
+    ("list_approved_work_logs", _approved_work_logs_sql(), (_D1, _D2)),
+    ("list_approved_work_logs(user)", _approved_work_logs_sql(by_user=True), (_D1, _D2, 1)),
+    ("list_payroll_week_agg", _payroll_week_agg_sql(), (_D1, _D2)),
+    ("list_payroll_week_agg(user)", _payroll_week_agg_sql(by_user=True), (_D1, _D2, 1)),
+    ("get_pending_counts", _PENDING_COUNTS_SQL, ()),
+    ("list_disputes", _disputes_sql("ACTIVE"), (_D1, _D2, 1000)),
+    ("list_disputes(closed)", _disputes_sql("CLOSED"), (_D1, _D2, 1000)),
+    ("list_my_disputes", _my_disputes_sql("ACTIVE"), (1, _D1, _D2, 2000)),
+    ("list_my_disputes(closed)", _my_disputes_sql("CLOSED"), (1, _D1, _D2, 2000)),
+    ("create_dispute", _LATEST_DISPUTE_SQL, (1, 1)),
+    ("get_dispute_timeline", _DISPUTE_TIMELINE_SQL, (1,)),
+    ("list_pending_signup_requests", _PENDING_SIGNUPS_SQL, (1000,)),
+]
+
+# 'YYYY-MM-DD...' 문자열 → 그 주 월요일 (ISO 주 시작일). payroll_week_agg 키
+_WEEK_START_SQL = "date(substr({col}, 1, 10), 'weekday 0', '-6 days')"
+
+class ConnectionManager:
+    """
+    스레드별 장수(long-lived) sqlite 연결 관리자
+
+    - 스레드마다 처음 사용할 때 1회만 연결 + PRAGMA 적용, 이후 계속 재사용한다.
+    - 쓰기 전용 스레드(writer_thread)의 연결만 쓰기가 가능하고,
+      나머지 스레드(UI/QThread/동기화)의 연결은 읽기 전용(query_only)이다.
+      WAL 모드라 읽기 연결은 쓰기/체크포인트가 진행 중이어도 기다리지 않는다.
+    - 종료된 스레드(QThread 작업 등)의 연결은 다음 연결을 열 때 정리한다.
+    - 클라우드 기준본은 파일 교체가 아니라 DB.apply_snapshot()으로 열린 연결에 복사하므로
+      동기화 때문에 연결을 닫을 일이 없다. close_all() 이후에는 세대(generation)가 바뀌어
+      각 스레드가 다음 사용 시 다시 연다.
     """
-    def _worker():
+
+    def __init__(self, db_path: Path, timeout: float = 30):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns = []            # [(thread, conn)]
+        self._generation = 0
+        self.writer_thread = None   # WriteExecutor 스레드
+
+    def _open(self, read_only: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.db_path), check_same_thread=False, timeout=self.timeout)
+        conn.row_factory = sqlite3.Row
+        if read_only:
+            # 자동 BEGIN 없음 → 읽기 연결이 예전 스냅샷(트랜잭션)을 붙잡고 있지 않는다
+            conn.isolation_level = None
         try:
-            backup_manager.run_backup(tag)
-            ok = sync_manager.upload_current_db()
-            if ok:
-                print(f"[Thread] '{tag}' 동기화 완료")
+            conn.execute("PRAGMA foreign_keys = ON;")
+            if read_only:
+                # 쓰기는 WriteExecutor 로만 (실수로 여기서 쓰면 즉시 오류)
+                conn.execute("PRAGMA query_only = ON;")
             else:
-                print(f"[Thread] '{tag}' 업로드 차단(클라우드 변경 감지). 재시작 후 최신 DB 다운로드 필요.")
-        except Exception as e:
-            print(f"[Thread] 오류: {e}")
+                conn.execute("PRAGMA journal_mode = WAL;")
+            conn.commit()
+        except Exception:
+            pass
+        return conn
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+
+        with self._lock:
+            self._prune_dead_threads()
+            conn = self._open(read_only=threading.current_thread() is not self.writer_thread)
+            self._conns.append((threading.current_thread(), conn))
+            self._local.conn = conn
+            self._local.generation = self._generation
+        return conn
+
+    def _prune_dead_threads(self):
+        alive = []
+        for t, c in self._conns:
+            if t.is_alive():
+                alive.append((t, c))
+            else:
+                try:
+                    c.close()
+                except Exception:
+                    pass
+        self._conns = alive
+
+    def close_all(self):
+        """모든 스레드의 연결을 닫는다. (다음 사용 시 자동 재연결)"""
+        with self._lock:
+            for _t, c in self._conns:
+                try:
+                    c.close()
+                except Exception:
+                    pass
+            self._conns = []
+            self._generation += 1
+
+
+class CountersCache:
+    """
+    배지/KPI 건수 메모리 캐시
+
+    - 건수를 바꾸는 쓰기 메서드가 invalidate() 를 부르기 전까지는 DB 를 다시 세지 않는다.
+    - 델타 동기화처럼 DB 메서드를 거치지 않는 변경에 대비해 max_age 초가 지나면 다시 센다.
+    - 세는 도중에 무효화되면(세대 번호가 바뀌면) 그 결과는 저장하지 않는다.
+    """
+
+    def __init__(self, max_age: float):
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._gen = 0
+        self._value = None
+        self._at = 0.0
+
+    def get(self, loader) -> dict:
+        with self._lock:
+            gen = self._gen
+            if self._value is not None and time.monotonic() - self._at < self._max_age:
+                return dict(self._value)
+
+        value = loader()
+        with self._lock:
+            if gen == self._gen:
+                self._value, self._at = dict(value), time.monotonic()
+        return dict(value)
+
+    def invalidate(self):
+        with self._lock:
+            self._gen += 1
+            self._value = None
+
+
+class WriteExecutor:
+    """
+    DB 쓰기 전용 스레드 1개
+
+    - 모든 쓰기(@_write_op 메서드)는 이 스레드의 큐에 들어가 도착 순서대로 하나씩 실행된다.
+      호출한 쪽은 결과(또는 예외)가 나올 때까지 기다린다. (기존 동기 호출 방식 그대로)
+    - 쓰기 메서드 안에서 다른 쓰기 메서드를 부르면(이미 이 스레드) 바로 실행한다.
+    """
+
+    def __init__(self, name: str = "DBWriter"):
+        self._q = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    @property
+    def thread(self) -> threading.Thread:
+        return self._thread
+
+    def in_writer_thread(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def submit(self, fn, *args, **kwargs):
+        if self.in_writer_thread():
+            return fn(*args, **kwargs)
+        if not self._thread.is_alive():
+            raise RuntimeError("DB 쓰기 스레드가 종료되었습니다.")
+
+        fut = concurrent.futures.Future()
+        self._q.put((fut, fn, args, kwargs))
+        return fut.result()
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            if item is None:
+                break
+            fut, fn, args, kwargs = item
+            if not fut.set_running_or_notify_cancel():
+                continue
+            try:
+                fut.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                fut.set_exception(e)
+
+    def stop(self, timeout: float = 5.0):
+        """남은 쓰기를 마치고 스레드 종료"""
+        if self._thread.is_alive() and not self.in_writer_thread():
+            self._q.put(None)
+            self._thread.join(timeout)
+
+
+class FeedUploader:
+    """
+    이의제기 대화 피드 업로드 전용 스레드 1개 (Qt 이벤트 루프 없이 동작)
+
+    - 같은 피드 파일에 덧붙이므로 도착 순서대로 하나씩 올린다.
+    - 대기+실행 중인 업로드가 max_inflight 개면 새 업로드는 받지 않는다(False).
+      끝난 업로드는 완료 콜백에서 바로 자리를 돌려준다.
+    """
+
+    def __init__(self, max_inflight: int, name: str = "DisputeFeed"):
+        self._max_inflight = max(1, int(max_inflight))
+        self._lock = threading.Lock()
+        self._inflight = 0
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+
+    @property
+    def inflight(self) -> int:
+        with self._lock:
+            return self._inflight
+
+    def submit(self, fn) -> bool:
+        with self._lock:
+            if self._inflight >= self._max_inflight:
+                return False
+            self._inflight += 1
+        try:
+            fut = self._pool.submit(fn)
+        except RuntimeError:
+            # 이미 stop() 된 뒤
+            self._release(None)
+            return False
+        fut.add_done_callback(self._release)
+        return True
+
+    def _release(self, fut):
+        with self._lock:
+            self._inflight -= 1
+        try:
+            if fut is not None and fut.exception() is not None:
+                logging.error(f"dispute feed upload failed: {fut.exception()}")
+        except Exception:
+            pass
+
+    def stop(self, wait: bool = False):
+        """새 업로드는 받지 않고, 이미 받은 업로드는 마저 올린다. (wait=True 면 끝날 때까지 대기)"""
+        self._pool.shutdown(wait=wait)
+
+
+def _write_op(fn):
+    """
+    DB 쓰기 메서드 표시.
+    어느 스레드에서 호출하든 WriteExecutor 스레드에서 실행되므로, 메서드 안의 self.conn 은 유일한 쓰기 연결이다.
+    실패하면 열린 트랜잭션을 롤백해서 쓰기 잠금을 남기지 않는다.
+    """
+    @functools.wraps(fn)
+    def wrapper(self, *args, **kwargs):
+        if self._writer.in_writer_thread():
+            return fn(self, *args, **kwargs)
+
+        def run():
+            try:
+                return fn(self, *args, **kwargs)
+            except BaseException:
+                try:
+                    if self.conn.in_transaction:
+                        self.conn.rollback()
+                except Exception:
+                    pass
+                raise
 
-    t = threading.Thread(target=_worker)
-    t.daemon = True
-    t.start()
+        return self._writer.submit(run)
+
+    return wrapper
 
 
 class DB:
@@ -49,106 +435,140 @@ class DB:
         ensure_dirs()
         self.db_path = db_path
 
-        # UI/스레드/동기화 상황에서 잠금/NoneType 방지
-        self.conn = sqlite3.connect(str(db_path), check_same_thread=False, timeout=30)
-        self.conn.row_factory = sqlite3.Row
+        # 스레드별 장수 연결 (close/reconnect 없이 계속 사용, 클라우드 기준본은 apply_snapshot 으로 반영)
+        self._connections = ConnectionManager(db_path)
 
-        try:
-            self.conn.execute("PRAGMA foreign_keys = ON;")
-            self.conn.execute("PRAGMA journal_mode = WAL;")
-            self.conn.commit()
-        except Exception:
-            pass
+        # 쓰기는 전용 스레드 1개가 유일한 쓰기 연결로 직렬 처리 (읽기 연결은 스레드별 읽기 전용)
+        self._writer = WriteExecutor()
+        self._connections.writer_thread = self._writer.thread
+
+        # 테이블별 컬럼 집합 캐시 (연결 단위, apply_snapshot 시 초기화)
+        self._schema_cache = {}
+
+        # 승인대기/이의제기/가입대기 건수 캐시 (get_pending_counts)
+        self._counts = CountersCache(PENDING_COUNTS_MAX_AGE_SEC)
+
+        # 대화 피드 업로드 (쓰기 스레드를 붙잡지 않도록 별도 스레드)
+        self._feeds = FeedUploader(DISPUTE_FEED_MAX_INFLIGHT)
 
         self._migrate()
+        self._load_schema_cache()
+        self._replay_local_changes()
         self._ensure_defaults()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """현재 스레드 전용 연결 (없거나 파일 교체 이후면 새로 열림, 절대 None 아님)"""
+        return self._connections.get()
+
     def _save_and_sync(self, tag: str):
         """
         [핵심 안정화]
         - UI가 DB를 사용 중인 상태에서 self.conn을 close/reconnect 하지 않는다.
-        - 대신 현재 DB 파일을 스냅샷으로 복사한 뒤(짧은 재시도 포함),
-          그 스냅샷 파일을 백그라운드 스레드로 업로드한다.
-        - 업로드 성공/실패는 로그로 남긴다.
+        - 커밋 후 sync_scheduler에 '변경됨'만 알리고 바로 돌아간다.
+          스케줄러가 짧은 구간의 알림을 모아 백업 1회 + 변경분(델타) 업로드 1회로 처리하고,
+          실패한 업로드는 재시도한다.
         """
         try:
-            print(f"🔄 [AutoSync] '{tag}' 동기화 시작...")
-
             # 1) 변경사항 커밋
             try:
                 self.conn.commit()
             except Exception:
                 pass
 
-            # 2) 스냅샷 파일 생성 (DB 연결 유지한 채 파일 복사)
-            snap_dir = self.db_path.parent / "_sync_tmp"
-            snap_dir.mkdir(parents=True, exist_ok=True)
+            # 2) 백그라운드 동기화 예약
+            sync_scheduler.notify(self, tag)
 
-            ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-            snap_path = snap_dir / f"{self.db_path.stem}.snapshot_{ts}{self.db_path.suffix}"
+        except Exception as e:
+            print(f"❌ [AutoSync] _save_and_sync failed: {e}")
 
-            # WAL 환경이면 checkpoint로 파일 상태를 최대한 안정화
-            try:
-                self.conn.execute("PRAGMA wal_checkpoint(FULL);")
-                self.conn.commit()
-            except Exception:
-                pass
+    def close(self):
+        self._feeds.stop()
+        self._writer.stop()
+        self._connections.close_all()
 
-            last_err = None
-            for _ in range(3):
-                try:
-                    shutil.copy2(str(self.db_path), str(snap_path))
-                    last_err = None
-                    break
-                except Exception as e:
-                    last_err = e
-                    time.sleep(0.15)
-
-            if last_err is not None:
-                print(f"❌ [AutoSync] snapshot copy failed: {last_err}")
-                return
+    @_write_op
+    def run_write(self, fn, *args, **kwargs):
+        """
+        DB 메서드로 만들기 애매한 일회성 쓰기용: fn(conn, *args, **kwargs) 를 쓰기 스레드에서 실행.
+        커밋은 fn 이 직접 한다. (무엇을 바꿨는지 모르므로 건수 캐시는 무효화)
+        """
+        try:
+            return fn(self.conn, *args, **kwargs)
+        finally:
+            self._counts.invalidate()
 
-            # 3) 백그라운드 업로드 (UI 블로킹/크래시 방지)
-            def _worker():
-                try:
-                    # 로컬/드라이브 백업은 기존 정책 유지
-                    try:
-                        if 'backup_manager' in globals():
-                            backup_manager.run_backup(tag)
-                    except Exception as e:
-                        print(f"⚠️ [AutoSync] backup failed: {e}")
-
-                    # 스냅샷 업로드
-                    try:
-                        ok = sync_manager.upload_current_db(db_path=snap_path)
-                        if ok:
-                            print(f"✅ [AutoSync] '{tag}' 업로드 완료")
-                        else:
-                            print(f"⚠️ [AutoSync] '{tag}' 업로드 실패/차단")
-                    except Exception as e:
-                        print(f"❌ [AutoSync] upload failed: {e}")
-
-                finally:
-                    try:
-                        snap_path.unlink(missing_ok=True)
-                    except Exception:
-                        pass
-
-            t = threading.Thread(target=_worker, daemon=True)
-            t.start()
+    # ----------------------------------------------------------------
+    # Schema Migration (PRAGMA user_version 기반)
+    # ----------------------------------------------------------------
+    @_write_op
+    def _migrate(self):
+        """
+        번호가 매겨진 마이그레이션 단계(_MIGRATIONS)를 user_version 이후부터 순서대로 적용한다.
+        - 스키마가 최신이면 PRAGMA user_version 1회 조회로 끝난다. (DDL 없음)
+        - 밀린 단계는 하나의 트랜잭션으로 묶어서 실행하고, 마지막에 user_version을 올린다.
+          (중간에 실패하면 전부 롤백 → 다음 실행 때 다시 시도)
+        """
+        ver = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        target = len(self._MIGRATIONS)
 
-        except Exception as e:
-            print(f"❌ [AutoSync] _save_and_sync failed: {e}")
+        if ver == target:
+            return
+        if ver > target:
+            print(f"⚠️ [DB] 더 최신 앱에서 만든 DB입니다. (user_version={ver}, 앱={target})")
+            return
 
-    def close(self):
+        cur = self.conn.cursor()
         try:
-            self.conn.close()
+            cur.execute("BEGIN IMMEDIATE")
+            for step in range(ver + 1, target + 1):
+                getattr(self, self._MIGRATIONS[step - 1])(cur)
+            cur.execute(f"PRAGMA user_version = {int(target)}")
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+
+        try:
+            self.conn.execute("ANALYZE")
+            self.conn.commit()
         except Exception:
             pass
 
-    def _migrate(self):
-        cur = self.conn.cursor()
+        print(f"🗂️ [DB] 스키마 마이그레이션 완료 (v{ver} → v{target})")
+
+    _CACHED_TABLES = ("users", "work_logs", "disputes", "dispute_messages", "signup_requests")
 
+    def _load_schema_cache(self):
+        """마이그레이션 직후 주요 테이블의 컬럼 목록을 한 번만 읽어 캐시한다."""
+        self._schema_cache = {}
+        for table in self._CACHED_TABLES:
+            self._table_columns(table)
+
+    def _table_columns(self, table: str) -> set:
+        """
+        테이블 컬럼 집합 (캐시).
+        레거시 DB마다 컬럼 구성이 다를 수 있어 SQL을 컬럼 유무에 맞춰 조립할 때 사용한다.
+        """
+        cols = self._schema_cache.get(table)
+        if cols is None:
+            cols = {r[1] for r in self.conn.execute(f"PRAGMA table_info({table})").fetchall()}
+            self._schema_cache[table] = cols
+        return cols
+
+    @staticmethod
+    def _add_missing_columns(cur, table, columns):
+        """table_info 1회 조회 후, 없는 컬럼만 ALTER TABLE ADD COLUMN"""
+        existing = {r[1] for r in cur.execute(f"PRAGMA table_info({table})").fetchall()}
+        for name, decl in columns:
+            if name not in existing:
+                cur.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+    def _migration_001_base_schema(self, cur):
+        """
+        v1: 기본 테이블 + 레거시 DB 누락 컬럼 보강
+        (user_version 도입 이전 DB도 여기서 한 번에 정리된다)
+        """
         # 1. users 테이블 생성
         cur.execute(
             """
@@ -167,62 +587,27 @@ class DB:
             """
         )
 
-        # 1-1. users 테이블 컬럼 확장
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN name TEXT")
-        except Exception:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN must_change_pw INTEGER NOT NULL DEFAULT 0")
-        except Exception:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN hourly_wage INTEGER DEFAULT 9860")
-        except Exception:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN birthdate TEXT")
-        except Exception:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN phone TEXT")
-        except Exception:
-            pass
-
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN job_title TEXT NOT NULL DEFAULT '사원'")
-        except Exception:
-            pass
-
-        # 개인정보 확장 컬럼
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN email TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN account TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE users ADD COLUMN address TEXT")
-        except Exception:
-            pass
+        # 1-1. users 테이블 컬럼 확장 (+ 개인정보 확장 컬럼)
+        self._add_missing_columns(cur, "users", [
+            ("name", "TEXT"),
+            ("must_change_pw", "INTEGER NOT NULL DEFAULT 0"),
+            ("hourly_wage", "INTEGER DEFAULT 9860"),
+            ("birthdate", "TEXT"),
+            ("phone", "TEXT"),
+            ("job_title", "TEXT NOT NULL DEFAULT '사원'"),
+            ("email", "TEXT"),
+            ("account", "TEXT"),
+            ("address", "TEXT"),
+        ])
 
         # 기존 owner 계정 직급 보정
-        try:
-            cur.execute(
-                """
-                UPDATE users
-                SET job_title='대표'
-                WHERE username='owner' AND (job_title IS NULL OR TRIM(job_title)='')
-                """
-            )
-        except Exception:
-            pass
+        cur.execute(
+            """
+            UPDATE users
+            SET job_title='대표'
+            WHERE username='owner' AND (job_title IS NULL OR TRIM(job_title)='')
+            """
+        )
 
         # 2. work_logs 테이블 생성
         cur.execute(
@@ -247,26 +632,13 @@ class DB:
         )
 
         # 🔴 [FIX] work_logs 테이블 누락 컬럼 추가 (이 부분이 없어서 KeyError 발생함)
-        try:
-            cur.execute("ALTER TABLE work_logs ADD COLUMN approved_start TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE work_logs ADD COLUMN approved_end TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE work_logs ADD COLUMN owner_comment TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE work_logs ADD COLUMN approver_id INTEGER")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE work_logs ADD COLUMN updated_at TEXT")
-        except Exception:
-            pass
+        self._add_missing_columns(cur, "work_logs", [
+            ("approved_start", "TEXT"),
+            ("approved_end", "TEXT"),
+            ("owner_comment", "TEXT"),
+            ("approver_id", "INTEGER"),
+            ("updated_at", "TEXT"),
+        ])
 
         # 3. disputes 테이블 생성 (work_log_id 포함)
         cur.execute(
@@ -297,23 +669,17 @@ class DB:
         )
 
         # ✅ disputes 컬럼 보강(기존 DB 스키마 불일치 방지)
-        for sql in [
-            "ALTER TABLE disputes ADD COLUMN work_log_id INTEGER",
-            "ALTER TABLE disputes ADD COLUMN comment TEXT",
-
+        self._add_missing_columns(cur, "disputes", [
+            ("work_log_id", "INTEGER"),
+            ("comment", "TEXT"),
             # 현재 코드가 쓰는 컬럼(없으면 no such column 터짐)
-            "ALTER TABLE disputes ADD COLUMN resolved_at TEXT",
-            "ALTER TABLE disputes ADD COLUMN resolved_by INTEGER",
-
+            ("resolved_at", "TEXT"),
+            ("resolved_by", "INTEGER"),
             # 레거시 호환(혹시 누락된 DB 대비)
-            "ALTER TABLE disputes ADD COLUMN decided_at TEXT",
-            "ALTER TABLE disputes ADD COLUMN decided_by INTEGER",
-            "ALTER TABLE disputes ADD COLUMN decision_comment TEXT",
-        ]:
-            try:
-                cur.execute(sql)
-            except Exception:
-                pass
+            ("decided_at", "TEXT"),
+            ("decided_by", "INTEGER"),
+            ("decision_comment", "TEXT"),
+        ])
 
         # 4. dispute_messages 테이블 생성
         cur.execute(
@@ -350,22 +716,12 @@ class DB:
             """
         )
         # signup_requests 확장 컬럼
-        try:
-            cur.execute("ALTER TABLE signup_requests ADD COLUMN name TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE signup_requests ADD COLUMN email TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE signup_requests ADD COLUMN account TEXT")
-        except Exception:
-            pass
-        try:
-            cur.execute("ALTER TABLE signup_requests ADD COLUMN address TEXT")
-        except Exception:
-            pass
+        self._add_missing_columns(cur, "signup_requests", [
+            ("name", "TEXT"),
+            ("email", "TEXT"),
+            ("account", "TEXT"),
+            ("address", "TEXT"),
+        ])
 
         # 6. audit_logs 테이블 생성
         cur.execute(
@@ -383,7 +739,226 @@ class DB:
             """
         )
 
-        self.conn.commit()
+    def _migration_002_index_set(self, cur):
+        """v2: 핫 쿼리용 보조 인덱스 세트 (INDEX_SET)"""
+        for name, target in INDEX_SET:
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+
+    def _migration_003_change_log(self, cur):
+        """v3: 델타 동기화용 변경 로그 테이블 + 트리거 (delta_sync 참고)"""
+        delta_sync.install_schema(cur)
+
+    def _migration_004_payroll_week_agg(self, cur):
+        """
+        v4: 주별 급여 집계 캐시 (payroll_week_agg)
+        - (user_id, week_start=ISO 주 월요일) 한 행에 그 주 APPROVED 기록의 실근로/야간/일 연장(정수 초)과 근무일수를 저장한다.
+          시간·금액 환산은 calculate_from_weeks 에서 한다.
+        - work_logs 트리거는 영향받는 주를 dirty=1 로 표시만 하고,
+          실제 재계산은 refresh_payroll_week_agg() 가 SalaryCalculator 규칙 그대로 수행한다.
+          (승인/반려/일괄 승인 직후 + 정산 조회 직전. 델타 동기화로 바뀐 기록도 같은 경로로 반영됨)
+        - off_week: work_date 의 주와 (확정)시작시각의 주가 다른 기록 수. 0이 아니면 그 근로자는 원본 기록으로 계산한다.
+        - actual_hours: 그 주 실근로시간을 calculate_period 와 같은 순서로 더한 부동소수 값 (주휴수당 판정/계산용)
+        - inexact_logs: 시각이 1/16시간 단위가 아니라 시간 환산에 부동소수 반올림이 생기는 기록 수 (calculate_from_weeks 참고)
+        """
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS payroll_week_agg (
+                user_id INTEGER NOT NULL,
+                week_start TEXT NOT NULL,
+                iso_year INTEGER,
+                iso_week INTEGER,
+                work_sec INTEGER NOT NULL DEFAULT 0,
+                break_sec INTEGER NOT NULL DEFAULT 0,
+                actual_sec INTEGER NOT NULL DEFAULT 0,
+                overtime_sec INTEGER NOT NULL DEFAULT 0,
+                night_sec INTEGER NOT NULL DEFAULT 0,
+                actual_hours REAL NOT NULL DEFAULT 0,
+                inexact_logs INTEGER NOT NULL DEFAULT 0,
+                days INTEGER NOT NULL DEFAULT 0,
+                log_count INTEGER NOT NULL DEFAULT 0,
+                first_work_date TEXT,
+                last_work_date TEXT,
+                off_week INTEGER NOT NULL DEFAULT 0,
+                dirty INTEGER NOT NULL DEFAULT 1,
+                updated_at TEXT,
+                PRIMARY KEY (user_id, week_start)
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_payroll_week_agg_week ON payroll_week_agg(week_start)")
+
+        def mark(ref):
+            # (확정)시작시각의 주 + work_date 의 주 (둘이 다를 수 있음)
+            return "\n".join(
+                f"""
+                INSERT INTO payroll_week_agg (user_id, week_start, dirty)
+                SELECT {ref}.user_id, {_WEEK_START_SQL.format(col=col)}, 1
+                WHERE {_WEEK_START_SQL.format(col=col)} IS NOT NULL
+                ON CONFLICT(user_id, week_start) DO UPDATE SET dirty = 1;
+                """
+                for col in (f"COALESCE(NULLIF({ref}.approved_start, ''), {ref}.start_time)", f"{ref}.work_date")
+            )
+
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_payroll_agg_ins AFTER INSERT ON work_logs
+            WHEN NEW.status = 'APPROVED'
+            BEGIN {mark("NEW")} END
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_payroll_agg_upd
+            AFTER UPDATE OF status, user_id, work_date, start_time, end_time, approved_start, approved_end ON work_logs
+            WHEN OLD.status = 'APPROVED' OR NEW.status = 'APPROVED'
+            BEGIN {mark("OLD")} {mark("NEW")} END
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_payroll_agg_del AFTER DELETE ON work_logs
+            WHEN OLD.status = 'APPROVED'
+            BEGIN {mark("OLD")} END
+            """
+        )
+
+        # 기존 APPROVED 기록의 주 전부 dirty 로 채워 둔다 (다음 refresh 때 계산)
+        for col in ("COALESCE(NULLIF(approved_start, ''), start_time)", "work_date"):
+            cur.execute(
+                f"""
+                INSERT OR IGNORE INTO payroll_week_agg (user_id, week_start, dirty)
+                SELECT DISTINCT user_id, {_WEEK_START_SQL.format(col=col)}, 1
+                FROM work_logs WHERE status = 'APPROVED' AND {_WEEK_START_SQL.format(col=col)} IS NOT NULL
+                """
+            )
+
+    def _migration_005_dispute_latest(self, cur):
+        """
+        v5: 근무기록별 최신 이의제기 (dispute_latest)
+        - work_log_id 한 행에 가장 최근(id 최대) 이의제기의 id / user_id / status / 생성일(created_date)을 둔다.
+        - disputes 트리거가 영향받는 근무기록 행을 그때그때 다시 만든다. (idx_disputes_work_log 로 1행 조회)
+        - 이의제기 목록은 이 테이블의 (status, created_date) 범위 조회로 끝난다.
+          (disputes 전체 GROUP BY + date(created_at) 비교를 매 새로고침마다 하지 않음)
+        - 로컬에서 파생되는 테이블이므로 델타 동기화 대상(SYNC_TABLES)이 아니다.
+        """
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dispute_latest (
+                work_log_id INTEGER PRIMARY KEY,
+                dispute_id INTEGER NOT NULL,
+                user_id INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                created_date TEXT
+            )
+            """
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dispute_latest_status_date ON dispute_latest(status, created_date)"
+        )
+        cur.execute(
+            "CREATE INDEX IF NOT EXISTS idx_dispute_latest_user ON dispute_latest(user_id, status, created_date)"
+        )
+
+        def rebuild(ref):
+            return f"""
+                DELETE FROM dispute_latest WHERE work_log_id = {ref}.work_log_id;
+                INSERT INTO dispute_latest (work_log_id, dispute_id, user_id, status, created_date)
+                SELECT work_log_id, id, user_id, status, date(created_at) FROM disputes
+                WHERE work_log_id = {ref}.work_log_id ORDER BY id DESC LIMIT 1;
+            """
+
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_dispute_latest_ins AFTER INSERT ON disputes
+            BEGIN {rebuild("NEW")} END
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_dispute_latest_upd
+            AFTER UPDATE OF work_log_id, user_id, status, created_at ON disputes
+            BEGIN {rebuild("OLD")} {rebuild("NEW")} END
+            """
+        )
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_dispute_latest_del AFTER DELETE ON disputes
+            BEGIN {rebuild("OLD")} END
+            """
+        )
+
+        # 기존 이의제기로 채워 둔다
+        cur.execute("DELETE FROM dispute_latest")
+        cur.execute(
+            """
+            INSERT INTO dispute_latest (work_log_id, dispute_id, user_id, status, created_date)
+            SELECT work_log_id, id, user_id, status, date(created_at) FROM disputes
+            WHERE id IN (SELECT MAX(id) FROM disputes WHERE work_log_id IS NOT NULL GROUP BY work_log_id)
+            """
+        )
+
+    def _migration_006_sync_uid(self, cur):
+        """
+        v6: 동기화 행 식별자 uid + 충돌 기록 (sync_conflicts)
+        - 두 PC가 각자 AUTOINCREMENT 로 같은 id 를 만들어도 델타가 서로 덮어쓰지 않도록 uid 로 행을 맞춘다.
+        - 변경 로그 트리거를 uid 도 남기는 버전으로 교체한다. (delta_sync.install_schema 참고)
+        """
+        delta_sync.install_schema(cur)
+
+    def _migration_007_dispute_feed_state(self, cur):
+        """
+        v7: 이의제기 대화 피드 읽은 위치 (dispute_feed_state)
+        - 상대방 피드 파일(file_id)마다 읽은 바이트/덜 끝난 줄/마지막 메시지 id 를 저장한다.
+          (메모리에만 두면 앱을 다시 켤 때마다 피드 전체를 처음부터 다시 읽었다)
+        - PC마다 다른 값이라 변경 로그(델타) 대상이 아니다.
+        """
+        cur.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dispute_feed_state (
+                file_id TEXT PRIMARY KEY,
+                dispute_uid TEXT NOT NULL,
+                read_offset INTEGER NOT NULL DEFAULT 0,
+                tail BLOB,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                updated_at TEXT
+            )
+            """
+        )
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_dispute_feed_state_uid ON dispute_feed_state(dispute_uid)")
+
+    # 순서가 곧 버전 번호 (1부터). 새 변경은 항상 맨 뒤에 추가하고, 기존 단계는 수정하지 않는다.
+    _MIGRATIONS = [
+        "_migration_001_base_schema",
+        "_migration_002_index_set",
+        "_migration_003_change_log",
+        "_migration_004_payroll_week_agg",
+        "_migration_005_dispute_latest",
+        "_migration_006_sync_uid",
+        "_migration_007_dispute_feed_state",
+    ]
+
+    def check_query_plans(self):
+        """
+        HOT_QUERIES 를 EXPLAIN QUERY PLAN 으로 점검한다.
+        인덱스 없이 전체 테이블을 훑는(SCAN ... 에 USING 이 없는) 단계가 있으면 목록으로 반환한다.
+        반환: [(쿼리명, 계획상세), ...]  (비어 있으면 정상)
+        """
+        offenders = []
+        for name, sql, params in HOT_QUERIES:
+            rows = self.conn.execute("EXPLAIN QUERY PLAN " + sql, params).fetchall()
+            for r in rows:
+                detail = str(r[3])
+                # SCAN CONSTANT ROW: 테이블 없는 SELECT (스칼라 서브쿼리 묶음)라 스캔이 아님
+                if detail.startswith("SCAN") and "USING" not in detail and detail != "SCAN CONSTANT ROW":
+                    offenders.append((name, detail))
+        return offenders
+
+    def assert_query_plans(self):
+        """check_query_plans() 결과에 전체 스캔이 있으면 AssertionError"""
+        offenders = self.check_query_plans()
+        if offenders:
+            lines = "\n".join(f"  - {n}: {d}" for n, d in offenders)
+            raise AssertionError(f"인덱스를 타지 않는 쿼리가 있습니다:\n{lines}")
 
     def _ensure_defaults(self):
         if not self.get_user_by_username(DEFAULT_OWNER_USER):
@@ -394,6 +969,7 @@ class DB:
     # ----------------------------------------------------------------
     # User / Auth / Member Management
     # ----------------------------------------------------------------
+    @_write_op
     def create_user(self, username, role, password):
         pw_hash = pbkdf2_hash_password(password)
         self.conn.execute(
@@ -413,6 +989,7 @@ class DB:
         if u["is_active"] == 0: return {"status": "INACTIVE"}
         return u
 
+    @_write_op
     def change_password(self, user_id, new_password):
         # ✅ 비밀번호 앞뒤 공백 제거 (최종 방어선)
         new_password = str(new_password).strip()
@@ -435,8 +1012,8 @@ class DB:
         return pbkdf2_verify_password(password or "", row["pw_hash"])
 
     def get_user_profile(self, user_id: int) -> dict | None:
-        # users에 컬럼이 항상 존재한다는 보장이 없으므로 PRAGMA로 안전 조회
-        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(users)").fetchall()}
+        # users에 컬럼이 항상 존재한다는 보장이 없으므로 캐시된 컬럼 목록으로 안전 조회
+        cols = self._table_columns("users")
 
         want = ["id", "username", "name", "phone", "birthdate", "email", "account", "address"]
         use = [c for c in want if c in cols]
@@ -447,6 +1024,7 @@ class DB:
         row = self.conn.execute(sql, (user_id,)).fetchone()
         return dict(row) if row else None
 
+    @_write_op
     def update_user_profile(
             self,
             user_id: int,
@@ -458,7 +1036,7 @@ class DB:
             account=None,
             address=None,
     ) -> None:
-        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(users)").fetchall()}
+        cols = self._table_columns("users")
 
         updates = []
         params = []
@@ -503,6 +1081,7 @@ class DB:
         sql += " ORDER BY username ASC"
         return self.conn.execute(sql, tuple(params)).fetchall()
 
+    @_write_op
     def resign_user(self, user_id):
         self.conn.execute(
             "UPDATE users SET is_active=0 WHERE id=?",
@@ -511,6 +1090,7 @@ class DB:
         self.conn.commit()
         self._save_and_sync("admin_resign_user")
 
+    @_write_op
     def update_user_wage(self, user_id, new_wage):
         self.conn.execute(
             "UPDATE users SET hourly_wage=? WHERE id=?",
@@ -519,6 +1099,7 @@ class DB:
         self.conn.commit()
         self._save_and_sync("admin_update_wage")
 
+    @_write_op
     def update_user_job_title(self, user_id: int, job_title: str):
         self.conn.execute(
             "UPDATE users SET job_title=? WHERE id=?",
@@ -532,21 +1113,15 @@ class DB:
     # ----------------------------------------------------------------
     def get_today_work_log(self, user_id):
         today = datetime.date.today().strftime("%Y-%m-%d")
-        return self.conn.execute(
-            "SELECT * FROM work_logs WHERE user_id=? AND work_date=? ORDER BY id DESC LIMIT 1",
-            (user_id, today)
-        ).fetchone()
+        return self.conn.execute(_TODAY_WORK_LOG_SQL, (user_id, today)).fetchone()
 
+    @_write_op
     def start_work(self, user_id):
         today = datetime.date.today().strftime("%Y-%m-%d")
         now = now_str()
 
         # 오늘 날짜의 '유효한(Active)' 근무 기록이 있는지 확인 (반려된 건은 제외)
-        sql_check = """
-            SELECT 1 FROM work_logs 
-            WHERE user_id = ? AND work_date = ? AND status IN ('PENDING', 'WORKING', 'APPROVED')
-        """
-        row = self.conn.execute(sql_check, (user_id, today)).fetchone()
+        row = self.conn.execute(_ACTIVE_WORK_LOG_CHECK_SQL, (user_id, today)).fetchone()
 
         if row:
             raise ValueError("이미 처리 중이거나 완료된 근무 기록이 있습니다.")
@@ -559,13 +1134,12 @@ class DB:
             (user_id, today, now, now)
         )
         self.conn.commit()
+        self._counts.invalidate()
         # self._save_and_sync("start_work")
 
+    @_write_op
     def end_work(self, user_id):
-        row = self.conn.execute(
-            "SELECT * FROM work_logs WHERE user_id=? AND status='WORKING' ORDER BY id DESC LIMIT 1",
-            (user_id,)
-        ).fetchone()
+        row = self.conn.execute(_WORKING_LOG_SQL, (user_id,)).fetchone()
 
         if not row:
             raise ValueError("현재 근무 중인 기록이 없습니다.")
@@ -576,8 +1150,10 @@ class DB:
             (now, row["id"])
         )
         self.conn.commit()
+        self._counts.invalidate()
         # self._save_and_sync("end_work")
 
+    @_write_op
     def reject_work_log(self, log_id):
         """
         작업 기록을 삭제하지 않고 'REJECTED' 상태로 변경하여 기록을 남김.
@@ -585,44 +1161,149 @@ class DB:
         sql = "UPDATE work_logs SET status = 'REJECTED' WHERE id = ?"
         self.conn.execute(sql, (log_id,))
         self.conn.commit()
+        self._counts.invalidate()
+        self.refresh_payroll_week_agg()
         self._save_and_sync("reject_work_log")
 
     def list_work_logs(self, user_id, date_from, date_to, limit=1000):
         date_from, date_to = normalize_date_range(date_from, date_to)
-        return self.conn.execute(
-            """
-            SELECT * FROM work_logs
-            WHERE user_id=? AND work_date >= ? AND work_date <= ?
-            ORDER BY work_date DESC, id DESC
-            LIMIT ?
-            """,
-            (user_id, date_from, date_to, limit)
-        ).fetchall()
+        return self.conn.execute(_LIST_WORK_LOGS_SQL, (user_id, date_from, date_to, limit)).fetchall()
 
     def list_all_work_logs(self, worker_id, date_from, date_to, limit=2000, status_filter=None):
         date_from, date_to = normalize_date_range(date_from, date_to)
-
-        sql = """
-            SELECT w.*, u.username as worker_username, u.name as worker_name
-            FROM work_logs w
-            JOIN users u ON u.id = w.user_id
-            WHERE w.work_date >= ? AND w.work_date <= ?
-        """
         params = [date_from, date_to]
 
-        if worker_id and isinstance(worker_id, int) and worker_id > 0:
-            sql += " AND w.user_id = ?"
+        by_worker = bool(worker_id and isinstance(worker_id, int) and worker_id > 0)
+        if by_worker:
             params.append(str(worker_id))
 
-        if status_filter and status_filter != "ALL":
-            sql += " AND w.status = ?"
+        by_status = bool(status_filter and status_filter != "ALL")
+        if by_status:
             params.append(status_filter)
 
-        sql += " ORDER BY w.work_date DESC, w.id DESC LIMIT ?"
         params.append(str(limit))
+        sql = _all_work_logs_sql(by_worker=by_worker, by_status=by_status)
+        return self.conn.execute(sql, tuple(params)).fetchall()
 
+    def list_all_work_logs_page(self, worker_id, date_from, date_to, status_filter=None, after=None,
+                                page_size=WORK_LOG_PAGE_SIZE):
+        """
+        list_all_work_logs 의 페이지(커서) 버전: (work_date, id) 내림차순으로 page_size 건씩.
+        after: 이전 페이지가 돌려준 커서 (work_date, id). None 이면 첫 페이지.
+        반환: (rows, next_cursor)  next_cursor 가 None 이면 마지막 페이지
+        - OFFSET 없이 (work_date, id) 위치부터 바로 찾아 들어가므로(keyset) 몇 번째 페이지든 비용이 같다.
+        """
+        date_from, date_to = normalize_date_range(date_from, date_to)
+        params = [date_from, date_to]
+
+        by_worker = bool(worker_id and isinstance(worker_id, int) and worker_id > 0)
+        if by_worker:
+            params.append(worker_id)
+
+        by_status = bool(status_filter and status_filter != "ALL")
+        if by_status:
+            params.append(status_filter)
+
+        if after is not None:
+            params.extend([after[0], int(after[1])])
+
+        params.append(int(page_size))
+        sql = _all_work_logs_sql(by_worker=by_worker, by_status=by_status, after=after is not None)
+        rows = self.conn.execute(sql, tuple(params)).fetchall()
+        next_cursor = (rows[-1]["work_date"], rows[-1]["id"]) if len(rows) == page_size else None
+        return rows, next_cursor
+
+    def list_approved_work_logs(self, date_from, date_to, user_id=None):
+        """
+        [일괄 급여 정산용] 기간 내 모든 근로자의 APPROVED 근무기록을 쿼리 1회로 조회.
+        급여 계산에 필요한 사용자 정보(시급/이름/직급)를 함께 붙이고, user_id 순으로 묶어서 반환한다.
+        user_id 를 주면 그 근로자만. (건수 제한 없음: 정산에서 잘리면 안 됨)
+        """
+        date_from, date_to = normalize_date_range(date_from, date_to)
+        params = [date_from, date_to]
+        if user_id is not None:
+            params.append(int(user_id))
+        sql = _approved_work_logs_sql(by_user=user_id is not None)
+        return self.conn.execute(sql, tuple(params)).fetchall()
+
+    def list_payroll_week_agg(self, week_from, week_to, user_id=None):
+        """week_start 가 [week_from, week_to] 인 주별 급여 집계 행 (user_id, week_start 순)"""
+        params = [week_from, week_to]
+        if user_id is not None:
+            params.append(int(user_id))
+        sql = _payroll_week_agg_sql(by_user=user_id is not None)
         return self.conn.execute(sql, tuple(params)).fetchall()
 
+    @_write_op
+    def refresh_payroll_week_agg(self):
+        """
+        dirty 표시된 주별 집계만 원본 기록으로 다시 계산한다. (바뀐 게 없으면 SELECT 1회)
+        반환: 다시 계산한 (근로자, 주) 수
+        """
+        dirty = self.conn.execute(
+            "SELECT user_id, week_start FROM payroll_week_agg WHERE dirty = 1"
+        ).fetchall()
+        if not dirty:
+            return 0
+
+        now = now_str()
+        with self.conn:
+            for r in dirty:
+                self._rebuild_week_agg(r["user_id"], r["week_start"], now)
+        return len(dirty)
+
+    def _rebuild_week_agg(self, user_id, week_start, now):
+        ws = datetime.date.fromisoformat(week_start)
+        we = ws + datetime.timedelta(days=6)
+
+        def in_week(s):
+            return bool(s) and week_start <= s[:10] <= we.isoformat()
+
+        # 시작시각이 work_date 와 며칠 어긋난 기록까지 잡도록 앞뒤 1주 여유를 두고 조회
+        rows = self.conn.execute(
+            """
+            SELECT work_date, start_time, end_time, approved_start, approved_end FROM work_logs
+            WHERE user_id = ? AND status = 'APPROVED' AND work_date >= ? AND work_date <= ?
+            """,
+            (user_id, (ws - datetime.timedelta(days=7)).isoformat(), (we + datetime.timedelta(days=7)).isoformat())
+        ).fetchall()
+
+        logs = []
+        off_week = 0
+        for r in rows:
+            log = dict(r)
+            by_start = in_week(log["approved_start"] or log["start_time"])
+            if by_start != in_week(log["work_date"]):
+                off_week += 1
+            if by_start:
+                logs.append(log)
+
+        if not logs and not off_week:
+            self.conn.execute(
+                "DELETE FROM payroll_week_agg WHERE user_id = ? AND week_start = ?", (user_id, week_start)
+            )
+            return
+
+        weeks = SalaryCalculator.aggregate_weeks(logs)
+        w = weeks[0] if weeks else {}
+        self.conn.execute(
+            """
+            UPDATE payroll_week_agg
+            SET iso_year=?, iso_week=?, work_sec=?, break_sec=?, actual_sec=?, overtime_sec=?,
+                night_sec=?, actual_hours=?, inexact_logs=?, days=?, log_count=?, first_work_date=?, last_work_date=?,
+                off_week=?, dirty=0, updated_at=?
+            WHERE user_id = ? AND week_start = ?
+            """,
+            (
+                ws.isocalendar()[0], ws.isocalendar()[1],
+                w.get("work_sec", 0), w.get("break_sec", 0), w.get("actual_sec", 0), w.get("overtime_sec", 0),
+                w.get("night_sec", 0), w.get("actual_hours", 0), w.get("inexact_logs", 0), w.get("days", 0), w.get("log_count", 0),
+                w.get("first_work_date"), w.get("last_work_date"),
+                off_week, now, user_id, week_start,
+            )
+        )
+
+    @_write_op
     def approve_work_log(self, work_log_id, owner_id, app_start, app_end, comment):
         with self.conn:
             # 1. 상태 결정 로직
@@ -641,25 +1322,57 @@ class DB:
                 """,
                 (app_start, app_end, comment, new_status, owner_id, now_str(), work_log_id)
             )
-            self._save_and_sync("approve")
+        self._counts.invalidate()
+        self.refresh_payroll_week_agg()
+        self._save_and_sync("approve")
+
+    @_write_op
+    def approve_work_logs_bulk(self, items, owner_id):
+        """
+        여러 근무 기록을 한 번에 승인 (월말 일괄 승인용)
+        items: [(work_log_id, app_start, app_end, comment), ...]
+        - 한 트랜잭션에서 executemany 로 처리하고, 동기화는 마지막에 1회만 요청한다.
+        - 상태 결정은 approve_work_log 와 동일 (확정 종료시각 있으면 APPROVED, 없으면 WORKING)
+        반환: 처리한 건수
+        """
+        now = now_str()
+        params = [
+            (app_start, app_end, comment, "APPROVED" if app_end else "WORKING", owner_id, now, int(work_log_id))
+            for work_log_id, app_start, app_end, comment in items
+        ]
+        if not params:
+            return 0
+
+        with self.conn:
+            self.conn.executemany(
+                """
+                UPDATE work_logs
+                SET approved_start=?, approved_end=?, owner_comment=?, status=?,
+                    approver_id=?, updated_at=?
+                WHERE id=?
+                """,
+                params
+            )
+        self._counts.invalidate()
+        self.refresh_payroll_week_agg()
+        self._save_and_sync(f"approve_bulk_{len(params)}")
+        return len(params)
 
     # ----------------------------------------------------------------
     # Disputes (이의 제기)
     # ----------------------------------------------------------------
+    @_write_op
     def create_dispute(self, work_log_id, user_id, dispute_type, comment):
         comment = (comment or "").strip()
         now = now_str()
 
         # disputes 테이블 컬럼 확인 (스키마 불일치 안전 처리)
-        dcols = {r[1] for r in self.conn.execute("PRAGMA table_info(disputes)").fetchall()}
+        dcols = self._table_columns("disputes")
         has_decision = ("decision_comment" in dcols)
         has_decided_by = ("decided_by" in dcols)
         has_decided_at = ("decided_at" in dcols)
 
-        row = self.conn.execute(
-            "SELECT * FROM disputes WHERE work_log_id=? AND user_id=? ORDER BY id DESC LIMIT 1",
-            (work_log_id, user_id),
-        ).fetchone()
+        row = self.conn.execute(_LATEST_DISPUTE_SQL, (work_log_id, user_id)).fetchone()
 
         if row:
             dispute_id = int(row["id"])
@@ -718,6 +1431,7 @@ class DB:
                 self.add_dispute_message(dispute_id, user_id, "worker", comment, None)
 
             self.conn.commit()
+            self._counts.invalidate()
             return dispute_id
 
         # 신규 이의제기 생성
@@ -734,52 +1448,26 @@ class DB:
             self.add_dispute_message(dispute_id, user_id, "worker", comment, None)
 
         self.conn.commit()
+        self._counts.invalidate()
         return dispute_id
 
     def list_my_disputes(self, user_id, date_from, date_to, filter_type="ACTIVE", limit=2000):
         date_from, date_to = normalize_date_range(date_from, date_to)
-        status_cond = "d.status IN ('RESOLVED','REJECTED')" if filter_type == "CLOSED" else "d.status IN ('PENDING','IN_REVIEW')"
-
         return self.conn.execute(
-            f"""
-            SELECT d.*, w.work_date, w.status as work_status
-            FROM disputes d
-            JOIN work_logs w ON w.id = d.work_log_id
-            JOIN (
-                SELECT work_log_id, MAX(id) as max_id FROM disputes WHERE user_id=? GROUP BY work_log_id
-            ) AS latest ON d.id = latest.max_id
-            WHERE d.user_id=? AND date(d.created_at) >= date(?) AND date(d.created_at) <= date(?) AND {status_cond}
-            ORDER BY d.id DESC LIMIT ?
-            """,
-            (user_id, user_id, date_from, date_to, limit)
+            _my_disputes_sql(filter_type), (user_id, date_from, date_to, limit)
         ).fetchall()
 
     def list_disputes(self, date_from, date_to, filter_type="ACTIVE", limit=1000):
         date_from, date_to = normalize_date_range(date_from, date_to)
-        status_cond = "d.status IN ('RESOLVED','REJECTED')" if filter_type == "CLOSED" else "d.status IN ('PENDING','IN_REVIEW')"
-
-        return self.conn.execute(
-            f"""
-            SELECT d.*, u.username as worker_username, w.work_date, w.start_time, w.end_time
-            FROM disputes d
-            JOIN users u ON u.id = d.user_id
-            JOIN work_logs w ON w.id = d.work_log_id
-            JOIN (
-                SELECT work_log_id, MAX(id) as max_id FROM disputes 
-                WHERE date(created_at) >= date(?) AND date(created_at) <= date(?) GROUP BY work_log_id
-            ) AS latest ON d.id = latest.max_id
-            WHERE {status_cond}
-            ORDER BY d.id DESC LIMIT ?
-            """,
-            (date_from, date_to, limit)
-        ).fetchall()
+        return self.conn.execute(_disputes_sql(filter_type), (date_from, date_to, limit)).fetchall()
 
+    @_write_op
     def resolve_dispute(self, dispute_id, owner_id, new_status, resolution_comment):
         now = now_str()
         resolution_comment = (resolution_comment or "").strip()
 
         # disputes 테이블 컬럼 확인 (스키마 불일치 안전 처리)
-        dcols = {r[1] for r in self.conn.execute("PRAGMA table_info(disputes)").fetchall()}
+        dcols = self._table_columns("disputes")
         has_resolved_at = ("resolved_at" in dcols)
         has_resolved_by = ("resolved_by" in dcols)
         has_decided_at = ("decided_at" in dcols)
@@ -817,20 +1505,26 @@ class DB:
             self.add_dispute_message(dispute_id, owner_id, "owner", resolution_comment, new_status)
         else:
             self.conn.commit()
+            self._publish_dispute_feed(dispute_id)
             self._save_and_sync("dispute_resolve")
+        self._counts.invalidate()
 
+    @_write_op
     def add_dispute_message(self, dispute_id, sender_user_id, sender_role, message, status_code=None):
         message = (message or "").strip()
         if not message:
             return
 
-        self.conn.execute(
+        cur = self.conn.execute(
             "INSERT INTO dispute_messages(dispute_id, sender_user_id, sender_role, message, status_code, created_at) "
             "VALUES(?,?,?,?,?,?)",
             (dispute_id, int(sender_user_id), str(sender_role), message, status_code, now_str())
         )
         self.conn.commit()
 
+        # ✅ 상대방 대화창이 바로 받을 수 있도록 대화 피드에 먼저 덧붙임
+        self._publish_dispute_feed(dispute_id, cur.lastrowid)
+
         # ✅ 이의제기 메시지는 즉시 서버 업로드 트리거
         self._save_and_sync("dispute_message")
 
@@ -841,7 +1535,7 @@ class DB:
         target_id = req_row["work_log_id"]
 
         # disputes 테이블 컬럼 확인 (스키마 불일치 안전 처리)
-        dcols = {r[1] for r in self.conn.execute("PRAGMA table_info(disputes)").fetchall()}
+        dcols = self._table_columns("disputes")
         has_decision = ("decision_comment" in dcols)
         has_decided_at = ("decided_at" in dcols)
 
@@ -849,16 +1543,7 @@ class DB:
         seen = set()
 
         # 1) dispute_messages(채팅 로그)가 있으면 그게 1순위
-        msgs = self.conn.execute(
-            """
-            SELECT m.*, u.username AS sender_username
-            FROM dispute_messages m
-            LEFT JOIN users u ON u.id = m.sender_user_id
-            WHERE m.dispute_id IN (SELECT id FROM disputes WHERE work_log_id=?)
-            ORDER BY m.id ASC
-            """,
-            (target_id,)
-        ).fetchall()
+        msgs = self.conn.execute(_DISPUTE_TIMELINE_SQL, (target_id,)).fetchall()
 
         for row in msgs:
             txt = (row["message"] or "").strip()
@@ -936,118 +1621,172 @@ class DB:
         events.sort(key=lambda x: x["sort_key"])
         return events
 
-        # timeclock/db.py 내 sync_dispute_thread_from_cloud 함수 전체입니다.
+    def _dispute_time_by_cols(self):
+        dcols = self._table_columns("disputes")
+        t = "resolved_at" if "resolved_at" in dcols else ("decided_at" if "decided_at" in dcols else None)
+        b = "resolved_by" if "resolved_by" in dcols else ("decided_by" if "decided_by" in dcols else None)
+        return t, b
 
-    def sync_dispute_thread_from_cloud(self, dispute_id: int):
-            """
-            클라우드 DB를 '스냅샷 다운로드'만 한 뒤,
-            dispute_messages / disputes(상태)만 로컬 DB에 merge한다.
-            - 로컬 DB 파일 교체 없음 (conn 안정)
-            - 채팅 실시간 수신용
-            """
-            try:
-                # 1. 클라우드 스냅샷 다운로드
-                temp_db_path, _remote_ts = sync_manager.download_latest_db_snapshot()
-                if not temp_db_path:
-                    return False
-
-                rconn = sqlite3.connect(str(temp_db_path))
-                rconn.row_factory = sqlite3.Row
-
-                # 로컬/원격 disputes 컬럼 목록 확인
-                lcols = {r[1] for r in self.conn.execute("PRAGMA table_info(disputes)").fetchall()}
-                rcols = {r[1] for r in rconn.execute("PRAGMA table_info(disputes)").fetchall()}
-
-                def pick_time_col(cols):
-                    return "resolved_at" if "resolved_at" in cols else ("decided_at" if "decided_at" in cols else None)
-
-                def pick_by_col(cols):
-                    return "resolved_by" if "resolved_by" in cols else ("decided_by" if "decided_by" in cols else None)
-
-                r_time = pick_time_col(rcols)
-                r_by = pick_by_col(rcols)
-                l_time = pick_time_col(lcols)
-                l_by = pick_by_col(lcols)
-
-                # 1) disputes 상태 merge
-                sel_cols = ["id", "status"]
-                if r_time:
-                    sel_cols.append(r_time)
-                if r_by:
-                    sel_cols.append(r_by)
-                if "comment" in rcols:
-                    sel_cols.append("comment")
-
-                r_dispute = rconn.execute(
-                    f"SELECT {', '.join(sel_cols)} FROM disputes WHERE id=?",
-                    (int(dispute_id),)
-                ).fetchone()
-
-                if r_dispute:
-                    sets = ["status=?"]
-                    params = [r_dispute["status"]]
-
-                    if l_time and r_time:
-                        sets.append(f"{l_time}=?")
-                        params.append(r_dispute[r_time])
-                    if l_by and r_by:
-                        sets.append(f"{l_by}=?")
-                        params.append(r_dispute[r_by])
+    def _id_by_uid(self, table, uid):
+        """동기화 uid → 이 DB의 로컬 id (없으면 None)"""
+        if not uid:
+            return None
+        r = self.conn.execute(f"SELECT id FROM {table} WHERE uid=?", (uid,)).fetchone()
+        return r["id"] if r else None
 
-                    if "comment" in lcols and "comment" in rcols:
-                        sets.append("comment=?")
-                        params.append(r_dispute["comment"])
+    def _publish_dispute_feed(self, dispute_id, message_id=None):
+        """
+        대화방 실시간 수신용 피드(sync_manager.append_dispute_feed)에
+        현재 이의제기 상태(+방금 쓴 메시지)를 덧붙인다. 업로드는 FeedUploader 스레드에서.
+        """
+        try:
+            records = []
+            d = self.conn.execute("SELECT * FROM disputes WHERE id=?", (int(dispute_id),)).fetchone()
+            if d:
+                t_col, b_col = self._dispute_time_by_cols()
+                by_uid = None
+                if b_col and d[b_col] is not None:
+                    u = self.conn.execute("SELECT uid FROM users WHERE id=?", (d[b_col],)).fetchone()
+                    by_uid = u["uid"] if u else None
+                records.append({
+                    "kind": "status",
+                    "dispute_uid": d["uid"],
+                    "status": d["status"],
+                    "at": d[t_col] if t_col else None,
+                    "by_uid": by_uid,
+                    "comment": d["comment"] if "comment" in d.keys() else None,
+                })
+            if message_id:
+                m = self.conn.execute(
+                    "SELECT m.id, m.uid, u.uid AS sender_uid, m.sender_role, m.message, m.status_code, m.created_at "
+                    "FROM dispute_messages m LEFT JOIN users u ON u.id = m.sender_user_id WHERE m.id=?",
+                    (int(message_id),)
+                ).fetchone()
+                if m:
+                    records.append({"kind": "msg", **dict(m)})
+            if not d:
+                return
 
-                    params.append(int(dispute_id))
-                    self.conn.execute(
-                        "UPDATE disputes SET " + ", ".join(sets) + " WHERE id=?",
-                        tuple(params)
-                    )
+            dispute_uid = d["uid"]
+            if not self._feeds.submit(lambda: sync_manager.append_dispute_feed(dispute_uid, records)):
+                print(f"⚠️ [Feed] 업로드 대기가 밀려 이번 피드는 건너뜀 (dispute_uid={dispute_uid})")
+        except Exception as e:
+            logging.error(f"_publish_dispute_feed failed: {e}")
 
-                # 2) 메시지 merge: id(PK) 기준 INSERT OR IGNORE
-                rows = rconn.execute(
-                    "SELECT id, dispute_id, sender_user_id, sender_role, message, status_code, created_at "
-                    "FROM dispute_messages WHERE dispute_id=? ORDER BY id ASC",
-                    (int(dispute_id),)
-                ).fetchall()
+    def sync_dispute_thread_from_cloud(self, dispute_id: int):
+        """
+        상대방이 올린 대화 피드에서 새 레코드만 받아 로컬 DB에 merge한다.
+        - DB 전체를 내려받지 않음 (변경 없으면 메타데이터 조회만, 0바이트)
+        - 로컬 DB 파일 교체 없음 (conn 안정)
+        - 채팅 실시간 수신용
+        - 네트워크 조회는 호출 스레드에서, merge 만 쓰기 스레드에서 실행한다.
+        - 읽은 위치는 dispute_feed_state 에 merge 와 같은 트랜잭션으로 저장한다.
+        반환: 로컬에 변경이 생겼으면 True
+        """
+        try:
+            d = self.conn.execute("SELECT uid FROM disputes WHERE id=?", (int(dispute_id),)).fetchone()
+            if not d:
+                return False
+            state = {
+                r["file_id"]: {"offset": r["read_offset"], "tail": bytes(r["tail"] or b""), "last_id": r["last_id"]}
+                for r in self.conn.execute(
+                    "SELECT file_id, read_offset, tail, last_id FROM dispute_feed_state WHERE dispute_uid=?",
+                    (d["uid"],)
+                )
+            }
+            records, feed_state = sync_manager.fetch_dispute_feed(d["uid"], state)
+        except Exception as e:
+            logging.error(f"sync_dispute_thread_from_cloud failed: {e}")
+            return False
+        if not records and not feed_state:
+            return False
+        return self._merge_dispute_feed(dispute_id, records, d["uid"], feed_state)
 
-                inserted = 0
-                for r in rows:
+    @_write_op
+    def _merge_dispute_feed(self, dispute_id: int, records: list, dispute_uid: str = None, feed_state: dict = None) -> bool:
+        try:
+            l_time, l_by = self._dispute_time_by_cols()
+            has_comment = "comment" in self._table_columns("disputes")
+
+            # 피드 반영은 이미 클라우드에 있는 내용이므로 변경 로그(델타)로 다시 올리지 않는다.
+            echo_from = self.conn.execute("SELECT IFNULL(MAX(seq), 0) FROM sync_changes").fetchone()[0]
+
+            # 상태는 가장 나중에 바뀐 값 1건만 반영 (중간 이력은 의미 없음, 여러 PC 피드가 섞여 있을 수 있음)
+            status_recs = [r for r in records if r.get("kind") == "status"]
+            last_status = max(status_recs, key=lambda r: r.get("at") or "") if status_recs else None
+
+            changed = 0
+            for rec in records:
+                kind = rec.get("kind")
+                if kind == "status" and rec is not last_status:
+                    continue
+
+                # 1) 메시지 merge: uid 기준 INSERT OR IGNORE (로컬 id 는 새로 부여)
+                if kind == "msg":
+                    sender_id = self._id_by_uid("users", rec.get("sender_uid"))
+                    if not rec.get("uid") or sender_id is None:
+                        continue
                     cur = self.conn.execute(
-                        "INSERT OR IGNORE INTO dispute_messages(id, dispute_id, sender_user_id, sender_role, message, status_code, created_at) "
+                        "INSERT OR IGNORE INTO dispute_messages(uid, dispute_id, sender_user_id, sender_role, message, status_code, created_at) "
                         "VALUES(?,?,?,?,?,?,?)",
-                        (r["id"], r["dispute_id"], r["sender_user_id"], r["sender_role"], r["message"],
-                         r["status_code"],
-                         r["created_at"])
+                        (rec.get("uid"), int(dispute_id), sender_id, rec.get("sender_role"),
+                         rec.get("message"), rec.get("status_code"), rec.get("created_at"))
                     )
                     if cur.rowcount and cur.rowcount > 0:
-                        inserted += 1
-
-                self.conn.commit()
-
-                # ✅ [핵심 수정] 병합 성공 시, 클라우드 시각 마커를 갱신하여 내 컴퓨터가 최신임을 선언합니다.
-                if _remote_ts and _remote_ts > 0:
-                    sync_manager._save_last_sync_ts(_remote_ts)
-
-                try:
-                    rconn.close()
-                except Exception:
-                    pass
+                        changed += 1
+
+                # 2) disputes 상태 merge: 로컬 상태보다 나중에 바뀐 경우만
+                #    (피드를 처음부터 다시 읽어도 오래된 상태로 되돌아가지 않도록)
+                elif kind == "status":
+                    at = rec.get("at")
+                    if not l_time or not at:
+                        continue
+                    before = self.conn.execute(
+                        f"SELECT status, {l_time} AS at FROM disputes WHERE id=?", (int(dispute_id),)
+                    ).fetchone()
+                    if not before or (before["at"] and before["at"] >= at):
+                        continue
 
-                try:
-                    temp_db_path.unlink(missing_ok=True)
-                except Exception:
-                    pass
+                    sets = ["status=?"]
+                    params = [rec.get("status")]
+                    if l_time:
+                        sets.append(f"{l_time}=?")
+                        params.append(rec.get("at"))
+                    if l_by:
+                        sets.append(f"{l_by}=?")
+                        params.append(self._id_by_uid("users", rec.get("by_uid")))
+                    if has_comment and rec.get("comment") is not None:
+                        sets.append("comment=?")
+                        params.append(rec.get("comment"))
 
-                return inserted > 0
+                    params.append(int(dispute_id))
+                    self.conn.execute("UPDATE disputes SET " + ", ".join(sets) + " WHERE id=?", tuple(params))
+                    if before["status"] != rec.get("status"):
+                        changed += 1
+
+            self.conn.execute("DELETE FROM sync_changes WHERE seq > ?", (echo_from,))
+            now = now_str()
+            for file_id, st in (feed_state or {}).items():
+                self.conn.execute(
+                    "INSERT INTO dispute_feed_state(file_id, dispute_uid, read_offset, tail, last_id, updated_at) "
+                    "VALUES(?,?,?,?,?,?) ON CONFLICT(file_id) DO UPDATE SET "
+                    "read_offset=excluded.read_offset, tail=excluded.tail, last_id=excluded.last_id, "
+                    "updated_at=excluded.updated_at",
+                    (file_id, dispute_uid, int(st["offset"]), st["tail"], int(st["last_id"]), now)
+                )
+            self.conn.commit()
+            if changed:
+                self._counts.invalidate()
+            return changed > 0
 
-            except Exception as e:
-                logging.error(f"sync_dispute_thread_from_cloud failed: {e}")
-                return False
+        except Exception as e:
+            logging.error(f"sync_dispute_thread_from_cloud failed: {e}")
+            return False
 
     # ----------------------------------------------------------------
     # Signup / Audit / Export
     # ----------------------------------------------------------------
+    @_write_op
     def create_signup_request(self, username, pw_hash, name, phone, birth, email=None, account=None, address=None):
         with self.conn:
             self.conn.execute(
@@ -1055,6 +1794,7 @@ class DB:
                 (username, pw_hash, name, phone, birth, email, account, address,
                  datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
             )
+        self._counts.invalidate()
         self._save_and_sync("signup_request")
 
     def is_username_available(self, username):
@@ -1066,9 +1806,9 @@ class DB:
         return True
 
     def list_pending_signup_requests(self, limit=1000):
-        return self.conn.execute("SELECT * FROM signup_requests WHERE status='PENDING' ORDER BY id ASC LIMIT ?",
-                                 (limit,)).fetchall()
+        return self.conn.execute(_PENDING_SIGNUPS_SQL, (limit,)).fetchall()
 
+    @_write_op
     def approve_signup_request(self, request_id, owner_id, comment):
         sr = self.conn.execute("SELECT * FROM signup_requests WHERE id=?", (request_id,)).fetchone()
         if not sr or sr["status"] != "PENDING": raise ValueError("처리할 수 없는 요청입니다.")
@@ -1084,15 +1824,19 @@ class DB:
             self.conn.execute(
                 "UPDATE signup_requests SET status='APPROVED', decided_at=?, decided_by=?, decision_comment=? WHERE id=?",
                 (now_str(), owner_id, comment, request_id))
+        self._counts.invalidate()
         self._save_and_sync("signup_approve")
 
+    @_write_op
     def reject_signup_request(self, request_id, owner_id, comment=""):
         self.conn.execute(
             "UPDATE signup_requests SET status='REJECTED', decided_at=?, decided_by=?, decision_comment=? WHERE id=?",
             (now_str(), owner_id, comment, request_id))
         self.conn.commit()
+        self._counts.invalidate()
         self._save_and_sync("reject_signup")
 
+    @_write_op
     def log_audit(self, action, actor_user_id=None, target_type=None, target_id=None, detail=None):
         dj = json.dumps(detail, ensure_ascii=False) if detail else None
         self.conn.execute(
@@ -1130,8 +1874,7 @@ class DB:
 
     def backup_db_copy(self, out_path: Path):
         self.conn.commit()
-        out_path.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(self.db_path, out_path)
+        backup_manager.snapshot_db(out_path, src_path=self.db_path)
 
     # ----------------------------------------------------------------
     # [신규] 대기 중인 항목 개수 조회 (배지 알림용)
@@ -1139,63 +1882,81 @@ class DB:
     def get_pending_counts(self):
         """
         근무승인대기, 이의제기진행중, 가입승인대기 건수를 딕셔너리로 반환
+        - 세 건수를 한 문장(_PENDING_COUNTS_SQL)으로 세고, 건수를 바꾸는 쓰기가 있을 때까지 메모리 값 재사용
         """
-        # 1. 근무 승인 대기 (PENDING 상태)
-        cnt_work = self.conn.execute(
-            "SELECT COUNT(*) FROM work_logs WHERE status='PENDING'"
-        ).fetchone()[0]
-
-        # 2. 이의제기 진행 중 (PENDING 또는 IN_REVIEW)
-        cnt_dispute = self.conn.execute(
-            "SELECT COUNT(*) FROM disputes WHERE status IN ('PENDING', 'IN_REVIEW')"
-        ).fetchone()[0]
-
-        # 3. 가입 승인 대기 (PENDING)
-        cnt_signup = self.conn.execute(
-            "SELECT COUNT(*) FROM signup_requests WHERE status='PENDING'"
-        ).fetchone()[0]
-
-        return {"work": cnt_work, "dispute": cnt_dispute, "signup": cnt_signup}
-
+        def load():
+            row = self.conn.execute(_PENDING_COUNTS_SQL).fetchone()
+            return {"work": row["work"], "dispute": row["dispute"], "signup": row["signup"]}
 
+        return self._counts.get(load)
 
     def get_user_by_id(self, user_id: int):
         row = self.conn.execute("SELECT * FROM users WHERE id=?", (user_id,)).fetchone()
         return dict(row) if row else None
 
-    def close_connection(self):
-        """DB 연결 해제 (파일 덮어쓰기 전 필수)"""
-        if self.conn:
-            try:
-                self.conn.close()
-            except Exception:
-                pass
-            self.conn = None
+    def sync_from_cloud(self):
+        """
+        클라우드 최신 DB 반영 (UI 공용, 연결을 닫고 다시 여는 대신)
+        - 기준본이 그대로면 변경분(델타)만 반영한다.
+        - 기준본이 바뀌었으면 받은 파일을 apply_snapshot()으로 열린 연결에 복사한다.
+        어느 쪽이든 연결을 닫지 않는다.
+        반환: (ok, msg)
+        """
+        return sync_manager.download_latest_db(self)
 
-    def reconnect(self):
-        """DB 다시 연결 (파일 덮어쓴 후 필수)"""
+    @_write_op
+    def apply_snapshot(self, path):
+        """
+        다운로드한 스냅샷 DB를 열린 연결에 SQLite 백업 API로 복사한다. (핫스왑)
+        - 파일을 교체하지 않으므로 다른 스레드의 연결을 닫을 필요가 없고, Windows 파일 잠금과도 무관하다.
+        - 복사는 한 번에(pages=-1) 진행되어 쓰기 잠금을 잡는 구간이 짧다.
+          그동안 다른 연결의 쓰기는 busy timeout 안에서 대기하고, 읽기는 WAL 스냅샷으로 계속된다.
+        - 손상된 스냅샷은 적용하지 않는다. (quick_check 실패 시 sqlite3.DatabaseError)
+        - 이 PC의 아직 올리지 않은 변경은 복사 전에 델타로 빼 두었다가(_local_changes_path) 새 기준본 위에 다시 쓴다.
+          (변경 로그도 다시 쌓여 다음 업로드 때 전송된다)
+        - 복사 후 남은 변경 로그는 기준본에 딸려온(다른 PC의) 것이므로 이 PC가 다시 올리지 않도록 비운다.
+        """
+        src = sqlite3.connect(str(path), timeout=30)
         try:
-            from timeclock import sync_manager
-            sync_manager.apply_pending_db_if_exists()
-        except Exception:
-            pass
+            chk = src.execute("PRAGMA quick_check").fetchone()
+            if not chk or chk[0] != "ok":
+                raise sqlite3.DatabaseError(f"스냅샷 무결성 검사 실패: {chk[0] if chk else 'unknown'}")
 
-        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+            local, _max_seq = delta_sync.export_delta(self.conn)
+            if local:
+                self._local_changes_path().write_text(json.dumps(local, ensure_ascii=False), encoding="utf-8")
 
-        try:
-            self.conn.execute("PRAGMA foreign_keys = ON;")
-            self.conn.execute("PRAGMA journal_mode = WAL;")
-            self.conn.commit()
-        except Exception:
-            pass
+            src.backup(self.conn, pages=-1)
+        finally:
+            src.close()
 
-    def ensure_connection(self):
-        """
-        UI(사업주/근로자)에서 동기화 버튼을 누르면 close_connection()으로 conn이 None이 될 수 있다.
-        이때 대화방 등 다른 화면이 같은 DB 인스턴스를 공유하면 NoneType.execute가 터진다.
-        모든 DB 작업 직전에 이 함수로 연결을 보장한다.
-        """
-        if self.conn is None:
-            self.reconnect()
+        self._counts.invalidate()
+
+        # 스냅샷이 구버전 스키마일 수 있음 (최신이면 user_version 조회 1회로 끝)
+        self._migrate()
+        self._load_schema_cache()
+
+        self.conn.execute("DELETE FROM sync_changes")
+        self.conn.commit()
+
+        self._replay_local_changes()
+
+    def _local_changes_path(self) -> Path:
+        """기준본 교체 중 보관하는 이 PC의 미전송 변경 (교체 도중 종료돼도 다음 실행 때 다시 반영)"""
+        p = Path(self.db_path)
+        return p.with_name(p.name + ".local_changes.json")
+
+    @_write_op
+    def _replay_local_changes(self):
+        """apply_snapshot 이 빼 둔 미전송 변경을 현재 DB에 다시 쓴다. 반환: 반영한 변경 수"""
+        p = self._local_changes_path()
+        if not p.exists():
+            return 0
+        delta = json.loads(p.read_text(encoding="utf-8"))
+        delta_sync.apply_delta(self.conn, None, delta, replay=True)
+        self._counts.invalidate()
+        p.unlink(missing_ok=True)
+        n = len(delta.get("changes") or [])
+        print(f"♻️ [DB] 기준본 교체 전 미전송 변경 {n}건 다시 반영")
+        return n
 
@@ -0,0 +1,405 @@
+# timeclock/delta_sync.py
+# -*- coding: utf-8 -*-
+"""
+행(row) 단위 델타 동기화 (DB 측)
+
+- 변경 가능한 테이블마다 AFTER INSERT/UPDATE/DELETE 트리거가 sync_changes 에 (테이블, id, uid, 작업)을 쌓는다.
+- export_delta_file(): 마지막 동기화 이후 바뀐 행의 '현재 상태'만 JSON 델타 파일로 만든다.
+- ack_delta(): 업로드 성공 후 내보낸 변경분을 지우고, 델타 이름을 적용 완료 목록에 기록한다.
+- apply_delta(): 다른 PC가 올린 델타를 uid 기준 UPDATE/INSERT/DELETE 로 한 트랜잭션에 반영한다.
+
+행 식별:
+- 로컬 id(AUTOINCREMENT)는 PC마다 따로 증가하므로 두 PC가 동시에 추가하면 같은 id 가 생긴다.
+  그래서 동기화 대상 행마다 전역 고유 uid 를 두고, 델타는 uid 로 행을 찾는다.
+  다른 행을 가리키는 컬럼(user_id, work_log_id ...)도 대상 행의 uid 로 보내고 받는 쪽에서 로컬 id 로 바꾼다.
+- 이 PC에 아직 올리지 않은 변경이 있는 행을 상대 델타가 바꾸려 하면 덮어쓰지 않고
+  sync_conflicts 에 양쪽 내용을 기록한다. (로컬 변경이 다음 델타로 올라가 상대 PC에도 반영됨)
+
+구글 드라이브 업로드/목록/압축(compaction)은 sync_manager 가 담당한다.
+"""
+import json
+import uuid
+import logging
+import sqlite3
+import datetime
+from pathlib import Path
+
+from timeclock.settings import DATA_DIR
+
+DELTA_FORMAT = 2
+DELTA_PREFIX = "delta_"
+
+# 동기화 대상 테이블 (부모 → 자식 순서. 삭제는 역순으로 적용)
+SYNC_TABLES = ["users", "work_logs", "disputes", "dispute_messages", "signup_requests"]
+
+# 다른 동기화 테이블의 행을 가리키는 컬럼 → 대상 테이블 (델타에는 대상 행의 uid 로 싣는다)
+SYNC_REFS = {
+    "work_logs": {"user_id": "users", "approved_by": "users", "approver_id": "users"},
+    "disputes": {"work_log_id": "work_logs", "user_id": "users", "decided_by": "users", "resolved_by": "users"},
+    "dispute_messages": {"dispute_id": "disputes", "sender_user_id": "users"},
+    "signup_requests": {"decided_by": "users"},
+}
+
+DEVICE_ID_FILE = DATA_DIR / "device_id.txt"
+
+
+def _now():
+    return datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def get_device_id() -> str:
+    """
+    이 PC의 델타 파일 식별자.
+    DB 파일은 클라우드 기준본으로 통째로 교체될 수 있으므로 DB 밖(app_data)에 보관한다.
+    """
+    try:
+        if DEVICE_ID_FILE.exists():
+            s = DEVICE_ID_FILE.read_text(encoding="utf-8").strip()
+            if s:
+                return s
+        s = uuid.uuid4().hex[:8]
+        DEVICE_ID_FILE.parent.mkdir(parents=True, exist_ok=True)
+        DEVICE_ID_FILE.write_text(s, encoding="utf-8")
+        return s
+    except Exception:
+        return "local"
+
+
+def install_schema(cur):
+    """
+    변경 로그 / 충돌 기록 테이블 + uid 컬럼 + 트리거 생성 (idempotent)
+    DB 마이그레이션 단계(v3, v6)에서만 호출한다. (apply_delta 는 최신 스키마로 열린 DB를 전제로 함)
+    """
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            tbl TEXT NOT NULL,
+            row_id INTEGER NOT NULL,
+            op TEXT NOT NULL,
+            changed_at TEXT NOT NULL
+        )
+        """
+    )
+    if "row_uid" not in _table_columns(cur, "sync_changes"):
+        cur.execute("ALTER TABLE sync_changes ADD COLUMN row_uid TEXT")
+
+    # 이 DB에 이미 반영된 델타 목록 (내가 올린 것 + 받아서 적용한 것)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_applied_deltas (
+            name TEXT PRIMARY KEY,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+    # 상대 델타를 그대로 반영하지 못한 행 (양쪽 동시 수정 / 부모 행 없음 / 제약 위반)
+    cur.execute(
+        """
+        CREATE TABLE IF NOT EXISTS sync_conflicts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            delta_name TEXT,
+            tbl TEXT NOT NULL,
+            row_uid TEXT,
+            reason TEXT NOT NULL,
+            local_row TEXT,
+            remote_row TEXT,
+            created_at TEXT NOT NULL
+        )
+        """
+    )
+
+    for t in SYNC_TABLES:
+        # v1 트리거(uid 없이 id 만 기록)는 교체 (아래 uid 채우기가 변경 로그에 남지 않도록 먼저 제거)
+        for suffix in ("ins", "upd", "del"):
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_sync_{t}_{suffix}")
+
+        # uid: 새 행은 트리거가 무작위 값으로 채운다.
+        # 기존 행은 'L<id>' (같은 기준본에서 출발한 PC끼리는 같은 값이 되도록 결정적으로)
+        if "uid" not in _table_columns(cur, t):
+            cur.execute(f"ALTER TABLE {t} ADD COLUMN uid TEXT")
+        cur.execute(f"UPDATE {t} SET uid = 'L' || id WHERE uid IS NULL")
+        cur.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{t}_uid ON {t}(uid)")
+        cur.execute(
+            f"""
+            CREATE TRIGGER IF NOT EXISTS trg_uid_{t} AFTER INSERT ON {t}
+            WHEN NEW.uid IS NULL
+            BEGIN
+                UPDATE {t} SET uid = lower(hex(randomblob(16))) WHERE id = NEW.id;
+            END
+            """
+        )
+
+        for suffix, event, ref, op in (
+            ("ins", "INSERT", "NEW", "I"),
+            ("upd", "UPDATE", "NEW", "U"),
+            ("del", "DELETE", "OLD", "D"),
+        ):
+            cur.execute(
+                f"""
+                CREATE TRIGGER IF NOT EXISTS trg_sync2_{t}_{suffix} AFTER {event} ON {t}
+                BEGIN
+                    INSERT INTO sync_changes (tbl, row_id, row_uid, op, changed_at)
+                    VALUES ('{t}', {ref}.id, {ref}.uid, '{op}', strftime('%Y-%m-%d %H:%M:%f', 'now'));
+                END
+                """
+            )
+
+
+def _table_columns(conn, table):
+    return [r[1] for r in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _uid_of(conn, tbl, row_id):
+    if row_id is None:
+        return None
+    r = conn.execute(f"SELECT uid FROM {tbl} WHERE id=?", (row_id,)).fetchone()
+    return r[0] if r else None
+
+
+def _id_of(conn, tbl, uid):
+    if uid is None:
+        return None
+    r = conn.execute(f"SELECT id FROM {tbl} WHERE uid=?", (uid,)).fetchone()
+    return r[0] if r else None
+
+
+def export_delta(conn):
+    """
+    sync_changes 에 쌓인 변경분을 델타 dict 로 만든다.
+    같은 행이 여러 번 바뀌었으면 현재 상태 1건으로 합친다.
+    행은 uid 로, 다른 행을 가리키는 컬럼은 refs 에 대상 행의 uid 로 싣는다. (로컬 id 는 보내지 않음)
+    반환: (delta_dict, max_seq)  / 변경 없으면 (None, 0)
+    """
+    rows = conn.execute("SELECT seq, tbl, row_id, row_uid FROM sync_changes ORDER BY seq").fetchall()
+    if not rows:
+        return None, 0
+
+    max_seq = rows[-1][0]
+    touched = {}
+    last_uid = {}
+    for _seq, tbl, row_id, row_uid in rows:
+        touched.setdefault(tbl, set()).add(int(row_id))
+        if row_uid:
+            last_uid[(tbl, int(row_id))] = row_uid
+
+    changes = []
+    for tbl in SYNC_TABLES:
+        ids = touched.get(tbl)
+        if not ids:
+            continue
+        cols = _table_columns(conn, tbl)
+        refs_map = SYNC_REFS.get(tbl, {})
+        for row_id in sorted(ids):
+            r = conn.execute(f"SELECT * FROM {tbl} WHERE id=?", (row_id,)).fetchone()
+            if r is None:
+                uid = last_uid.get((tbl, row_id))
+                if uid:
+                    changes.append({"table": tbl, "op": "D", "uid": uid})
+                continue
+
+            row = dict(zip(cols, tuple(r)))
+            row.pop("id", None)
+            uid = row.pop("uid", None)
+            refs = {col: _uid_of(conn, parent, row.pop(col)) for col, parent in refs_map.items() if col in row}
+            changes.append({"table": tbl, "op": "U", "uid": uid, "row": row, "refs": refs})
+
+    delta = {
+        "format": DELTA_FORMAT,
+        "device": get_device_id(),
+        "created_at": _now(),
+        "changes": changes,
+    }
+    return delta, max_seq
+
+
+def make_delta_name() -> str:
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    return f"{DELTA_PREFIX}{ts}_{get_device_id()}.json"
+
+
+def export_delta_file(conn, out_dir: Path):
+    """
+    export_delta() 결과를 out_dir 에 JSON 파일로 저장.
+    반환: (path, name, max_seq) / 변경 없으면 (None, None, 0)
+    """
+    delta, max_seq = export_delta(conn)
+    if not delta:
+        return None, None, 0
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    name = make_delta_name()
+    path = out_dir / name
+    path.write_text(json.dumps(delta, ensure_ascii=False), encoding="utf-8")
+    return path, name, max_seq
+
+
+def ack_delta(conn, name, max_seq: int) -> None:
+    """
+    업로드 성공 후 호출. (앱 DB면 DB.run_write 로 쓰기 스레드에서)
+    - max_seq 까지의 변경 로그 삭제 (그 뒤에 생긴 변경은 다음 델타로 나감)
+    - 델타 이름을 적용 완료 목록에 기록 (compaction 시 기준본에 포함된 델타 판별용)
+      (기준본을 통째로 올린 경우처럼 델타 파일이 없으면 name=None)
+    """
+    with conn:
+        conn.execute("DELETE FROM sync_changes WHERE seq <= ?", (int(max_seq),))
+        if name:
+            conn.execute(
+                "INSERT OR IGNORE INTO sync_applied_deltas (name, applied_at) VALUES (?, ?)",
+                (name, _now()),
+            )
+
+
+def applied_delta_names(conn) -> set:
+    try:
+        return {r[0] for r in conn.execute("SELECT name FROM sync_applied_deltas").fetchall()}
+    except sqlite3.OperationalError:
+        return set()
+
+
+def _upgrade_v1_change(c: dict) -> dict:
+    """
+    format 1 (로컬 id 기준) 델타 → format 2 형태로 변환.
+    v1 델타를 만든 PC의 행은 기준본에서 온 것이라고 보고 uid 를 'L<id>' 로 맞춘다.
+    """
+    tbl = c.get("table")
+    if c.get("op") == "D":
+        return {"table": tbl, "op": "D", "uid": f"L{c.get('id')}"}
+    row = dict(c.get("row") or {})
+    row_id = row.pop("id", None)
+    refs = {}
+    for col in SYNC_REFS.get(tbl, {}):
+        if col in row:
+            v = row.pop(col)
+            refs[col] = None if v is None else f"L{v}"
+    return {"table": tbl, "op": "U", "uid": f"L{row_id}", "row": row, "refs": refs}
+
+
+def _row_json(conn, tbl, row_id):
+    r = conn.execute(f"SELECT * FROM {tbl} WHERE id=?", (row_id,)).fetchone()
+    if r is None:
+        return None
+    return json.dumps(dict(zip(_table_columns(conn, tbl), tuple(r))), ensure_ascii=False, default=str)
+
+
+def _record_conflict(cur, name, tbl, uid, reason, local_row=None, remote=None):
+    cur.execute(
+        """
+        INSERT INTO sync_conflicts (delta_name, tbl, row_uid, reason, local_row, remote_row, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+        (
+            name, tbl, uid, reason, local_row,
+            json.dumps(remote, ensure_ascii=False, default=str) if remote is not None else None,
+            _now(),
+        ),
+    )
+    logging.warning(f"[SYNC] 충돌 기록: {tbl} uid={uid} ({reason}) delta={name}")
+
+
+def apply_delta(conn, name: str, delta: dict, replay: bool = False) -> bool:
+    """
+    다른 PC의 델타를 한 트랜잭션으로 반영한다.
+    - 행은 uid 로 찾는다. 있으면 로컬 id 그대로 UPDATE, 없으면 새 로컬 id 로 INSERT.
+    - refs(다른 행을 가리키는 컬럼)는 대상 행의 uid → 로컬 id 로 바꿔 넣는다.
+    - 덮어쓰지 않고 sync_conflicts 에 기록만 하는 경우:
+        both_changed   : 이 PC에 아직 올리지 않은 변경이 있는 행 (로컬 변경이 다음 델타로 올라감)
+        missing_parent : 가리키는 행이 이 DB에 없음
+        constraint     : UNIQUE 등 제약 위반 (예: 두 PC에서 같은 아이디로 가입)
+    - 로컬에 없는 컬럼은 무시 (구버전 스키마 호환)
+    - 반영 중 트리거가 남긴 변경 로그는 되돌려 다시 업로드되지 않게 한다.
+    - replay=True: 기준본 교체 전에 export_delta 로 빼 둔 이 PC의 미전송 변경을 새 기준본 위에 다시 쓴다.
+      (변경 로그를 남겨 다음 업로드 때 전송, 적용 완료 목록에는 기록하지 않음)
+    반환: 새로 적용했으면 True, 이미 적용된 델타면 False
+    """
+    if not replay and name in applied_delta_names(conn):
+        return False
+    fmt = int(delta.get("format") or 0)
+    if fmt not in (1, DELTA_FORMAT):
+        raise ValueError(f"지원하지 않는 델타 형식: {delta.get('format')}")
+
+    changes = delta.get("changes") or []
+    if fmt == 1:
+        changes = [_upgrade_v1_change(c) for c in changes]
+
+    order = {t: i for i, t in enumerate(SYNC_TABLES)}
+    changes = [c for c in changes if c.get("table") in order and c.get("uid")]
+    upserts = sorted((c for c in changes if c.get("op") != "D"), key=lambda c: order[c["table"]])
+    deletes = sorted((c for c in changes if c.get("op") == "D"), key=lambda c: -order[c["table"]])
+
+    cur = conn.cursor()
+    cur.execute("BEGIN IMMEDIATE")
+    try:
+        cur.execute("PRAGMA defer_foreign_keys = ON")
+        echo_from = cur.execute("SELECT IFNULL(MAX(seq), 0) FROM sync_changes").fetchone()[0]
+        pending = set() if replay else {
+            (t, u) for t, u in cur.execute("SELECT tbl, row_uid FROM sync_changes WHERE row_uid IS NOT NULL").fetchall()
+        }
+
+        local_cols = {}
+        for c in upserts:
+            tbl, uid = c["table"], c["uid"]
+            if tbl not in local_cols:
+                local_cols[tbl] = set(_table_columns(conn, tbl)) - {"id", "uid"}
+            row = {k: v for k, v in (c.get("row") or {}).items() if k in local_cols[tbl]}
+
+            missing = None
+            for col, puid in (c.get("refs") or {}).items():
+                parent = SYNC_REFS.get(tbl, {}).get(col)
+                if parent is None or col not in local_cols[tbl]:
+                    continue
+                pid = _id_of(cur, parent, puid)
+                if puid is not None and pid is None:
+                    missing = col
+                    break
+                row[col] = pid
+            if missing:
+                _record_conflict(cur, name, tbl, uid, f"missing_parent:{missing}", remote=c)
+                continue
+
+            local_id = _id_of(cur, tbl, uid)
+            if local_id is not None and (tbl, uid) in pending:
+                _record_conflict(cur, name, tbl, uid, "both_changed", _row_json(cur, tbl, local_id), c)
+                continue
+
+            cols = list(row.keys())
+            try:
+                if local_id is not None:
+                    if cols:
+                        cur.execute(
+                            f"UPDATE {tbl} SET {', '.join(f'{k}=?' for k in cols)} WHERE id=?",
+                            tuple(row[k] for k in cols) + (local_id,),
+                        )
+                else:
+                    cur.execute(
+                        f"INSERT INTO {tbl} ({', '.join(cols + ['uid'])}) VALUES ({', '.join('?' for _ in cols)}, ?)",
+                        tuple(row[k] for k in cols) + (uid,),
+                    )
+            except sqlite3.IntegrityError as e:
+                _record_conflict(
+                    cur, name, tbl, uid, f"constraint:{e}",
+                    _row_json(cur, tbl, local_id) if local_id is not None else None, c,
+                )
+
+        for c in deletes:
+            tbl, uid = c["table"], c["uid"]
+            local_id = _id_of(cur, tbl, uid)
+            if local_id is None:
+                continue
+            if (tbl, uid) in pending:
+                _record_conflict(cur, name, tbl, uid, "both_changed", _row_json(cur, tbl, local_id), c)
+                continue
+            cur.execute(f"DELETE FROM {tbl} WHERE id=?", (local_id,))
+
+        if not replay:
+            cur.execute("DELETE FROM sync_changes WHERE seq > ?", (echo_from,))
+            cur.execute(
+                "INSERT OR IGNORE INTO sync_applied_deltas (name, applied_at) VALUES (?, ?)",
+                (name, _now()),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return True
+
@@ -215,7 +215,94 @@ def create_default_template(save_path):
 
 
 
-# generate_payslip 함수는 기존과 동일하게 유지해도 됩니다.
+# ----------------------------------------------------------------
+# 템플릿 컴파일 (치환 위치 캐시)
+# - 템플릿을 한 번만 훑어서 {{키}} 가 들어 있는 셀 위치를 기록해 둔다. (정규식 1개)
+# - (경로, 수정시각) 이 같으면 다시 훑지 않는다 → 명세서 발급은 알려진 셀만 채운다.
+# ----------------------------------------------------------------
+_PLACEHOLDER_RE = re.compile(r"\{\{\s*(.*?)\s*\}\}")
+
+# {(절대경로, mtime_ns, size): [(좌표, 원문, [키, ...], 셀 전체가 키 하나인지), ...]}
+_PLAN_CACHE = {}
+
+
+def compile_template(template_path):
+    """템플릿 첫 시트의 치환 위치 목록 (캐시)"""
+    st = os.stat(template_path)
+    cache_key = (os.path.abspath(template_path), st.st_mtime_ns, st.st_size)
+    plan = _PLAN_CACHE.get(cache_key)
+    if plan is not None:
+        return plan
+
+    wb = openpyxl.load_workbook(template_path)
+    try:
+        ws = wb.active
+        plan = []
+        for row in ws.iter_rows():
+            for cell in row:
+                if not isinstance(cell.value, str) or "{{" not in cell.value:
+                    continue
+                text = cell.value
+                keys = list(dict.fromkeys(_PLACEHOLDER_RE.findall(text)))
+                if not keys:
+                    continue
+                m = _PLACEHOLDER_RE.fullmatch(text.strip())
+                plan.append((cell.coordinate, text, keys, bool(m)))
+    finally:
+        wb.close()
+
+    # 같은 템플릿의 예전 버전 계획은 버림
+    for k in [k for k in _PLAN_CACHE if k[0] == cache_key[0]]:
+        del _PLAN_CACHE[k]
+    _PLAN_CACHE[cache_key] = plan
+    return plan
+
+
+def _render_plan(ws, plan, data_context):
+    """계획된 셀만 채운다. 반환: 치환한 (셀, 키) 수"""
+    replaced_count = 0
+    for coord, text, keys, whole in plan:
+        hit = [k for k in keys if k in data_context]
+        if not hit:
+            continue
+        replaced_count += len(hit)
+        if whole:
+            ws[coord].value = data_context[keys[0]]  # 숫자형 유지 등을 위해 원본 대입
+        else:
+            ws[coord].value = _PLACEHOLDER_RE.sub(
+                lambda m: str(data_context[m.group(1)]) if m.group(1) in data_context else m.group(0), text
+            )
+    return replaced_count
+
+
+class TemplateRenderer:
+    """
+    템플릿을 메모리에 한 번만 로드해 두고 명세서를 연속으로 저장한다. (일괄 발급용)
+    - 파일 복사/재로드 없이 계획된 셀만 채워 저장하고, 저장 후 원문으로 되돌린다.
+    """
+
+    def __init__(self, template_path):
+        self.plan = compile_template(template_path)
+        self.wb = openpyxl.load_workbook(template_path)
+        self.ws = self.wb.active
+
+    def render_to(self, save_path, data_context):
+        """명세서 1장 저장. 반환: 치환한 항목 수"""
+        try:
+            replaced_count = _render_plan(self.ws, self.plan, data_context)
+            self.wb.save(save_path)
+            return replaced_count
+        finally:
+            for coord, text, _keys, _whole in self.plan:
+                self.ws[coord].value = text
+
+    def close(self):
+        try:
+            self.wb.close()
+        except Exception:
+            pass
+
+
 def generate_payslip(template_path, save_path, data_context):
     if not os.path.exists(template_path):
         try:
@@ -225,6 +312,12 @@ def generate_payslip(template_path, save_path, data_context):
             return None
 
     print(f"\n[엑셀 생성 시작] {save_path}")
+    try:
+        plan = compile_template(template_path)
+    except Exception as e:
+        print(f"[오류] 템플릿 분석 실패: {e}")
+        return None
+
     try:
         shutil.copy(template_path, save_path)
     except Exception as e:
@@ -238,24 +331,7 @@ def generate_payslip(template_path, save_path, data_context):
         print(f"[오류] 엑셀 로드 실패: {e}")
         return None
 
-    replaced_count = 0
-    for row in ws.iter_rows():
-        for cell in row:
-            if cell.value is not None:
-                text = str(cell.value)
-                for key, val in data_context.items():
-                    pattern = r"\{\{\s*" + re.escape(key) + r"\s*\}\}"
-                    if re.search(pattern, text):
-                        # 줄바꿈 문자 처리를 위해 문자열로 변환
-                        val_str = str(val)
-                        if re.fullmatch(pattern, text.strip()):
-                            cell.value = val  # 숫자형 유지 등을 위해 원본 대입 시도
-                            if isinstance(val, str):
-                                cell.value = val  # 문자열이면 그대로
-                        else:
-                            cell.value = re.sub(pattern, val_str, text)
-                        replaced_count += 1
-                        text = str(cell.value)
+    replaced_count = _render_plan(ws, plan, data_context)
     try:
         wb.save(save_path)
         wb.close()
@@ -264,4 +340,4 @@ def generate_payslip(template_path, save_path, data_context):
         print(f"[오류] 저장 실패: {e}")
         return None
 
-    return str(save_path)
\ No newline at end of file
+    return str(save_path)
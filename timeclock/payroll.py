@@ -0,0 +1,224 @@
+# timeclock/payroll.py
+# -*- coding: utf-8 -*-
+"""
+일괄 급여 정산 (전 직원 한 번에)
+
+- 기간 안에 통째로 들어가는 주(월~일)는 주별 집계 캐시(payroll_week_agg)에서 읽고,
+  앞뒤 걸친 날(edge)의 APPROVED 근무기록만 원본에서 읽어 SalaryCalculator 규칙 그대로 계산한다.
+  (1년 정산도 주 집계 수십 행 + 앞뒤 며칠치 기록만 읽음)
+- work_date 와 시작시각의 주가 어긋난 기록이 있는 근로자는 원본 기록 전체로 계산한다.
+  주 집계 합계가 절사/반올림 경계에 걸려 원본 계산과 같다고 장담할 수 없는 근로자도 마찬가지.
+- 사업주 화면의 '전체 일괄 정산' 버튼 / 개인 급여 계산과 CLI 가 같은 함수를 사용한다.
+
+CLI:
+    python -m timeclock.payroll 2025-12-01 2025-12-31
+    python -m timeclock.payroll 2025-12-01 2025-12-31 --csv pay_result/2025-12.csv
+"""
+import csv
+import sys
+import argparse
+from datetime import date, timedelta
+from pathlib import Path
+
+from timeclock.salary import SalaryCalculator
+from timeclock.utils import normalize_date_range
+
+# CSV / 콘솔 출력 컬럼: (헤더, 결과 dict 키)
+PAYROLL_COLUMNS = [
+    ("근로자", "name"),
+    ("아이디", "username"),
+    ("직급", "job_title"),
+    ("시급", "hourly_wage"),
+    ("근무건수", "log_count"),
+    ("총작업시간", "total_hours"),
+    ("실근무시간", "actual_hours"),
+    ("휴게시간", "break_hours"),
+    ("기본급", "base_pay"),
+    ("연장수당", "overtime_pay"),
+    ("야간수당", "night_pay"),
+    ("휴일수당", "holiday_pay"),
+    ("주휴수당", "ju_hyu_pay"),
+    ("지급총액", "grand_total"),
+]
+
+
+def _week_plan(date_from, date_to):
+    """
+    기간을 (통째로 들어가는 주의 월요일 범위, 원본으로 읽을 앞뒤 구간 목록)으로 나눈다.
+    통째로 들어가는 주가 없으면 주 범위는 None, 구간은 기간 전체.
+    """
+    d1, d2 = date.fromisoformat(date_from), date.fromisoformat(date_to)
+    first_mon = d1 + timedelta(days=(7 - d1.weekday()) % 7)
+    last_mon = d2 - timedelta(days=(d2.weekday() + 1) % 7) - timedelta(days=6)
+    if first_mon > last_mon:
+        return None, [(date_from, date_to)]
+
+    edges = []
+    if d1 < first_mon:
+        edges.append((date_from, (first_mon - timedelta(days=1)).isoformat()))
+    if last_mon + timedelta(days=6) < d2:
+        edges.append(((last_mon + timedelta(days=7)).isoformat(), date_to))
+    return (first_mon.isoformat(), last_mon.isoformat()), edges
+
+
+def _collect(db, date_from, date_to, user_id=None):
+    """
+    {user_id: {"weeks": [주 집계 dict], "logs": [edge 기록 dict], "raw": bool}} 와
+    edge 기록에서 얻은 사용자 정보 {user_id: row dict}
+    """
+    db.refresh_payroll_week_agg()
+    full, edges = _week_plan(date_from, date_to)
+
+    per_user = {}
+
+    def slot(uid):
+        return per_user.setdefault(int(uid), {"weeks": [], "logs": [], "raw": False})
+
+    # 어긋난 기록 검사용으로 앞뒤 2주 여유를 두고 읽는다
+    win_from = (date.fromisoformat(date_from) - timedelta(days=14)).isoformat()
+    win_to = (date.fromisoformat(date_to) + timedelta(days=14)).isoformat()
+    for r in db.list_payroll_week_agg(win_from, win_to, user_id):
+        w = dict(r)
+        if w["off_week"] or w["dirty"]:
+            slot(w["user_id"])["raw"] = True
+        elif full and full[0] <= w["week_start"] <= full[1] and w["log_count"]:
+            slot(w["user_id"])["weeks"].append(w)
+
+    info = {}
+    for a, b in edges:
+        for r in db.list_approved_work_logs(a, b, user_id):
+            log = dict(r)
+            slot(log["user_id"])["logs"].append(log)
+            info.setdefault(int(log["user_id"]), log)
+    return per_user, info
+
+
+def _calc(db, calc, user_id, data, date_from, date_to):
+    """(결과 dict, 근무건수)"""
+    if not data["raw"]:
+        weeks = data["weeks"] + SalaryCalculator.aggregate_weeks(data["logs"])
+        try:
+            return calc.calculate_from_weeks(weeks), sum(w["log_count"] for w in weeks)
+        except ValueError:
+            pass  # 절사/반올림 경계 → 원본 기록으로 다시 계산
+
+    logs = [dict(r) for r in db.list_approved_work_logs(date_from, date_to, user_id)]
+    return (calc.calculate_period(logs) if logs else None), len(logs)
+
+
+def calculate_user_period(db, user_id, hourly_wage, date_from, date_to):
+    """
+    근로자 1명의 기간 급여 (calculate_period 결과와 같은 형식, 기록이 없으면 None)
+    주별 집계 캐시 + 앞뒤 걸친 날의 원본 기록으로 계산한다.
+    """
+    date_from, date_to = normalize_date_range(date_from, date_to)
+    per_user, _info = _collect(db, date_from, date_to, user_id)
+    data = per_user.get(int(user_id))
+    if not data:
+        return None
+    res, _n = _calc(db, SalaryCalculator(wage_per_hour=hourly_wage or 0), int(user_id), data, date_from, date_to)
+    return res
+
+
+def run_payroll(db, date_from, date_to, user_ids=None):
+    """
+    기간 내 전 직원 급여 계산.
+    user_ids 가 주어지면 해당 직원만 (조회 횟수는 그대로)
+    반환: [{"user_id", "username", "name", "job_title", "hourly_wage", "log_count", "result"}, ...]
+      result 는 SalaryCalculator.calculate_period() 결과와 같은 형식의 dict
+    """
+    date_from, date_to = normalize_date_range(date_from, date_to)
+    wanted = {int(u) for u in user_ids} if user_ids else None
+    per_user, info = _collect(db, date_from, date_to)
+
+    out = []
+    for user_id in sorted(per_user):
+        if wanted is not None and user_id not in wanted:
+            continue
+
+        first = info.get(user_id)
+        if first is None:
+            u = db.get_user_by_id(user_id) or {}
+            first = {"worker_username": u.get("username"), "worker_name": u.get("name"),
+                     "hourly_wage": u.get("hourly_wage"), "job_title": u.get("job_title")}
+        wage = first.get("hourly_wage") or 0
+
+        calc = SalaryCalculator(wage_per_hour=wage)
+        res, log_count = _calc(db, calc, user_id, per_user[user_id], date_from, date_to)
+        if not res:
+            continue
+
+        out.append({
+            "user_id": user_id,
+            "username": first.get("worker_username"),
+            "name": first.get("worker_name") or first.get("worker_username"),
+            "job_title": first.get("job_title") or "",
+            "hourly_wage": wage,
+            "log_count": log_count,
+            "result": res,
+        })
+    return out
+
+
+def _flat(item):
+    row = dict(item["result"])
+    row.update({k: v for k, v in item.items() if k != "result"})
+    return row
+
+
+def export_payroll_csv(results, out_path):
+    """run_payroll() 결과를 CSV 로 저장 (엑셀에서 바로 열리도록 utf-8-sig)"""
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with out_path.open("w", encoding="utf-8-sig", newline="") as f:
+        w = csv.writer(f)
+        w.writerow([h for h, _k in PAYROLL_COLUMNS])
+        for item in results:
+            row = _flat(item)
+            w.writerow([row.get(k, "") for _h, k in PAYROLL_COLUMNS])
+    return out_path
+
+
+def summarize(results) -> dict:
+    return {
+        "workers": len(results),
+        "logs": sum(r["log_count"] for r in results),
+        "grand_total": sum(r["result"]["grand_total"] for r in results),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="전 직원 일괄 급여 정산")
+    ap.add_argument("date_from", help="시작일 (YYYY-MM-DD)")
+    ap.add_argument("date_to", help="종료일 (YYYY-MM-DD)")
+    ap.add_argument("--csv", dest="csv_path", default=None, help="결과 CSV 저장 경로")
+    ap.add_argument("--db", dest="db_path", default=None, help="DB 파일 경로 (기본: settings.DB_PATH)")
+    args = ap.parse_args(argv)
+
+    from timeclock.db import DB
+    from timeclock.settings import DB_PATH
+
+    db = DB(Path(args.db_path) if args.db_path else DB_PATH)
+    try:
+        results = run_payroll(db, args.date_from, args.date_to)
+    finally:
+        db.close()
+
+    print(f"[{args.date_from} ~ {args.date_to}] 일괄 급여 정산")
+    print("-" * 60)
+    for item in results:
+        r = item["result"]
+        print(f"{item['name']:<12} 실근무 {r['actual_hours']:>6}h  "
+              f"기본 {r['base_pay']:>10,}  주휴 {r['ju_hyu_pay']:>9,}  합계 {r['grand_total']:>11,}원")
+    s = summarize(results)
+    print("-" * 60)
+    print(f"직원 {s['workers']}명 / 근무 {s['logs']}건 / 지급총액 {s['grand_total']:,}원")
+
+    if args.csv_path:
+        p = export_payroll_csv(results, args.csv_path)
+        print(f"💾 CSV 저장: {p}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
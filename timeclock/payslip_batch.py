@@ -0,0 +1,231 @@
+# timeclock/payslip_batch.py
+# -*- coding: utf-8 -*-
+"""
+급여명세서 일괄 발급 (월말 전 직원)
+
+- 급여는 payroll.run_payroll() 로 한 번에 계산하고,
+  명세서 파일 쓰기는 프로세스 풀로 나눠서 처리한다. (프로세스마다 템플릿 1회 로드: TemplateRenderer)
+- 장수가 적거나 풀을 띄울 수 없는 환경이면 현재 프로세스에서 순서대로 만든다.
+- zip_path 를 주면 만든 명세서를 ZIP 하나로도 묶는다.
+- 사업주 화면의 개별 '명세서 발급' 도 build_payslip_context() 를 같이 쓴다.
+"""
+import os
+import re
+import zipfile
+import concurrent.futures
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+
+from timeclock import payroll
+from timeclock.salary import SalaryCalculator
+from timeclock.excel_maker import TemplateRenderer, create_default_template
+from timeclock.settings import DATA_DIR, PAYSLIP_MAX_WORKERS, PAYSLIP_POOL_MIN_JOBS
+
+COMPANY_NAME = "Hobby Brown"
+
+
+def build_payslip_context(res, real_name, rank, hourly_wage, d1, d2):
+    """급여 계산 결과(res) → 명세서 템플릿 치환값 (3.3% 사업소득 기준)"""
+    calc = SalaryCalculator(hourly_wage)
+
+    friendly_text = calc.get_friendly_description(res)
+    total_pay = res['grand_total']
+
+    # --- [수정] 3.3% 세금 분리 계산 (소득세 3%, 지방세 0.3%) ---
+    # 1. 4대보험 관련은 0으로 설정 (프리랜서/아르바이트 3.3% 기준)
+    ei_tax = 0
+    pension = 0
+    health = 0
+    care = 0
+
+    # 2. 소득세 (3%) - 원 단위 절사
+    income_tax = int(total_pay * 0.03 / 10) * 10
+
+    # 3. 지방소득세 (소득세의 10% = 총액의 0.3%) - 원 단위 절사
+    local_tax = int(income_tax * 0.1 / 10) * 10
+
+    # 4. 공제 총액
+    total_deduction = income_tax + local_tax + ei_tax + pension + health + care
+
+    # 5. 실 수령액
+    net_pay = total_pay - total_deduction
+    # -----------------------------------------------------------
+
+    over_hours = 0
+    night_hours = 0
+    ju_hyu_hours = 0
+
+    if hourly_wage > 0:
+        over_hours = round(res['overtime_pay'] / (hourly_wage * 0.5), 1) if hourly_wage else 0
+        night_hours = round(res['night_pay'] / (hourly_wage * 0.5), 1) if hourly_wage else 0
+        ju_hyu_hours = round(res['ju_hyu_pay'] / hourly_wage, 1) if hourly_wage else 0
+
+    base_str = f"• 기본급: {res['actual_hours']}시간 × {hourly_wage:,}원 = {res['base_pay']:,}원"
+
+    if res['overtime_pay'] > 0 or res['night_pay'] > 0:
+        over_msg = []
+        if res['overtime_pay'] > 0:
+            over_msg.append(f"연장 {over_hours}h")
+        if res['night_pay'] > 0:
+            over_msg.append(f"야간 {night_hours}h")
+        sum_add_pay = res['overtime_pay'] + res['night_pay']
+        over_str = f"• 가산(0.5배): {' + '.join(over_msg)} = {sum_add_pay:,}원"
+    else:
+        over_str = "• 가산수당: 해당 없음"
+
+    if res['ju_hyu_pay'] > 0:
+        ju_hyu_str = f"• 주휴수당: {ju_hyu_hours}시간 (주 15시간↑ 개근) = {res['ju_hyu_pay']:,}원"
+    else:
+        ju_hyu_str = "• 주휴수당: 해당 없음 (조건 미충족)"
+
+    if res['ju_hyu_pay'] > 0:
+        note_text = (
+            "※ 주휴수당 지급 안내:\n"
+            "본 주는 일시적 업무 증가로 주 15시간 이상 근무하여\n"
+            "근로기준법에 의거 주휴수당을 지급하였습니다."
+        )
+    else:
+        note_text = "※ 본 명세서는 근로기준법 제48조에 따라 교부합니다."
+
+    return {
+        "title": f"{d1[:4]}년 {d1[5:7]}월 급여명세서",
+        "name": real_name,
+        "period": f"{d1} ~ {d2}",
+        "pay_date": datetime.now().strftime("%Y-%m-%d"),
+        "rank": rank,
+        "company": COMPANY_NAME,
+        "base_pay": res['base_pay'],
+        "ju_hyu_pay": res['ju_hyu_pay'],
+        "overtime_pay": res['overtime_pay'],
+        "night_pay": res['night_pay'],
+        "holiday_pay": res['holiday_pay'],
+        "other_pay": 0,
+        "total_pay": total_pay,
+        "ei_ins": ei_tax,
+        "pension": pension,
+        "health_ins": health,
+        "care_ins": care,
+
+        # [수정] 3.3% 분리 적용된 세금 항목
+        "income_tax": income_tax,
+        "local_tax": local_tax,
+
+        "total_deduction": total_deduction,
+        "net_pay": net_pay,
+        "calc_detail": friendly_text,
+        "base_detail": base_str,
+        "over_detail": over_str,
+        "ju_hyu_detail": ju_hyu_str,
+
+        # [수정] 하단 텍스트 변경
+        "tax_detail": "사업소득세 3% + 지방소득세 0.3% 적용",
+        "note": note_text
+    }
+
+
+def payslip_filename(real_name, d1, d2):
+    safe_name = re.sub(r'[\\/:*?"<>|]', "_", str(real_name))
+    return f"급여명세서_{safe_name}_{d1.replace('-', '')}_{d2.replace('-', '')}.xlsx"
+
+
+# ----------------------------------------------------------------
+# 프로세스 풀 작업자 (모듈 최상위 함수여야 pickle 가능)
+# ----------------------------------------------------------------
+_renderer = None
+
+
+def _init_worker(template_path):
+    global _renderer
+    _renderer = TemplateRenderer(template_path)
+
+
+def _render_one(save_path, data_ctx):
+    _renderer.render_to(save_path, data_ctx)
+    return save_path
+
+
+def _render_sequential(template_path, jobs, on_file):
+    renderer = TemplateRenderer(template_path)
+    try:
+        for save_path, data_ctx in jobs:
+            renderer.render_to(save_path, data_ctx)
+            on_file(save_path)
+    finally:
+        renderer.close()
+
+
+def _render_pool(template_path, jobs, workers, on_file):
+    """반환: 풀 문제로 만들지 못한 작업 목록 (정상이면 빈 목록)"""
+    done = set()
+    try:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(template_path,)
+        ) as ex:
+            futures = [ex.submit(_render_one, save_path, data_ctx) for save_path, data_ctx in jobs]
+            for fut in concurrent.futures.as_completed(futures):
+                save_path = fut.result()
+                done.add(save_path)
+                on_file(save_path)
+    except (BrokenProcessPool, OSError) as e:
+        print(f"⚠️ [명세서] 프로세스 풀 사용 불가 → 순차 생성: {e}")
+    return [j for j in jobs if j[0] not in done]
+
+
+def export_payslips(db, date_from, date_to, out_dir, user_ids=None, template_path=None,
+                    zip_path=None, progress_callback=None, max_workers=None):
+    """
+    기간 내 (user_ids 가 있으면 해당) 직원 급여명세서를 out_dir 에 일괄 생성.
+    반환: {"files": [경로, ...], "zip": zip 경로 또는 None, "count": 명세서 수}
+    """
+    def report(msg):
+        if progress_callback:
+            progress_callback({"msg": msg})
+
+    report("🧮 급여 계산 중...")
+    results = payroll.run_payroll(db, date_from, date_to, user_ids)
+    if not results:
+        return {"files": [], "zip": None, "count": 0}
+
+    template_path = Path(template_path or DATA_DIR / "template.xlsx")
+    if not template_path.exists():
+        create_default_template(str(template_path))
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    # 동명이인은 아이디를 붙여 파일명 충돌 방지
+    names = [item["name"] for item in results]
+    jobs = []
+    for item in results:
+        name = item["name"]
+        label = name if names.count(name) == 1 else f"{name}_{item['username']}"
+        rank = (item.get("job_title") or "사원").strip() or "사원"
+        ctx = build_payslip_context(item["result"], name, rank, item["hourly_wage"], date_from, date_to)
+        jobs.append((str(out_dir / payslip_filename(label, date_from, date_to)), ctx))
+
+    total = len(jobs)
+    files = []
+
+    def on_file(save_path):
+        files.append(save_path)
+        report(f"📄 명세서 생성 {len(files)}/{total}: {Path(save_path).name}")
+
+    workers = min(max_workers or PAYSLIP_MAX_WORKERS, os.cpu_count() or 1, total)
+    remaining = jobs
+    if workers > 1 and total >= PAYSLIP_POOL_MIN_JOBS:
+        remaining = _render_pool(str(template_path), jobs, workers, on_file)
+    if remaining:
+        _render_sequential(str(template_path), remaining, on_file)
+
+    files = [save_path for save_path, _ctx in jobs]  # 발급 순서(직원 순)로 정리
+    if zip_path:
+        report("📦 ZIP 묶는 중...")
+        zip_path = Path(zip_path)
+        zip_path.parent.mkdir(parents=True, exist_ok=True)
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for f in files:
+                zf.write(f, arcname=Path(f).name)
+        zip_path = str(zip_path)
+
+    return {"files": files, "zip": zip_path, "count": total}
@@ -1,10 +1,124 @@
 # timeclock/salary.py
 # -*- coding: utf-8 -*-
-from datetime import datetime, timedelta
+import math
+from datetime import datetime, date, timedelta
+from fractions import Fraction
+
+from timeclock.settings import SALARY_NUMPY_MIN_LOGS
+
+HAS_NUMPY = False
+try:
+    import numpy as np
+
+    HAS_NUMPY = True
+except ImportError:
+    pass
 
 # ★ [설정] 5인 미만 사업장 여부 (True: 가산수당 없음, False: 가산수당 1.5배 적용)
 IS_UNDER_5_EMPLOYEES = True
 
+# 야간 근로 구간 (22:00 ~ 다음날 06:00)
+NIGHT_START_HOUR = 22
+NIGHT_END_HOUR = 6
+
+_DAY_SEC = 24 * 3600
+_NIGHT_START_SEC = NIGHT_START_HOUR * 3600
+_NIGHT_END_SEC = NIGHT_END_HOUR * 3600
+_NIGHT_SEC_PER_DAY = _NIGHT_END_SEC + (_DAY_SEC - _NIGHT_START_SEC)
+_ONE_SEC = timedelta(seconds=1)
+_ONE_HOUR = timedelta(hours=1)
+
+# 기록별 누계 항목 (calculate_parsed / _calculate_spans_np 공용)
+_ACC_KEYS = ("work_sec", "break_sec", "actual_sec", "base_pay", "overtime_pay", "night_pay",
+             "overtime_hours", "night_hours")
+
+# 주별 집계(payroll_week_agg) 항목: 모두 정수 초 합계
+_WEEK_SEC_KEYS = ("work_sec", "break_sec", "actual_sec", "overtime_sec", "night_sec")
+
+# 시각(정시 기준 초)이 이 단위(1/16시간)면 초/3600 환산이 부동소수로 정확하다 → 기록 단위 누적에도 오차 없음
+_EXACT_GRID_SEC = 225
+
+# calculate_from_weeks 오차 여유: (기록 수 x 더한 시간 크기) 당. 배정밀도 누적 오차 상한의 수백 배
+_FLOAT_SLACK = 1e-13
+
+
+def _is_night_hour(h):
+    return h >= NIGHT_START_HOUR or h < NIGHT_END_HOUR
+
+
+def _night_sec_until(t):
+    """기준일 00:00 부터 t초 후까지 누적된 야간 구간 초"""
+    days, r = divmod(t, _DAY_SEC)
+    return days * _NIGHT_SEC_PER_DAY + min(r, _NIGHT_END_SEC) + max(0, r - _NIGHT_START_SEC)
+
+
+def _add_ones(x, k):
+    """
+    x 에 1.0 을 k 번 차례로 더한 값 (반복 덧셈과 반올림까지 같은 결과)
+    같은 2의 거듭제곱 구간 안에서 1.0 을 더하는 건 오차가 없으므로, 구간 경계를 넘는 덧셈만 따로 한다.
+    """
+    while k > 0:
+        if x == 0:
+            return float(k)
+        b = math.ldexp(1.0, math.frexp(x)[1])  # x 가 속한 구간의 위쪽 경계
+        n = min(k, math.ceil(b - x) - 1) or 1  # 경계 아래에 머무는 횟수 (없으면 경계를 넘는 1번)
+        x += n
+        k -= n
+    return x
+
+
+def _exact_int(v, tol):
+    """
+    정확한 값 v(>= 0, Fraction) 의 int() 절사.
+    정수에 tol 보다 가까우면 부동소수로 누적한 calculate_period 와 어긋날 수 있어 ValueError
+    """
+    if v == 0:
+        return 0
+    q = math.floor(v)
+    frac = v - q
+    if frac < tol or 1 - frac < tol:
+        raise ValueError("amount too close to a truncation boundary")
+    return int(q)
+
+
+def _exact_round1(v, tol):
+    """정확한 시간 v(Fraction) 의 round(v, 1). 반올림 경계(x.x5)에 tol 보다 가까우면 ValueError"""
+    if v == 0:
+        return 0.0
+    t = v * 10
+    if abs(t - math.floor(t) - Fraction(1, 2)) < tol * 10:
+        raise ValueError("hours too close to a rounding boundary")
+    return round(float(v), 1)
+
+
+def _night_sec_until_np(t):
+    days, r = np.divmod(t, _DAY_SEC)
+    return days * _NIGHT_SEC_PER_DAY + np.minimum(r, _NIGHT_END_SEC) + np.maximum(0, r - _NIGHT_START_SEC)
+
+
+def _is_night_hour_np(t):
+    h = (t % _DAY_SEC) // 3600
+    return (h >= NIGHT_START_HOUR) | (h < NIGHT_END_HOUR)
+
+
+def _add_ones_np(x, k):
+    """_add_ones 의 배열 버전"""
+    k = k.astype(np.float64)
+    while True:
+        todo = k > 0
+        if not todo.any():
+            return x
+        b = np.ldexp(1.0, np.frexp(x)[1])
+        n = np.where(x == 0, k, np.minimum(k, np.ceil(b - x) - 1))
+        n = np.where(todo, np.maximum(n, 1), 0)
+        x = x + n
+        k = k - n
+
+
+def _seq_sum(arr):
+    """앞에서부터 차례로 더한 합 (Python 루프의 += 와 같은 부동소수 결과)"""
+    return float(np.cumsum(arr)[-1]) if len(arr) else 0
+
 
 class SalaryCalculator:
     def __init__(self, wage_per_hour):
@@ -14,68 +128,78 @@ class SalaryCalculator:
         if not work_logs:
             return None
 
-        # 1. 날짜순 정렬
-        logs = sorted(work_logs, key=lambda x: x['approved_start'] or x['start_time'])
-
-        total_work_seconds = 0
-        total_break_seconds = 0
-        total_actual_seconds = 0
+        spans, start_date, end_date = self._sorted_spans(work_logs)
 
-        # 급여 합계
-        total_base_pay = 0
-        total_overtime_pay = 0
-        total_night_pay = 0
-        total_holiday_pay = 0
-        total_ju_hyu_pay = 0
-
-        # [신규] 설명문 생성을 위한 시간 합계 변수 추가
-        sum_overtime_hours = 0.0
-        sum_night_hours = 0.0
-        sum_holiday_hours = 0.0
+        # 기록이 많으면 numpy 배열 경로 (결과 dict 는 순수 Python 경로와 동일)
+        if HAS_NUMPY and len(spans) >= SALARY_NUMPY_MIN_LOGS:
+            try:
+                return self._calculate_spans_np(spans, start_date, end_date)
+            except ValueError:
+                pass  # 형식이 다른 시각 문자열 등 → 기존 경로에서 처리/오류
 
-        weeks = {}
+        return self.calculate_parsed(self._parse_spans(spans), start_date, end_date)
 
-        # ★ 가산 배율 설정 (5인 미만이면 0.0, 아니면 0.5)
-        premium_rate = 0.0 if IS_UNDER_5_EMPLOYEES else 0.5
+    @staticmethod
+    def _sorted_spans(work_logs):
+        """날짜순 정렬 후 (시작, 종료) 시각 문자열 목록 + 첫/마지막 기록의 work_date"""
+        # 1. 날짜순 정렬
+        logs = sorted(work_logs, key=lambda x: x['approved_start'] or x['start_time'])
 
+        spans = []
         for log in logs:
             s_str = log.get('approved_start') or log.get('start_time')
             e_str = log.get('approved_end') or log.get('end_time')
             if not s_str or not e_str: continue
+            spans.append((s_str, e_str))
+        return spans, logs[0].get('work_date'), logs[-1].get('work_date')
 
-            start_dt = datetime.strptime(s_str, "%Y-%m-%d %H:%M:%S")
-            end_dt = datetime.strptime(e_str, "%Y-%m-%d %H:%M:%S")
+    @staticmethod
+    def _parse_spans(spans):
+        return [
+            (datetime.strptime(s_str, "%Y-%m-%d %H:%M:%S"), datetime.strptime(e_str, "%Y-%m-%d %H:%M:%S"))
+            for s_str, e_str in spans
+        ]
+
+    @classmethod
+    def parse_logs(cls, work_logs):
+        """
+        근무기록(dict 목록)을 날짜순 정렬하고 시각 문자열을 한 번만 datetime 으로 변환한다.
+        반환: (entries, start_date, end_date)
+          entries: [(start_dt, end_dt), ...]  (확정/요청 시각이 비어 있는 기록은 제외)
+          start_date/end_date: 정렬된 첫/마지막 기록의 work_date (기존 결과와 동일)
+        """
+        spans, start_date, end_date = cls._sorted_spans(work_logs)
+        return cls._parse_spans(spans), start_date, end_date
+
+    def calculate_parsed(self, entries, start_date, end_date):
+        """parse_logs() 결과로 급여 계산 (순수 Python 경로)"""
+        acc = dict.fromkeys(_ACC_KEYS, 0)
+        acc["overtime_hours"] = 0.0
+        acc["night_hours"] = 0.0
 
-            duration = (end_dt - start_dt).total_seconds()
-            hours = duration / 3600.0
+        weeks = {}
 
-            # 휴게 공제 (4시간/8시간 룰)
-            break_sec = 0
-            if hours >= 8:
-                break_sec = 3600
-            elif hours >= 4:
-                break_sec = 1800
+        # ★ 가산 배율 설정 (5인 미만이면 0.0, 아니면 0.5)
+        premium_rate = 0.0 if IS_UNDER_5_EMPLOYEES else 0.5
 
-            actual_sec = max(0, duration - break_sec)
-            actual_hours = actual_sec / 3600.0
+        for start_dt, end_dt in entries:
+            duration, break_sec, actual_sec, actual_hours, over, n_hours = self._span_metrics(start_dt, end_dt)
 
-            total_work_seconds += duration
-            total_break_seconds += break_sec
-            total_actual_seconds += actual_sec
+            acc["work_sec"] += duration
+            acc["break_sec"] += break_sec
+            acc["actual_sec"] += actual_sec
 
             # 1) 기본급 (시급 x 실 근로시간)
-            total_base_pay += actual_hours * self.wage
+            acc["base_pay"] += actual_hours * self.wage
 
             # 2) 연장 수당 (일 8시간 초과)
             if actual_hours > 8:
-                over = actual_hours - 8
-                total_overtime_pay += over * self.wage * premium_rate
-                sum_overtime_hours += over  # 시간 누적
+                acc["overtime_pay"] += over * self.wage * premium_rate
+                acc["overtime_hours"] += over  # 시간 누적
 
             # 3) 야간 수당
-            n_hours = self._calc_night_hours(start_dt, end_dt)
-            total_night_pay += n_hours * self.wage * premium_rate
-            sum_night_hours += n_hours  # 시간 누적
+            acc["night_pay"] += n_hours * self.wage * premium_rate
+            acc["night_hours"] += n_hours  # 시간 누적
 
             # 주별 집계
             yr, wk, _ = start_dt.isocalendar()
@@ -85,13 +209,256 @@ class SalaryCalculator:
             weeks[week_key]["hours"] += actual_hours
             weeks[week_key]["days"].add(start_dt.date())
 
-        # 주단위 계산 (주휴, 주 연장)
+        week_list = [(data["hours"], len(data["days"])) for data in weeks.values()]
+        return self._finish(start_date, end_date, acc, week_list, premium_rate)
+
+    @classmethod
+    def _span_metrics(cls, start_dt, end_dt):
+        """
+        기록 1건의 시간 계산 (시급과 무관한 부분)
+        반환: (체류초, 휴게초, 실근로초, 실근로시간, 일 연장시간(8h 초과분), 야간시간)
+        """
+        duration = (end_dt - start_dt).total_seconds()
+        hours = duration / 3600.0
+
+        # 휴게 공제 (4시간/8시간 룰)
+        break_sec = 0
+        if hours >= 8:
+            break_sec = 3600
+        elif hours >= 4:
+            break_sec = 1800
+
+        actual_sec = max(0, duration - break_sec)
+        actual_hours = actual_sec / 3600.0
+        over = actual_hours - 8 if actual_hours > 8 else 0.0
+        return duration, break_sec, actual_sec, actual_hours, over, cls._calc_night_hours(start_dt, end_dt)
+
+    @classmethod
+    def _span_seconds(cls, start_dt, end_dt):
+        """
+        _span_metrics 의 정수 초 버전 (주별 집계용)
+        반환: (체류초, 휴게초, 실근로초, 일 연장초(8h 초과분), 야간초)
+        """
+        duration = (end_dt - start_dt) // _ONE_SEC
+
+        # 휴게 공제 (4시간/8시간 룰)
+        break_sec = 0
+        if duration >= 8 * 3600:
+            break_sec = 3600
+        elif duration >= 4 * 3600:
+            break_sec = 1800
+
+        actual_sec = max(0, duration - break_sec)
+        over_sec = max(0, actual_sec - 8 * 3600)
+        return duration, break_sec, actual_sec, over_sec, cls._calc_night_sec(start_dt, end_dt)
+
+    # ------------------------------------------------------------------
+    # 주별 집계 (payroll_week_agg 캐시용)
+    # ------------------------------------------------------------------
+    @classmethod
+    def aggregate_weeks(cls, work_logs):
+        """
+        근무기록을 ISO 주(월요일 시작) 단위로 집계한다. 주 구분은 calculate_period 와 같은 시작 시각 기준.
+        반환: [week, ...] (week_start 순)
+          week = {"week_start", "iso_year", "iso_week", "work_sec", "break_sec", "actual_sec",
+                  "overtime_sec", "night_sec", "days", "log_count", "first_work_date", "last_work_date"}
+          - *_sec 는 정수 초 합계 (시간/금액 환산은 calculate_from_weeks 에서)
+          - actual_hours 는 calculate_period 의 주별 누적과 같은 순서로 더한 실근로시간 (주휴수당용)
+          - overtime_sec 는 일 8시간 초과분만 (주 40시간 초과분은 calculate_from_weeks 에서 계산)
+          - days 는 시각이 모두 있는 기록의 근무일수, log_count 는 시각이 비어 있는 기록까지 포함한 건수
+          - inexact_logs 는 시작/종료 시각이 1/16시간(_EXACT_GRID_SEC) 단위가 아닌 기록 수
+        """
+        weeks = {}
+        for log in sorted(work_logs, key=lambda x: x['approved_start'] or x['start_time']):
+            s_str = log.get('approved_start') or log.get('start_time')
+            e_str = log.get('approved_end') or log.get('end_time')
+            d = date.fromisoformat(s_str[:10])
+            ws = d - timedelta(days=d.weekday())
+
+            w = weeks.get(ws)
+            if w is None:
+                yr, wk, _ = ws.isocalendar()
+                w = weeks[ws] = {
+                    "week_start": ws.isoformat(), "iso_year": yr, "iso_week": wk,
+                    "work_sec": 0, "break_sec": 0, "actual_sec": 0, "overtime_sec": 0, "night_sec": 0,
+                    "actual_hours": 0, "inexact_logs": 0, "days": set(), "log_count": 0,
+                    "first_work_date": log.get('work_date'), "last_work_date": None,
+                }
+            w["log_count"] += 1
+            w["last_work_date"] = log.get('work_date')
+            if not s_str or not e_str:
+                continue
+
+            start_dt = datetime.strptime(s_str, "%Y-%m-%d %H:%M:%S")
+            end_dt = datetime.strptime(e_str, "%Y-%m-%d %H:%M:%S")
+            duration, break_sec, actual_sec, over_sec, night_sec = cls._span_seconds(start_dt, end_dt)
+            w["work_sec"] += duration
+            w["break_sec"] += break_sec
+            w["actual_sec"] += actual_sec
+            w["overtime_sec"] += over_sec
+            w["night_sec"] += night_sec
+            w["actual_hours"] += actual_sec / 3600.0
+            w["days"].add(start_dt.date())
+            if (start_dt.minute * 60 + start_dt.second) % _EXACT_GRID_SEC or \
+                    (end_dt.minute * 60 + end_dt.second) % _EXACT_GRID_SEC:
+                w["inexact_logs"] += 1
+
+        out = []
+        for ws in sorted(weeks):
+            w = weeks[ws]
+            w["days"] = len(w["days"])
+            out.append(w)
+        return out
+
+    def calculate_from_weeks(self, weeks):
+        """
+        주별 집계(aggregate_weeks() 결과 또는 payroll_week_agg 행)로 급여 계산.
+        결과 dict 는 calculate_period 와 같다.
+        calculate_period 는 기록마다 부동소수로 더한 뒤 절사/반올림하므로, 여기서는 정수 초로 정확한 값을 구한다.
+          - 모든 기록이 1/16시간 단위(inexact_logs=0)이고 시급이 정수면 원래 누적에도 오차가 없어 그대로 같다.
+          - 아니면 정확한 값이 절사/반올림 경계에 누적 오차만큼 가까울 때 같은 결과를 장담할 수 없어
+            ValueError 를 낸다. (호출한 쪽에서 원본 기록으로 calculate_period 를 다시 계산)
+        """
+        weeks = sorted(weeks, key=lambda w: w["week_start"])
+        if not weeks:
+            return None
+
+        premium_rate = Fraction(0) if IS_UNDER_5_EMPLOYEES else Fraction(1, 2)
+        wage = Fraction(self.wage)
+        tot = {k: sum(w[k] for w in weeks) for k in _WEEK_SEC_KEYS}
+
+        # calculate_period 의 누적 오차 상한 (더한 항 수 x 항 크기)
+        if not any(w.get("inexact_logs") for w in weeks) and float(self.wage).is_integer() and abs(self.wage) < 2 ** 31:
+            tol_hours = tol_pay = 0.0
+        else:
+            n = sum(w["log_count"] for w in weeks) + len(weeks) + 4
+            tol_hours = _FLOAT_SLACK * n * (tot["work_sec"] / 3600.0 + 8 * n + 1)
+            tol_pay = tol_hours * max(1.0, abs(float(self.wage)))
+
+        overtime_sec = tot["overtime_sec"]
+        total_ju_hyu_pay = 0
         ju_hyu_details = []
+        for w in weeks:
+            w_sec, w_days = w["actual_sec"], w["days"]
+            if w_days <= 0:
+                continue
+
+            # 주 연장 (주 40시간 초과)
+            if w_sec > 40 * 3600:
+                overtime_sec += w_sec - 40 * 3600
+
+            # 주휴수당 (5인 미만도 지급 의무 있음)
+            # 주 실근로시간은 calculate_period 와 같은 순서로 더해 둔 값이라 같은 식 그대로 계산한다
+            w_hours = w["actual_hours"]
+            if w_hours >= 15:
+                day_avg = w_hours / w_days
+                if day_avg > 8: day_avg = 8
+                jh_amt = int(day_avg * self.wage)
+                total_ju_hyu_pay += jh_amt
+                ju_hyu_details.append(jh_amt)
 
-        for wk_key, data in weeks.items():
-            w_hours = data["hours"]
-            w_days = len(data["days"])
+        base_pay = Fraction(tot["actual_sec"], 3600) * wage
+        overtime_hours = Fraction(overtime_sec, 3600)
+        night_hours = Fraction(tot["night_sec"], 3600)
+        overtime_pay = overtime_hours * wage * premium_rate
+        night_pay = night_hours * wage * premium_rate
+        grand_total = base_pay + overtime_pay + night_pay + total_ju_hyu_pay
 
+        return {
+            "start_date": weeks[0]["first_work_date"],
+            "end_date": weeks[-1]["last_work_date"],
+            "total_hours": round(tot["work_sec"] / 3600.0, 1),  # 총 체류
+            "actual_hours": round(tot["actual_sec"] / 3600.0, 1),  # 실 근로
+            "break_hours": round(tot["break_sec"] / 3600.0, 1),  # 휴게 시간
+
+            # 금액
+            "base_pay": _exact_int(base_pay, tol_pay),
+            "overtime_pay": _exact_int(overtime_pay, tol_pay),
+            "night_pay": _exact_int(night_pay, tol_pay),
+            "holiday_pay": 0,
+            "ju_hyu_pay": int(total_ju_hyu_pay),
+            "grand_total": _exact_int(grand_total, tol_pay),
+            "ju_hyu_details": ju_hyu_details,
+
+            # [신규] 시간 합계 (설명문용)
+            "overtime_hours": _exact_round1(overtime_hours, tol_hours),
+            "night_hours": _exact_round1(night_hours, tol_hours),
+            "holiday_hours": 0.0
+        }
+
+    def _calculate_spans_np(self, spans, start_date, end_date):
+        """
+        numpy 배열 경로: 시각 문자열을 datetime64 로 한 번에 변환하고
+        근무시간/휴게/일 연장/야간/주별 집계를 배열 연산으로 처리한다.
+        합계는 cumsum(순차 누적)으로 구해 Python 경로와 덧셈 순서까지 같게 맞춘다. (결과 dict 동일)
+        """
+        if any(len(a) != 19 or len(b) != 19 for a, b in spans):
+            raise ValueError("unexpected datetime format")
+
+        start = np.array([a for a, _b in spans], dtype="datetime64[s]").astype(np.int64)
+        end = np.array([b for _a, b in spans], dtype="datetime64[s]").astype(np.int64)
+
+        premium_rate = 0.0 if IS_UNDER_5_EMPLOYEES else 0.5
+
+        duration = (end - start).astype(np.float64)
+        hours = duration / 3600.0
+
+        # 휴게 공제 (4시간/8시간 룰)
+        break_sec = np.where(hours >= 8, 3600, np.where(hours >= 4, 1800, 0))
+        actual_sec = np.maximum(0, duration - break_sec)
+        actual_hours = actual_sec / 3600.0
+
+        # 일 연장 (8시간 초과분만, 나머지는 0 → 누적 결과 불변)
+        over = np.where(actual_hours > 8, actual_hours - 8, 0.0)
+
+        # 야간: _calc_night_hours 와 같은 (첫 조각) + 1.0 x 야간 정시 수 + (마지막 조각)
+        s_off = start % _DAY_SEC
+        e_off = s_off + (end - start)
+        nxt = (s_off // 3600 + 1) * 3600
+        last = np.maximum(e_off // 3600 * 3600, nxt)
+        first = np.where(_is_night_hour_np(s_off), (np.minimum(e_off, nxt) - s_off) / 3600.0, 0.0)
+        full = np.where(e_off > nxt, (_night_sec_until_np(last) - _night_sec_until_np(nxt)) // 3600, 0)
+        tail = np.where((e_off > last) & _is_night_hour_np(last), (e_off - last) / 3600.0, 0.0)
+        night = np.where(duration > 0, _add_ones_np(first, full) + tail, 0.0)
+
+        acc = {
+            "work_sec": _seq_sum(duration),
+            "break_sec": int(break_sec.sum()),
+            "actual_sec": _seq_sum(actual_sec),
+            "base_pay": _seq_sum(actual_hours * self.wage),
+            "overtime_pay": _seq_sum(over * self.wage * premium_rate),
+            "overtime_hours": _seq_sum(over),
+            "night_pay": _seq_sum(night * self.wage * premium_rate),
+            "night_hours": _seq_sum(night),
+        }
+
+        # 주별 집계: ISO 주 = 그 주 월요일(1970-01-01 은 목요일)
+        day = start // _DAY_SEC
+        week_start = day - (day + 3) % 7
+        uniq, first_idx, inv = np.unique(week_start, return_index=True, return_inverse=True)
+        w_hours = np.zeros(len(uniq))
+        np.add.at(w_hours, inv, actual_hours)
+        _d, d_idx = np.unique(day, return_index=True)
+        w_days = np.bincount(inv[d_idx], minlength=len(uniq))
+
+        order = np.argsort(first_idx, kind="stable")  # Python dict 삽입 순서와 동일하게
+        week_list = [(float(w_hours[i]), int(w_days[i])) for i in order]
+        return self._finish(start_date, end_date, acc, week_list, premium_rate)
+
+    def _finish(self, start_date, end_date, acc, week_list, premium_rate):
+        """
+        주단위 계산(주휴, 주 연장) + 결과 dict 생성 (Python/numpy 경로 공용)
+        week_list: [(주 실근로시간, 근무일수), ...]  주가 처음 나온 순서
+        """
+        total_overtime_pay = acc["overtime_pay"]
+        sum_overtime_hours = acc["overtime_hours"]
+        total_holiday_pay = 0
+        total_ju_hyu_pay = 0
+        sum_holiday_hours = 0.0
+
+        ju_hyu_details = []
+
+        for w_hours, w_days in week_list:
             # 주 연장 (주 40시간 초과)
             if w_hours > 40:
                 w_over = w_hours - 40
@@ -106,14 +473,16 @@ class SalaryCalculator:
                 total_ju_hyu_pay += jh_amt
                 ju_hyu_details.append(jh_amt)
 
+        total_base_pay = acc["base_pay"]
+        total_night_pay = acc["night_pay"]
         grand_total = total_base_pay + total_overtime_pay + total_night_pay + total_holiday_pay + total_ju_hyu_pay
 
         return {
-            "start_date": logs[0].get('work_date'),
-            "end_date": logs[-1].get('work_date'),
-            "total_hours": round(total_work_seconds / 3600.0, 1),  # 총 체류
-            "actual_hours": round(total_actual_seconds / 3600.0, 1),  # 실 근로
-            "break_hours": round(total_break_seconds / 3600.0, 1),  # 휴게 시간
+            "start_date": start_date,
+            "end_date": end_date,
+            "total_hours": round(acc["work_sec"] / 3600.0, 1),  # 총 체류
+            "actual_hours": round(acc["actual_sec"] / 3600.0, 1),  # 실 근로
+            "break_hours": round(acc["break_sec"] / 3600.0, 1),  # 휴게 시간
 
             # 금액
             "base_pay": int(total_base_pay),
@@ -126,26 +495,43 @@ class SalaryCalculator:
 
             # [신규] 시간 합계 (설명문용)
             "overtime_hours": round(sum_overtime_hours, 1),
-            "night_hours": round(sum_night_hours, 1),
+            "night_hours": round(acc["night_hours"], 1),
             "holiday_hours": round(sum_holiday_hours, 1)
         }
 
+    @staticmethod
+    def _calc_night_sec(start_dt, end_dt):
+        """
+        22:00 ~ 06:00 사이의 겹치는 초 (구간 산술, 근무 길이와 무관하게 O(1))
+        자정 기준 누적 야간초 F(t) 로 F(끝) - F(시작) 을 구한다. (초 미만은 버림, 기록 시각은 초 단위)
+        """
+        if end_dt <= start_dt:
+            return 0
+        s = start_dt.hour * 3600 + start_dt.minute * 60 + start_dt.second
+        e = s + (end_dt - start_dt) // _ONE_SEC
+        return _night_sec_until(e) - _night_sec_until(s)
+
     @staticmethod
     def _calc_night_hours(start_dt, end_dt):
-        """22:00 ~ 06:00 사이의 겹치는 시간 계산"""
+        """
+        22:00 ~ 06:00 사이의 겹치는 시간 계산 (근무 길이와 무관하게 거의 O(1))
+        예전 정시 단위 루프와 부동소수 결과까지 같게 (첫 정시까지 조각) + 1.0 x (야간 정시 수) + (마지막 조각)
+        순서로 더한다. 야간 정시 수는 자정 기준 누적 야간초 F(t) 로 구한다.
+        """
+        if end_dt <= start_dt:
+            return 0.0
+        nxt = start_dt.replace(minute=0, second=0, microsecond=0) + _ONE_HOUR
+        last = max(end_dt.replace(minute=0, second=0, microsecond=0), nxt)
+
         night = 0.0
-        curr = start_dt
-        while curr < end_dt:
-            h = curr.hour
-            is_night = (h >= 22 or h < 6)
-            nxt = curr.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
-            if nxt <= curr:
-                nxt += timedelta(hours=1)
-
-            chunk = min(end_dt, nxt)
-            if is_night:
-                night += (chunk - curr).total_seconds() / 3600.0
-            curr = chunk
+        if _is_night_hour(start_dt.hour):
+            night += (min(end_dt, nxt) - start_dt).total_seconds() / 3600.0
+        if end_dt > nxt:
+            day0 = start_dt.replace(hour=0, minute=0, second=0, microsecond=0)
+            full = _night_sec_until((last - day0) // _ONE_SEC) - _night_sec_until((nxt - day0) // _ONE_SEC)
+            night = _add_ones(night, full // 3600)
+            if end_dt > last and _is_night_hour(last.hour):
+                night += (end_dt - last).total_seconds() / 3600.0
         return night
 
     # ------------------------------------------------------------------
@@ -93,6 +93,46 @@ WORK_STATUS = {
 
 _MIN_CALL_INTERVAL_SEC = 1.0
 
+# 자동 동기화 스케줄러: 이 시간(초) 동안 들어온 변경 알림을 모아 1회만 백업/업로드
+SYNC_DEBOUNCE_SEC = 2.0
+# 업로드 실패 시 재시도 대기(초): 기본값부터 두 배씩, 최대값까지
+SYNC_RETRY_BASE_SEC = 5.0
+SYNC_RETRY_MAX_SEC = 300.0
 
+# 델타 동기화: 클라우드에 쌓인 델타 파일이 이 개수 이상이면 기준본(DB 전체)으로 압축
+SYNC_DELTA_COMPACT_EVERY = 50
 
+# 클라우드 DB 다운로드: 스트리밍 chunk 크기(바이트) / requests timeout(초)
+SYNC_DOWNLOAD_CHUNK_BYTES = 1024 * 1024
+SYNC_DOWNLOAD_TIMEOUT_SEC = 60
 
+# DB 스냅샷/백업 (sqlite backup API): 한 번에 복사할 페이지 수 / 단계 사이 대기(초)
+SNAPSHOT_PAGES_PER_STEP = 256
+SNAPSHOT_STEP_SLEEP_SEC = 0.005
+
+
+
+
+
+# 급여 계산: 근무기록이 이 건수 이상이고 numpy 가 설치돼 있으면 배열 계산 경로 사용
+SALARY_NUMPY_MIN_LOGS = 64
+
+# 명세서 일괄 발급: 프로세스 풀 최대 크기 / 이 장수 미만이면 풀 없이 현재 프로세스에서 순서대로 생성
+PAYSLIP_MAX_WORKERS = 4
+PAYSLIP_POOL_MIN_JOBS = 8
+
+# 목록 테이블(ModelTable): 컬럼 폭을 정할 때 재 보는 표본 행 수
+TABLE_SIZE_SAMPLE_ROWS = 200
+
+# 사업주 근무기록 탭: 한 번에 읽어 오는 행 수 (스크롤이 끝에 닿으면 다음 페이지)
+WORK_LOG_PAGE_SIZE = 200
+
+# 공용 작업 풀(진행창 작업 / 대화방 폴링·전송): 동시에 실행하는 최대 스레드 수
+JOB_POOL_MAX_THREADS = 4
+
+# 이의제기 대화 피드 업로드(db.FeedUploader) 동시 대기/실행 상한
+# 넘치면 그 메시지는 피드에 올리지 않는다. (상대방은 델타 동기화로 받음)
+DISPUTE_FEED_MAX_INFLIGHT = 4
+
+# 배지/KPI 건수 캐시: 쓰기 메서드가 무효화하지 않아도 이 시간(초)이 지나면 다시 센다 (다른 연결로 반영된 델타 대비)
+PENDING_COUNTS_MAX_AGE_SEC = 30.0
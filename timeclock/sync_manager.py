@@ -1,12 +1,18 @@
 # timeclock/sync_manager.py
 # -*- coding: utf-8 -*-
 import os
+import json
 import shutil
+import sqlite3
 import logging
 from pathlib import Path
 import datetime
-from timeclock.settings import DB_PATH, APP_DIR, _MIN_CALL_INTERVAL_SEC
-from timeclock.utils import now_str
+from timeclock.settings import (
+    DB_PATH, APP_DIR, _MIN_CALL_INTERVAL_SEC, SYNC_DELTA_COMPACT_EVERY,
+    SYNC_DOWNLOAD_CHUNK_BYTES, SYNC_DOWNLOAD_TIMEOUT_SEC,
+)
+from timeclock import delta_sync
+from timeclock import backup_manager
 import requests  # [추가] 다운로드 통신용
 import time      # [추가] 캐시방지 시간생성용
 import threading
@@ -79,15 +85,113 @@ def _get_gauth():
         return None
 
 
+class _DriveSession:
+    """
+    프로세스 전체에서 재사용하는 구글 드라이브 세션.
+    - GoogleAuth/GoogleDrive는 한 번만 만들고, 토큰 만료가 가까울 때만 Refresh (+ mycreds.txt 저장)
+    - 폴더 id / 파일 id 메모 (매번 ListFile 검색하지 않음)
+    - requests 직접 다운로드도 같은 HTTP 세션(커넥션 재사용)으로 보낸다.
+    """
+
+    # 만료 직전 토큰으로 요청하다 401 나는 것 방지 (초)
+    REFRESH_MARGIN_SEC = 120
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.gauth = None
+        self._drive = None
+        self._http = None
+        self._folder_ids = {}
+        self._file_ids = {}
+
+    def _token_expiring(self) -> bool:
+        try:
+            cred = self.gauth.credentials
+            if cred is None or self.gauth.access_token_expired:
+                return True
+            exp = getattr(cred, "token_expiry", None)
+            if exp is None:
+                return False
+            left = (exp - datetime.datetime.utcnow()).total_seconds()
+            return left < self.REFRESH_MARGIN_SEC
+        except Exception:
+            return True
+
+    def drive(self):
+        if not HAS_GOOGLE_DRIVE:
+            return None
+
+        with self._lock:
+            if self._drive is not None:
+                if not self._token_expiring():
+                    return self._drive
+                try:
+                    self.gauth.Refresh()
+                    self.gauth.SaveCredentialsFile(str(CREDS_FILE))
+                    return self._drive
+                except Exception as e:
+                    print(f"[Sync] 토큰 갱신 실패({e}). 세션 재생성.")
+                    self.reset()
+
+            gauth = _get_gauth()
+            if not gauth:
+                return None
+            self.gauth = gauth
+            self._drive = GoogleDrive(gauth)
+            return self._drive
+
+    def http(self):
+        """requests 세션 (keep-alive 커넥션 재사용)"""
+        with self._lock:
+            if self._http is None:
+                self._http = requests.Session()
+            return self._http
+
+    def auth_headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.gauth.credentials.access_token}"}
+
+    def folder_id(self, drive, folder_name):
+        with self._lock:
+            fid = self._folder_ids.get(folder_name)
+            if fid:
+                return fid
+        fid = _find_or_create_folder(drive, folder_name)
+        with self._lock:
+            self._folder_ids[folder_name] = fid
+        return fid
+
+    def get_file_id(self, title):
+        with self._lock:
+            return self._file_ids.get(title)
+
+    def remember_file(self, title, file_id):
+        with self._lock:
+            if file_id:
+                self._file_ids[title] = file_id
+            else:
+                self._file_ids.pop(title, None)
+
+    def forget_ids(self):
+        """폴더/파일이 외부에서 지워졌을 수 있을 때 메모 초기화"""
+        with self._lock:
+            self._folder_ids.clear()
+            self._file_ids.clear()
+
+    def reset(self):
+        with self._lock:
+            self.gauth = None
+            self._drive = None
+            self.forget_ids()
+
+
+_SESSION = _DriveSession()
+
+
 def _get_drive():
-    gauth = _get_gauth()
-    if gauth:
-        return GoogleDrive(gauth)
-    return None
+    return _SESSION.drive()
 
 
-def _get_folder_id(drive, folder_name):
-    """폴더 ID 찾기 (없으면 생성)"""
+def _find_or_create_folder(drive, folder_name):
     query = f"title = '{folder_name}' and mimeType = 'application/vnd.google-apps.folder' and trashed = false"
     file_list = drive.ListFile({'q': query}).GetList()
 
@@ -102,6 +206,24 @@ def _get_folder_id(drive, folder_name):
         folder.Upload()
         return folder['id']
 
+
+def _get_folder_id(drive, folder_name):
+    """폴더 ID 찾기 (없으면 생성). 세션에 메모되어 프로세스당 1회만 검색"""
+    return _SESSION.folder_id(drive, folder_name)
+
+
+def _fetch_file_by_id(drive, file_id: str):
+    """메모된 id로 메타데이터만 조회 (검색 쿼리 없이 GET 1회). 없거나 휴지통이면 None"""
+    try:
+        gfile = drive.CreateFile({'id': file_id})
+        gfile.FetchMetadata(fields="id,title,modifiedDate,fileSize,md5Checksum,labels")
+        labels = gfile.get('labels') or {}
+        if labels.get('trashed'):
+            return None
+        return gfile
+    except Exception:
+        return None
+
 # --- [추가] 충돌 방지용 로컬 마커(마지막 클라우드 동기화 시각) 관리 ---
 
 def _sync_marker_path() -> Path:
@@ -167,6 +289,13 @@ def _get_cloud_db_file_and_ts(drive, folder_id: str):
     반환: (gfile, remote_ts_epoch) 또는 (None, 0)
     """
     try:
+        fid = _SESSION.get_file_id(GDRIVE_DB_FILENAME)
+        if fid:
+            gfile = _fetch_file_by_id(drive, fid)
+            if gfile is not None:
+                return gfile, _iso_to_epoch(gfile.get("modifiedDate"))
+            _SESSION.remember_file(GDRIVE_DB_FILENAME, None)
+
         query = f"'{folder_id}' in parents and title = '{GDRIVE_DB_FILENAME}' and trashed = false"
         file_list = drive.ListFile({'q': query}).GetList()
 
@@ -185,6 +314,7 @@ def _get_cloud_db_file_and_ts(drive, folder_id: str):
                 except Exception:
                     pass
 
+        _SESSION.remember_file(GDRIVE_DB_FILENAME, gfile['id'])
         remote_ts = _iso_to_epoch(gfile.get("modifiedDate"))
         return gfile, remote_ts
     except Exception:
@@ -198,6 +328,11 @@ def _find_file_in_folder(drive, folder_id: str, filename: str):
     중복이면 최신(modifiedDate) 1개만 남기고 나머지는 Trash 처리.
     """
     try:
+        fid = _SESSION.get_file_id(filename)
+        if fid:
+            # id만 알면 업로드(갱신)에는 충분하므로 조회 없이 핸들만 만든다
+            return drive.CreateFile({'id': fid, 'title': filename})
+
         query = f"'{folder_id}' in parents and title = '{filename}' and trashed = false"
         file_list = drive.ListFile({'q': query}).GetList()
         if not file_list:
@@ -215,94 +350,77 @@ def _find_file_in_folder(drive, folder_id: str, filename: str):
                 except Exception:
                     pass
 
+        _SESSION.remember_file(filename, gfile['id'])
         return gfile
     except Exception:
         return None
 
 
-def cloud_changed_since_last_sync() -> bool:
-    """
-    '마지막으로 내가 받아온 클라우드 버전' 이후에 클라우드가 바뀌었는지 검사.
-    True면 업로드 금지(덮어쓰기 위험).
+def _is_remote_newer_than_marker(remote_ts: int) -> bool:
+    last_ts = _load_last_sync_ts()
 
-    [수정]
-    - last_cloud_sync_ts.txt(마커)가 없더라도,
-      클라우드에 DB가 "아예 없는 경우(remote_ts==0)"에는 업로드를 허용한다.
-    - 클라우드 DB가 존재하는데 마커가 없으면(동기화 이력 불명) -> 안전을 위해 업로드 금지.
-    """
-    if not HAS_GOOGLE_DRIVE:
+    # ✅ 클라우드에 DB가 아예 없으면: 초기 업로드 허용
+    if remote_ts <= 0:
         return False
 
-    try:
-        drive = _get_drive()
-        if not drive:
-            return False
+    # ✅ 클라우드 DB는 있는데 마커가 없으면: 덮어쓰기 위험 -> 업로드 금지
+    if last_ts <= 0:
+        return True
 
-        folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
-        _, remote_ts = _get_cloud_db_file_and_ts(drive, folder_id)
+    return remote_ts > last_ts
 
-        last_ts = _load_last_sync_ts()
 
-        # ✅ 클라우드에 DB가 아예 없으면: 초기 업로드 허용
-        if remote_ts <= 0:
-            return False
+def _stream_to_file(http, url: str, headers: dict, dest_path, chunk_size: int = None, timeout=None):
+    """
+    HTTP 응답을 chunk 단위로 파일에 바로 기록한다. (파일 전체를 메모리에 올리지 않음)
+    반환: (True, 기록 바이트) / (False, 오류 메시지)
+    """
+    chunk_size = int(chunk_size or SYNC_DOWNLOAD_CHUNK_BYTES)
+    timeout = timeout or SYNC_DOWNLOAD_TIMEOUT_SEC
 
-        # ✅ 클라우드 DB는 있는데 마커가 없으면: 덮어쓰기 위험 -> 업로드 금지
-        if last_ts <= 0:
-            return True
+    with http.get(url, headers=headers, stream=True, timeout=timeout) as r:
+        if r.status_code != 200:
+            return False, f"HTTP {r.status_code}: {r.text[:200]}"
 
-        return remote_ts > last_ts
-    except Exception:
-        # 실패 시 업로드를 막아야 안전
-        return True
+        written = 0
+        with open(dest_path, "wb") as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                if chunk:
+                    f.write(chunk)
+                    written += len(chunk)
+        return True, written
 
 
-def download_latest_db_snapshot():
+def _download_gfile(gfile, dest_path, chunk_size: int = None, timeout=None):
     """
-    클라우드의 timeclock.db를 '임시 스냅샷 파일'로만 다운로드하고,
-    로컬 DB_PATH를 교체하지 않는다.
-    반환: (Path(temp_db_path), remote_ts_epoch) 또는 (None, 0)
+    드라이브 파일을 dest_path 로 스트리밍 다운로드 (download_latest_db / 스냅샷 공용).
+    1) v3 alt=media (캐시 방지 파라미터 포함)
+    2) 실패 시 v2 alt=media 로 재시도 (PyDrive GetContentFile은 내용을 통째로 메모리에 올리므로 쓰지 않음)
+    반환: (True, 기록 바이트) / (False, 오류 메시지)
     """
-    if not HAS_GOOGLE_DRIVE:
-        return None, 0
+    file_id = gfile['id']
+    urls = [
+        f"https://www.googleapis.com/drive/v3/files/{file_id}?alt=media&t={int(time.time())}",
+        f"https://www.googleapis.com/drive/v2/files/{file_id}?alt=media",
+    ]
+
+    last_err = ""
+    for url in urls:
+        try:
+            logging.info(f"[Sync] download: {url}")
+            ok, res = _stream_to_file(_SESSION.http(), url, _SESSION.auth_headers(), dest_path, chunk_size, timeout)
+            if ok:
+                return True, res
+            last_err = res
+        except Exception as e:
+            last_err = str(e)
 
     try:
-        drive = _get_drive()
-        if not drive:
-            return None, 0
-
-        folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
-        gfile, remote_ts = _get_latest_db_file_and_ts(drive, folder_id)
-        if not gfile:
-            return None, 0
-
-        tmp_dir = Path(DB_PATH).parent / "_sync_tmp"
-        tmp_dir.mkdir(parents=True, exist_ok=True)
-
-        ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        temp_path = tmp_dir / f"{Path(DB_PATH).stem}.cloudsnap_{ts}{Path(DB_PATH).suffix}"
-
-        # access token으로 v3 download (캐시 방지)
-        access_token = drive.auth.credentials.access_token
-        timestamp = int(time.time())
-        file_id = gfile['id']
-        download_url = f"https://www.googleapis.com/drive/v3/files/{file_id}?alt=media&t={timestamp}"
-        headers = {"Authorization": f"Bearer {access_token}"}
-
-        logging.info(f"[Sync] snapshot download: {download_url}")
-        resp = requests.get(download_url, headers=headers)
-
-        if resp.status_code == 200:
-            temp_path.write_bytes(resp.content)
-            return temp_path, remote_ts
+        Path(dest_path).unlink(missing_ok=True)
+    except Exception:
+        pass
+    return False, last_err
 
-        # 실패 시 PyDrive fallback
-        gfile.GetContentFile(str(temp_path))
-        return temp_path, remote_ts
-
-    except Exception as e:
-        logging.error(f"[Sync] snapshot download failed: {e}")
-        return None, 0
 
 def _iso_to_epoch(iso_str: str) -> int:
     """
@@ -325,25 +443,14 @@ def _iso_to_epoch(iso_str: str) -> int:
         return 0
 
 
-def _get_latest_db_file_and_ts(*args, **kwargs):
-    """
-    구버전 코드 호환용 alias.
-    기존 구현 함수명이 _get_cloud_db_file_and_ts 라면 그걸 호출.
+def download_latest_db(db):
     """
-    fn = globals().get("_get_cloud_db_file_and_ts")
-    if callable(fn):
-        return fn(*args, **kwargs)
-    raise NameError("_get_cloud_db_file_and_ts is not defined (cannot resolve latest db file)")
-
-
-def download_latest_db(apply_replace: bool = True, temp_path: str = None):
-    """
-    - apply_replace=True (기존 동작): 다운로드 후 로컬 DB(DB_PATH)를 교체
-    - apply_replace=False (안전 모드): 다운로드만 해서 temp_path(또는 자동 temp)로 저장하고,
-      로컬 DB는 절대 건드리지 않음. (대화창 실시간 수신용)
+    클라우드 최신 기준본을 받아 db.apply_snapshot 으로 열린 연결에 복사하고, 그 이후 델타를 반영한다.
+    (DB 파일 교체/재연결/pending 파일 없음. 이 PC의 미전송 변경은 apply_snapshot 이 새 기준본 위에 다시 씀)
+    기준본이 마지막 동기화 이후 그대로면 기준본은 받지 않고 델타만 반영한다.
 
     return:
-      (True, <msg_or_path>) / (False, <error_message>)
+      (True, <msg>) / (False, <error_message>)
     """
     if not HAS_GOOGLE_DRIVE:
         return False, "PyDrive 미설치"
@@ -359,66 +466,44 @@ def download_latest_db(apply_replace: bool = True, temp_path: str = None):
         if not gfile:
             return False, "클라우드 DB 없음"
 
-        # temp_path 결정
-        if not temp_path:
-            # 안전 모드면 _sync_tmp에 저장하는 걸 권장
-            if not apply_replace:
-                sync_tmp = DB_PATH.parent / "_sync_tmp"
-                sync_tmp.mkdir(parents=True, exist_ok=True)
-                temp_path = str(sync_tmp / f"timeclock.dl_{now_str()}.db")
-            else:
-                temp_path = str(DB_PATH) + ".temp"
+        # ✅ 기준본이 마지막 동기화 이후 그대로면 DB 전체를 받지 않고 변경분(델타)만 반영
+        if 0 < remote_ts <= _load_last_sync_ts():
+            n = pull_cloud_deltas(db, drive=drive, folder_id=folder_id)
+            return True, f"클라우드 기준본 변경 없음 (변경분 {n}건 반영)"
+
+        temp_path = str(DB_PATH) + ".temp"
 
         # -------------------------------------------------------------
-        # ✅ PyDrive의 GetContentFile 대신 requests 사용(캐시 무시)
+        # ✅ PyDrive의 GetContentFile 대신 스트리밍 다운로드(캐시 무시, 메모리 일정)
         # -------------------------------------------------------------
         try:
-            # PyDrive 인증 세션(토큰) 기반으로 직접 다운로드 URL 구성
-            access_token = drive.auth.credentials.access_token
-            # v3 alt=media 방식
-            url = f"https://www.googleapis.com/drive/v3/files/{gfile['id']}?alt=media&t={int(time.time())}"
-            headers = {"Authorization": f"Bearer {access_token}"}
-
-            r = requests.get(url, headers=headers, stream=True, timeout=60)
-            if r.status_code != 200:
-                return False, f"다운로드 실패 HTTP {r.status_code}: {r.text[:200]}"
-
-            with open(temp_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
-                        f.write(chunk)
-
+            ok, res = _download_gfile(gfile, temp_path)
+            if not ok:
+                return False, f"다운로드 실패 {res}"
         except Exception as e:
             return False, f"다운로드 예외: {e}"
 
         # -------------------------------------------------------------
-        # ✅ 안전 모드: temp_path만 반환하고 끝 (로컬 DB 교체 금지)
-        # -------------------------------------------------------------
-        if not apply_replace:
-            return True, temp_path
-
-        # -------------------------------------------------------------
-        # 기존 모드: 로컬 DB 교체
+        # 로컬 DB 반영: 열린 DB 연결에 그대로 복사 (파일 잠금과 무관)
         # -------------------------------------------------------------
         try:
-            # 교체는 원자적으로
-            os.replace(temp_path, str(DB_PATH))
+            try:
+                db.apply_snapshot(temp_path)
+            finally:
+                Path(temp_path).unlink(missing_ok=True)
 
             # ✅ [핵심] “내가 이 클라우드 버전을 기반으로 작업한다” 마커 저장
             # 업로드 차단 루프를 끊기 위해 반드시 필요
             if remote_ts and remote_ts > 0:
                 _save_last_sync_ts(remote_ts)
 
+            # 기준본 이후 델타 적용 (내 델타도: 기준본에 포함되지 않았으면 교체로 지워졌으므로 다시 반영)
+            n = pull_cloud_deltas(db, drive=drive, folder_id=folder_id, skip_own=False)
+            if n:
+                return True, f"클라우드 최신 DB 다운로드 완료 (변경분 {n}건 반영)"
+
         except Exception as e:
-            # 교체 실패 시 temp 보관
-            try:
-                pending_dir = DB_PATH.parent / "_sync_tmp"
-                pending_dir.mkdir(parents=True, exist_ok=True)
-                pending_path = str(pending_dir / f"timeclock.dl_pending_{now_str()}.db")
-                os.replace(temp_path, pending_path)
-                return False, f"로컬 DB 교체 실패(잠김). pending으로 보관: {e}"
-            except Exception:
-                return False, f"로컬 DB 교체 실패: {e}"
+            return False, f"로컬 DB 반영 실패: {e}"
 
         return True, "클라우드 최신 DB 다운로드 완료"
 
@@ -427,43 +512,20 @@ def download_latest_db(apply_replace: bool = True, temp_path: str = None):
         return False, str(e)
 
 
-
-def apply_pending_db_if_exists():
-    """
-    download_latest_db()가 DB 잠김으로 교체를 못 했을 때 생성한
-    timeclock.db.pending 파일을, 잠금이 풀린 시점에 원자적으로 교체한다.
-    """
-    try:
-        pending_path = DB_PATH.parent / f"{DB_PATH.name}.pending"
-        if not pending_path.exists():
-            return False
-
-        # 잠깐 재시도
-        for _ in range(6):
-            try:
-                os.replace(str(pending_path), str(DB_PATH))
-                logging.info("[Sync] pending DB 적용 완료")
-                return True
-            except Exception:
-                time.sleep(0.25)
-        return False
-    except Exception:
-        return False
-
-
-def is_cloud_newer():
+def upload_current_db(db):
     """
-    기존 로직(로컬 mtime vs 클라우드 modifiedDate) 기반의 '신규 여부' 판단은
-    덮어쓰기 사고를 유발하므로,
-    여기서는 '클라우드가 마지막 동기화 이후 변경되었는지'로 대체합니다.
+    - db 가 DB 객체면 변경분만 델타로 업로드 (push_local_changes)
+    - 파일 경로(스냅샷)면 해당 파일을 기준본으로 통째로 업로드
+    (UI 화면에서는 직접 부르지 않고 sync_scheduler.notify 를 사용한다)
     """
-    return cloud_changed_since_last_sync()
+    if hasattr(db, "run_write"):
+        return push_local_changes(db)
+    return upload_base_db(db)
 
 
-# timeclock/sync_manager.py 내 upload_current_db 함수 전체입니다.
-
-def upload_current_db(db_path: Path = None):
+def upload_base_db(db_path: Path = None):
     """
+    DB 파일 전체(기준본)를 클라우드의 timeclock.db 로 업로드.
     - db_path가 주어지면 해당 파일(스냅샷)을 업로드
     - 주어지지 않으면 기본 DB_PATH 업로드
     """
@@ -486,8 +548,11 @@ def upload_current_db(db_path: Path = None):
 
             folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
 
+            # 클라우드 기준본 조회는 1회만 (충돌 검사 + 업로드 대상 파일 겸용)
+            gfile, remote_ts = _get_cloud_db_file_and_ts(drive, folder_id)
+
             # ✅ 충돌 감지(덮어쓰기 방지): 서버가 로컬보다 최신이면 업로드를 차단합니다.
-            if cloud_changed_since_last_sync():
+            if _is_remote_newer_than_marker(remote_ts):
                 logging.warning(
                     "[Sync] 업로드 차단: 클라우드 DB가 마지막 동기화 이후 변경되었습니다. "
                     "먼저 최신 DB를 다운로드(병합)한 뒤 다시 시도하세요."
@@ -498,27 +563,18 @@ def upload_current_db(db_path: Path = None):
             _LAST_UL_CALL_TS = now
             upload_path = Path(db_path) if db_path else Path(DB_PATH)
 
-            query = f"'{folder_id}' in parents and title = '{GDRIVE_DB_FILENAME}' and trashed = false"
-            file_list = drive.ListFile({'q': query}).GetList()
-
-            if file_list:
-                file_list.sort(key=lambda x: x.get('modifiedDate', ''), reverse=True)
-                gfile = file_list[0]
-                if len(file_list) > 1:
-                    for old_f in file_list[1:]:
-                        try:
-                            old_f.Trash()
-                        except Exception:
-                            pass
-            else:
+            if gfile is None:
                 gfile = drive.CreateFile({'title': GDRIVE_DB_FILENAME, 'parents': [{'id': folder_id}]})
 
             gfile.SetContentFile(str(upload_path))
             gfile.Upload()
+            _SESSION.remember_file(GDRIVE_DB_FILENAME, gfile['id'])
 
             # ✅ 업로드 완료 후 마커를 저장하여 충돌 방지 로직이 정상 작동하게 합니다.
+            # (Upload 응답에 modifiedDate가 담겨 오므로 없을 때만 추가 조회)
             try:
-                gfile.FetchMetadata(fields="modifiedDate")
+                if not gfile.get("modifiedDate"):
+                    gfile.FetchMetadata(fields="modifiedDate")
                 remote_ts = _parse_gdrive_modified_date(gfile.get("modifiedDate", ""))
                 if remote_ts and remote_ts > 0:
                     _save_last_sync_ts(remote_ts)
@@ -530,15 +586,345 @@ def upload_current_db(db_path: Path = None):
 
         except Exception as e:
             logging.error(f"[Sync] 업로드 실패: {e}")
+            _SESSION.forget_ids()
             return False
 
 
+# ----------------------------------------------------------------
+# 델타(변경분) 동기화 - 파일 형식/적용은 delta_sync 참고
+# ----------------------------------------------------------------
+def _list_cloud_deltas(drive, folder_id: str):
+    """동기화 폴더의 델타 파일 목록 (파일명 = 생성시각 순 정렬)"""
+    query = (
+        f"'{folder_id}' in parents and title contains '{delta_sync.DELTA_PREFIX}' "
+        f"and trashed = false"
+    )
+    file_list = drive.ListFile({'q': query}).GetList()
+    file_list = [f for f in file_list if str(f.get('title', '')).startswith(delta_sync.DELTA_PREFIX)]
+    file_list.sort(key=lambda x: x.get('title', ''))
+    return file_list
+
+
+def _snapshot_db(db_path: Path) -> Path:
+    """업로드용 일관 스냅샷 (backup_manager.snapshot_db, 원본 연결은 건드리지 않음)"""
+    tmp_dir = Path(db_path).parent / "_sync_tmp"
+    ts = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    snap_path = tmp_dir / f"{Path(db_path).stem}.snapshot_{ts}{Path(db_path).suffix}"
+    return backup_manager.snapshot_db(snap_path, src_path=db_path)
+
+
+def _applied_names(target) -> set:
+    if hasattr(target, "run_write"):
+        return delta_sync.applied_delta_names(target.conn)
+    conn = sqlite3.connect(str(target), timeout=30)
+    try:
+        return delta_sync.applied_delta_names(conn)
+    finally:
+        conn.close()
+
+
+def pull_cloud_deltas(db, drive=None, folder_id: str = None, skip_own: bool = True) -> int:
+    """
+    클라우드 델타 중 db 에 아직 반영되지 않은 것만 받아 적용한다.
+    (이미 반영된 델타 이름은 DB의 sync_applied_deltas 에 있다)
+    db: 앱이 연 DB 객체 (반영은 db.run_write 로 쓰기 스레드에서)
+    반환: 새로 적용한 델타 개수
+    """
+    if not HAS_GOOGLE_DRIVE:
+        return 0
+
+    with _SYNC_LOCK:
+        if drive is None:
+            drive = _get_drive()
+            if not drive:
+                return 0
+        if folder_id is None:
+            folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
+
+        own_suffix = f"_{delta_sync.get_device_id()}.json"
+
+        applied = _applied_names(db)
+        n = 0
+        for gfile in _list_cloud_deltas(drive, folder_id):
+            name = gfile['title']
+            if name in applied:
+                continue
+            if skip_own and name.endswith(own_suffix):
+                continue
+            # 다운로드는 이 스레드에서, 반영만 쓰기 스레드에서
+            delta = json.loads(gfile.GetContentString())
+            if db.run_write(lambda conn: delta_sync.apply_delta(conn, name, delta)):
+                n += 1
+        if n:
+            logging.info(f"[Sync] 델타 {n}건 적용")
+        return n
+
+
+def push_local_changes(db) -> bool:
+    """
+    앱이 연 DB(db)에서 마지막 동기화 이후 바뀐 행만 델타 파일로 업로드한다.
+    - 클라우드에 기준본이 아직 없으면 DB 전체를 기준본으로 올린다.
+    - 마지막 동기화 이후 클라우드 기준본이 바뀌었으면(다른 PC의 압축 등) 새 기준본을 먼저 받는다.
+      (이 PC의 미전송 변경은 apply_snapshot 이 새 기준본 위에 다시 쓰므로 이어서 델타로 전송된다.
+       기준본을 받지 못하면 업로드하지 않고 변경 로그를 그대로 둔다)
+    - 내보내기 전에 아직 반영하지 않은 클라우드 델타를 먼저 적용한다.
+    - 업로드가 실패하면 변경 로그가 그대로 남아 다음 호출 때 함께 전송된다.
+    - 델타가 SYNC_DELTA_COMPACT_EVERY 개 이상 쌓이면 기준본으로 압축한다.
+    - 변경 로그 정리(ack)와 델타 반영은 db.run_write 로 쓰기 스레드에서 처리한다.
+    """
+    if not HAS_GOOGLE_DRIVE:
+        return False
+
+    db_path = Path(db.db_path)
+
+    with _SYNC_LOCK:
+        try:
+            drive = _get_drive()
+            if not drive:
+                return False
+            folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
+
+            gbase, remote_ts = _get_cloud_db_file_and_ts(drive, folder_id)
+
+            # ✅ 충돌 감지: 기준본이 내가 받은 버전 이후 바뀌었으면 그 기준본부터 반영한 뒤 델타를 올린다.
+            if _is_remote_newer_than_marker(remote_ts):
+                ok, msg = download_latest_db(db)
+                if not ok:
+                    logging.warning(f"[Sync] 델타 업로드 보류: 새 클라우드 기준본 반영 실패 ({msg})")
+                    return False
+                logging.info(f"[Sync] 새 클라우드 기준본 반영 후 변경분 전송: {msg}")
+
+            if gbase is None:
+                # 최초 업로드: 기준본 자체가 모든 변경을 포함
+                max_seq = db.conn.execute("SELECT IFNULL(MAX(seq), 0) FROM sync_changes").fetchone()[0]
+                snap_path = _snapshot_db(db_path)
+                try:
+                    ok = upload_base_db(snap_path)
+                finally:
+                    snap_path.unlink(missing_ok=True)
+                if ok:
+                    db.run_write(lambda conn: delta_sync.ack_delta(conn, None, max_seq))
+                return ok
+
+            # 상대 PC 델타를 먼저 반영 (uid 기준 병합, 동시 수정은 sync_conflicts 에 기록)
+            pull_cloud_deltas(db, drive=drive, folder_id=folder_id)
+
+            delta_path, name, max_seq = delta_sync.export_delta_file(db.conn, db_path.parent / "_sync_tmp")
+            if not delta_path:
+                return True
+
+            try:
+                gfile = drive.CreateFile({'title': name, 'parents': [{'id': folder_id}]})
+                gfile.SetContentFile(str(delta_path))
+                gfile.Upload()
+            except Exception:
+                _SESSION.forget_ids()
+                raise
+            finally:
+                delta_path.unlink(missing_ok=True)
+
+            db.run_write(lambda conn: delta_sync.ack_delta(conn, name, max_seq))
+            logging.info(f"[Sync] 델타 업로드 완료: {name}")
+
+            if len(_list_cloud_deltas(drive, folder_id)) >= SYNC_DELTA_COMPACT_EVERY:
+                compact_deltas(db, drive=drive, folder_id=folder_id)
+            return True
+
+        except Exception as e:
+            logging.error(f"[Sync] 델타 업로드 실패: {e}")
+            return False
+
+
+def compact_deltas(db, drive=None, folder_id: str = None) -> bool:
+    """
+    클라우드에 쌓인 델타를 기준본으로 압축한다.
+    1) 아직 반영 안 한 델타를 모두 적용
+    2) 스냅샷을 기준본(timeclock.db)으로 업로드 (클라우드 기준본이 바뀌었으면 upload_base_db가 차단)
+    3) 스냅샷에 반영된 델타 파일만 휴지통으로 이동
+    """
+    if not HAS_GOOGLE_DRIVE:
+        return False
+
+    with _SYNC_LOCK:
+        try:
+            if drive is None:
+                drive = _get_drive()
+                if not drive:
+                    return False
+            if folder_id is None:
+                folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
+
+            pull_cloud_deltas(db, drive=drive, folder_id=folder_id)
+
+            snap_path = _snapshot_db(db.db_path)
+            try:
+                included = _applied_names(snap_path)
+                ok = upload_base_db(snap_path)
+            finally:
+                snap_path.unlink(missing_ok=True)
+
+            if not ok:
+                return False
+
+            n = 0
+            for gfile in _list_cloud_deltas(drive, folder_id):
+                if gfile['title'] in included:
+                    try:
+                        gfile.Trash()
+                        n += 1
+                    except Exception:
+                        pass
+            logging.info(f"[Sync] 델타 압축 완료: {n}건 → 기준본")
+            return True
+
+        except Exception as e:
+            logging.error(f"[Sync] 델타 압축 실패: {e}")
+            return False
+
+
+
+# ----------------------------------------------------------------
+# 이의제기 대화 피드 (대화방 2초 폴링용)
+# - 파일: dispute_feed_{dispute_uid}_{device}.jsonl  (PC마다 자기 파일에만 한 줄씩 덧붙임)
+#   (로컬 id 는 PC마다 다를 수 있으므로 이의제기 uid 로 대화방을 구분한다)
+# - 폴링: 폴더 목록(메타데이터)만 조회 → 크기가 그대로면 내용은 0바이트 전송
+#         커졌으면 Range 요청으로 지난번 이후 바이트만 받는다.
+# - 읽은 위치는 DB(dispute_feed_state)에 저장한다. (DB.sync_dispute_thread_from_cloud)
+# ----------------------------------------------------------------
+DISPUTE_FEED_PREFIX = "dispute_feed_"
+DISPUTE_FEED_DIR = DB_PATH.parent / "dispute_feeds"
+
+_FEED_LOCK = threading.RLock()
+
+
+def _dispute_feed_name(dispute_uid: str, device_id: str = None) -> str:
+    return f"{DISPUTE_FEED_PREFIX}{dispute_uid}_{device_id or delta_sync.get_device_id()}.jsonl"
+
+
+def append_dispute_feed(dispute_uid: str, records: list) -> bool:
+    """
+    내 피드 파일에 레코드를 덧붙이고 업로드한다. (백그라운드 스레드에서 호출)
+    records: [{"kind": "msg"|"status", ...}, ...]
+    """
+    if not HAS_GOOGLE_DRIVE or not records:
+        return False
+
+    name = _dispute_feed_name(dispute_uid)
+    local_path = DISPUTE_FEED_DIR / name
+
+    with _FEED_LOCK:
+        try:
+            DISPUTE_FEED_DIR.mkdir(parents=True, exist_ok=True)
+            with open(local_path, "a", encoding="utf-8", newline="\n") as f:
+                for rec in records:
+                    f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+            drive = _get_drive()
+            if not drive:
+                return False
+            folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
+
+            gfile = _find_file_in_folder(drive, folder_id, name)
+            if gfile is None:
+                gfile = drive.CreateFile({'title': name, 'parents': [{'id': folder_id}]})
+            gfile.SetContentFile(str(local_path))
+            gfile.Upload()
+            return True
+        except Exception as e:
+            logging.error(f"[Sync] dispute feed upload failed: {e}")
+            return False
+
+
+def _fetch_feed_bytes(drive, gfile, offset: int) -> bytes:
+    """offset 이후 바이트만 다운로드 (Range). 서버가 Range를 무시하면 앞부분을 잘라낸다."""
+    url = f"https://www.googleapis.com/drive/v3/files/{gfile['id']}?alt=media"
+    headers = _SESSION.auth_headers()
+    if offset > 0:
+        headers["Range"] = f"bytes={int(offset)}-"
+
+    r = _SESSION.http().get(url, headers=headers, timeout=30)
+    if r.status_code == 206:
+        return r.content
+    if r.status_code == 200:
+        return r.content[offset:]
+    if r.status_code == 416:
+        return b""
+    raise RuntimeError(f"HTTP {r.status_code}")
+
+
+def fetch_dispute_feed(dispute_uid: str, state: dict = None) -> tuple:
+    """
+    상대방 피드에서 지난번 이후 새로 생긴 레코드만 반환.
+    변경이 없으면 메타데이터 조회 1회로 끝나고 빈 리스트를 반환한다.
+    state: {file_id: {"offset": 읽은 바이트, "tail": 덜 끝난 줄, "last_id": 마지막 메시지 id}}
+           (DB 에 저장해 둔 읽은 위치, 넘긴 dict 는 바꾸지 않음)
+    반환: (새 레코드 목록, 읽은 위치가 바뀐 파일만 담은 state)
+    """
+    if not HAS_GOOGLE_DRIVE:
+        return [], {}
+    state = state or {}
+
+    prefix = f"{DISPUTE_FEED_PREFIX}{dispute_uid}_"
+    own_name = _dispute_feed_name(dispute_uid)
+
+    with _FEED_LOCK:
+        try:
+            drive = _get_drive()
+            if not drive:
+                return [], {}
+            folder_id = _get_folder_id(drive, GDRIVE_SYNC_FOLDER_NAME)
+
+            query = f"'{folder_id}' in parents and title contains '{prefix}' and trashed = false"
+            files = [
+                f for f in drive.ListFile({'q': query}).GetList()
+                if str(f.get('title', '')).startswith(prefix) and f.get('title') != own_name
+            ]
+
+            out = []
+            new_state = {}
+            for gfile in files:
+                st = dict(state.get(gfile['id']) or {"offset": 0, "tail": b"", "last_id": 0})
+                size = int(gfile.get('fileSize') or 0)
+
+                # ✅ 크기 그대로 → 새 내용 없음 (본문 다운로드 안 함)
+                if size == st["offset"]:
+                    continue
+                # 파일이 다시 만들어져 줄어든 경우 처음부터
+                if size < st["offset"]:
+                    st.update({"offset": 0, "tail": b""})
+
+                chunk = _fetch_feed_bytes(drive, gfile, st["offset"])
+                st["offset"] += len(chunk)
+                new_state[gfile['id']] = st
+
+                buf = st["tail"] + chunk
+                lines = buf.split(b"\n")
+                st["tail"] = lines.pop()  # 마지막 줄은 아직 덜 써졌을 수 있음
+
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        rec = json.loads(line.decode("utf-8"))
+                    except Exception:
+                        continue
+                    if rec.get("kind") == "msg":
+                        mid = int(rec.get("id") or 0)
+                        if mid <= st["last_id"]:
+                            continue
+                        st["last_id"] = mid
+                    out.append(rec)
+            return out, new_state
+        except Exception as e:
+            logging.error(f"[Sync] dispute feed fetch failed: {e}")
+            return [], {}
+
 
-def run_startup_sync():
+def run_startup_sync(db):
     """
-    [핵심] 프로그램 시작 시 실행.
+    [핵심] 프로그램 시작 시 실행. (DB(DB_PATH)를 연 뒤 호출)
     구글 드라이브(Cloud) 시간이 내 컴퓨터(Local) 시간보다 최신이면
-    묻지도 따지지도 않고 다운로드하여 DB를 덮어쓴다.
+    묻지도 따지지도 않고 다운로드하여 db.apply_snapshot 으로 열린 DB에 덮어쓴다.
     """
     if not HAS_GOOGLE_DRIVE:
         print("[Startup] 구글 드라이브 모듈 없음.")
@@ -566,13 +952,14 @@ def run_startup_sync():
             print("[Startup] 최신 DB를 다운로드합니다...")
 
             # 다운로드 실행
-            success, msg = download_latest_db()
+            success, msg = download_latest_db(db)
             if success:
                 print(f"[Startup] 동기화 완료: {msg}")
             else:
                 print(f"[Startup] 동기화 실패: {msg}")
         else:
-            print("[Startup] 현재 데이터가 최신입니다. 다운로드 안 함.")
+            n = pull_cloud_deltas(db, drive=drive, folder_id=folder_id)
+            print(f"[Startup] 기준본은 최신입니다. 변경분 {n}건 반영.")
 
     except Exception as e:
         print(f"[Startup] 오류 발생: {e}")
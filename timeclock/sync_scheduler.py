@@ -0,0 +1,187 @@
+# timeclock/sync_scheduler.py
+# -*- coding: utf-8 -*-
+"""
+백그라운드 동기화 스케줄러 (DB._save_and_sync 전용)
+
+- 쓰기 메서드는 notify(db)로 '변경됨'만 알리고 바로 돌아간다. (알림은 DB 객체 단위로 모은다)
+- 업로드(sync_manager.push_local_changes)는 그 DB 객체를 받아 변경 로그 정리/델타 반영을
+  DB.run_write 로 쓰기 스레드에서 처리한다. (열린 DB에 별도 쓰기 연결을 만들지 않음)
+- 스케줄러 스레드 1개가 SYNC_DEBOUNCE_SEC 동안 들어온 알림을 모아서
+  구간당 백업 1회 + 변경분 업로드 1회만 실행한다.
+- 업로드가 실패하면 버리지 않고 SYNC_RETRY_BASE_SEC 부터 두 배씩(최대 SYNC_RETRY_MAX_SEC) 늘려 재시도한다.
+- 구글 드라이브 모듈이 없으면(HAS_GOOGLE_DRIVE=False) 업로드/재시도는 하지 않는다. (로컬 백업만)
+- UI 화면의 업로드도 sync_manager 를 직접 부르지 않고 notify() 로 알린다.
+  바로 전송돼야 하는 경우(비밀번호 변경 등)에만 flush() 로 구간을 앞당긴다.
+  flush() 는 그 구간의 업로드가 모두 성공했는지를 돌려준다. (실패분은 그대로 재시도 예약)
+"""
+import time
+import queue
+import threading
+import logging
+
+from timeclock import backup_manager
+from timeclock import sync_manager
+from timeclock.settings import SYNC_DEBOUNCE_SEC, SYNC_RETRY_BASE_SEC, SYNC_RETRY_MAX_SEC
+
+RETRY_TAG = "retry"
+
+
+class _FlushWaiter:
+    """flush() 대기표: 구간 처리가 끝나면 done 이 켜지고, ok 에 업로드 성공 여부가 담긴다"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.ok = False
+
+
+class SyncScheduler:
+    def __init__(self, window_sec=SYNC_DEBOUNCE_SEC, retry_base_sec=SYNC_RETRY_BASE_SEC,
+                 retry_max_sec=SYNC_RETRY_MAX_SEC):
+        self.window_sec = float(window_sec)
+        self.retry_base_sec = float(retry_base_sec)
+        self.retry_max_sec = float(retry_max_sec)
+
+        self._q = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._retry_delay = {}   # DB -> 다음 재시도 대기(초)
+        self._retry_timer = {}   # DB -> threading.Timer
+
+    # ----------------------------------------------------------------
+    # public
+    # ----------------------------------------------------------------
+    def notify(self, db, tag: str = "change"):
+        """변경 알림 (UI/작업 스레드에서 호출, 즉시 반환)"""
+        self._ensure_thread()
+        self._q.put((db, tag))
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        """
+        대기 중인 알림을 구간 종료를 기다리지 않고 바로 처리 (앱 종료 시 / 즉시 전송)
+        반환: timeout 안에 구간이 끝났고 그 구간의 업로드(push_local_changes)가 모두 성공했으면 True
+              (드라이브 모듈이 없어 업로드하지 못한 경우도 False, 올릴 변경이 없던 구간은 True)
+        """
+        self._ensure_thread()
+        waiter = _FlushWaiter()
+        self._q.put((None, waiter))
+        return waiter.done.wait(timeout) and waiter.ok
+
+    # ----------------------------------------------------------------
+    # worker
+    # ----------------------------------------------------------------
+    def _ensure_thread(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="SyncScheduler", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._q.get()
+            pending = {}
+            waiters = []
+            self._collect(item, pending, waiters)
+
+            # 구간 동안 들어오는 알림을 합친다 (flush 요청이 오면 즉시 종료)
+            deadline = time.time() + self.window_sec
+            while not waiters:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._q.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                self._collect(item, pending, waiters)
+
+            # flush 요청 시점까지 큐에 남은 것도 함께 처리
+            while waiters:
+                try:
+                    self._collect(self._q.get_nowait(), pending, waiters)
+                except queue.Empty:
+                    break
+
+            ok = True
+            for db, tags in pending.items():
+                if not self._sync_once(db, tags):
+                    ok = False
+
+            for w in waiters:
+                w.ok = ok
+                w.done.set()
+
+    @staticmethod
+    def _collect(item, pending, waiters):
+        db, tag = item
+        if db is None:
+            waiters.append(tag)
+            return
+        pending.setdefault(db, []).append(tag)
+
+    def _sync_once(self, db, tags) -> bool:
+        """구간 1회 처리: 백업 + 변경분 업로드. 반환: 업로드 성공 여부"""
+        real_tags = [t for t in tags if t != RETRY_TAG]
+        n = len(real_tags)
+        if n:
+            tag = real_tags[-1] if n == 1 else f"{real_tags[-1]}_x{n}"
+        else:
+            tag = RETRY_TAG
+        print(f"🔄 [AutoSync] '{tag}' 동기화 시작... (알림 {len(tags)}건 병합)")
+
+        # 로컬/드라이브 백업은 구간당 1회 (재시도만 있는 구간은 생략)
+        if n:
+            try:
+                backup_manager.run_backup(tag)
+            except Exception as e:
+                print(f"⚠️ [AutoSync] backup failed: {e}")
+
+        # 드라이브 모듈이 없으면 영구적으로 업로드 불가 → 재시도하지 않는다
+        if not sync_manager.HAS_GOOGLE_DRIVE:
+            return False
+
+        try:
+            ok = sync_manager.push_local_changes(db)
+        except Exception as e:
+            logging.error(f"[AutoSync] upload failed: {e}")
+            ok = False
+
+        if ok:
+            print(f"✅ [AutoSync] '{tag}' 업로드 완료")
+            self._retry_delay.pop(db, None)
+            return True
+
+        delay = self._retry_delay.get(db, self.retry_base_sec)
+        self._retry_delay[db] = min(delay * 2, self.retry_max_sec)
+        print(f"⚠️ [AutoSync] '{tag}' 업로드 실패/차단 → {delay:.1f}초 후 재시도")
+        self._schedule_retry(db, delay)
+        return False
+
+    def _schedule_retry(self, db, delay):
+        with self._lock:
+            old = self._retry_timer.get(db)
+            if old is not None:
+                old.cancel()
+            t = threading.Timer(delay, self.notify, args=(db, RETRY_TAG))
+            t.daemon = True
+            self._retry_timer[db] = t
+            t.start()
+
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler() -> SyncScheduler:
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = SyncScheduler()
+        return _SCHEDULER
+
+
+def notify(db, tag: str = "change"):
+    get_scheduler().notify(db, tag)
+
+
+def flush(timeout: float = 10.0) -> bool:
+    return get_scheduler().flush(timeout)
@@ -11,6 +11,7 @@ from timeclock.db import DB
 from ui.main_window import MainWindow
 from timeclock import backup_manager
 from timeclock import sync_manager
+from timeclock import sync_scheduler
 
 def _ensure_backup_id_or_exit(app: QtWidgets.QApplication) -> str:
     """
@@ -160,17 +161,13 @@ def main():
 
     setup_logging()
 
-    # [Sync] 앱 시작 시 최신 DB 다운로드 (동기화)
-    # 로그인 화면이 뜨기 전에 최신 데이터를 받아옵니다.
-    print("[Sync] 최신 DB 확인 중...")
-    ok, msg = sync_manager.download_latest_db()
-    if ok:
-        print(f"[Sync] {msg}")
-    else:
-        print(f"[Sync] 동기화 건너뜀: {msg}")
-
     db = DB(DB_PATH)
 
+    # [Sync] 앱 시작 시 최신 DB 반영 (동기화)
+    # 로그인 화면이 뜨기 전에 최신 데이터를 받아 열린 DB에 apply_snapshot 으로 복사합니다.
+    print("[Sync] 최신 DB 확인 중...")
+    sync_manager.run_startup_sync(db)
+
     # [1] 6시간 주기 자동 백업 타이머
     backup_timer = QTimer()
     interval = 6 * 60 * 60 * 1000
@@ -185,9 +182,15 @@ def main():
 
     # 메인 루프 실행
     rc = app.exec_()
+
+    # 아직 업로드되지 않은 변경분 마무리
+    sync_scheduler.flush(timeout=10)
+
     db.close()
     sys.exit(rc)
 
 
 if __name__ == "__main__":
+    import multiprocessing
+    multiprocessing.freeze_support()  # exe 에서 명세서 일괄 발급용 프로세스 풀이 앱을 다시 띄우지 않도록
     main()
\ No newline at end of file
@@ -0,0 +1,96 @@
+# tools/bench_download.py
+# -*- coding: utf-8 -*-
+"""
+클라우드 DB 다운로드 메모리 벤치마크
+
+로컬 HTTP 서버에 크기별 더미 DB 파일을 올려두고,
+- 기존 방식: requests.get(...) → resp.content 를 한 번에 기록
+- 스트리밍: sync_manager._stream_to_file (chunk 단위 기록)
+각각을 별도 프로세스에서 실행해 최대 메모리(tracemalloc peak / 최대 RSS)를 비교한다.
+
+스트리밍 쪽은 파일이 커져도 peak 가 chunk 크기 근처에서 일정해야 한다.
+
+실행(저장소 루트에서): python -m tools.bench_download [MB 크기들...]   (기본: 8 32 128)
+(앱 빌드 대상 아님: timeclock_app.spec 에서 tools 제외)
+"""
+import os
+import sys
+import tempfile
+import threading
+import functools
+import multiprocessing as mp
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+
+def _max_rss_mb():
+    try:
+        import resource
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS는 bytes, Linux는 KB
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+    except Exception:
+        return float("nan")  # Windows: resource 모듈 없음
+
+
+def _measure(mode, url, dest, out_q):
+    import tracemalloc
+    import requests
+    from timeclock.sync_manager import _stream_to_file
+
+    http = requests.Session()
+    base_rss = _max_rss_mb()
+    tracemalloc.start()
+
+    if mode == "content":
+        r = http.get(url, timeout=60)
+        with open(dest, "wb") as f:
+            f.write(r.content)
+    else:
+        ok, res = _stream_to_file(http, url, {}, dest)
+        if not ok:
+            raise RuntimeError(res)
+
+    _cur, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    out_q.put((peak / (1024 * 1024), _max_rss_mb() - base_rss))
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+def main():
+    sizes = [int(x) for x in sys.argv[1:]] or [8, 32, 128]
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # 저장소 루트 (timeclock 패키지)
+
+    with tempfile.TemporaryDirectory() as root:
+        for mb in sizes:
+            with open(os.path.join(root, f"db_{mb}.bin"), "wb") as f:
+                block = os.urandom(1024 * 1024)
+                for _ in range(mb):
+                    f.write(block)
+
+        handler = functools.partial(_QuietHandler, directory=root)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_address[1]
+
+        ctx = mp.get_context("spawn")
+        print(f"{'size':>8} | {'mode':>9} | {'py peak MB':>10} | {'RSS +MB':>8}")
+        print("-" * 46)
+        for mb in sizes:
+            url = f"http://127.0.0.1:{port}/db_{mb}.bin"
+            for mode in ("content", "stream"):
+                q = ctx.Queue()
+                p = ctx.Process(target=_measure, args=(mode, url, os.path.join(root, f"out_{mode}.bin"), q))
+                p.start()
+                peak, rss = q.get()
+                p.join()
+                print(f"{mb:>6}MB | {mode:>9} | {peak:>10.1f} | {rss:>8.1f}")
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
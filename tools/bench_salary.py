@@ -0,0 +1,92 @@
+# tools/bench_salary.py
+# -*- coding: utf-8 -*-
+"""
+급여 계산 벤치마크 (결과 동등성 검사는 tests/test_salary.py)
+
+1) 마이크로 벤치마크: 근무 길이별로 예전 1시간 단위 루프(_night_hours_loop)와
+   SalaryCalculator._calc_night_hours(구간 산술)의 호출당 시간을 비교한다.
+2) numpy 경로: 1년치 x 여러 직원 정산 시간을 순수 Python 경로(calculate_parsed)와 비교한다.
+   (numpy 미설치 시 생략)
+
+실행(저장소 루트에서): python -m tools.bench_salary
+(앱 빌드 대상 아님: timeclock_app.spec 에서 tools 제외)
+"""
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from timeclock import salary
+from timeclock.salary import SalaryCalculator
+
+
+def _night_hours_loop(start_dt, end_dt):
+    """예전 구현 (비교용): 정시마다 끊어 가며 22:00 ~ 06:00 여부 누적"""
+    night = 0.0
+    curr = start_dt
+    while curr < end_dt:
+        h = curr.hour
+        is_night = (h >= 22 or h < 6)
+        nxt = curr.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        if nxt <= curr:
+            nxt += timedelta(hours=1)
+
+        chunk = min(end_dt, nxt)
+        if is_night:
+            night += (chunk - curr).total_seconds() / 3600.0
+        curr = chunk
+    return night
+
+
+def bench():
+    start = datetime(2025, 3, 3, 18, 17, 41)
+    print(f"{'length':>8} | {'loop us':>9} | {'closed us':>9} | {'x':>6}")
+    print("-" * 42)
+    for hours in (4, 9, 14, 48, 24 * 7):
+        end = start + timedelta(hours=hours, minutes=13)
+        n = 20000 if hours <= 14 else 2000
+        t_loop = timeit.timeit(lambda: _night_hours_loop(start, end), number=n) / n * 1e6
+        t_new = timeit.timeit(lambda: SalaryCalculator._calc_night_hours(start, end), number=n) / n * 1e6
+        print(f"{hours:>7}h | {t_loop:>9.2f} | {t_new:>9.2f} | {t_loop / t_new:>5.1f}x")
+
+
+def _random_logs(rng, n, year=2025):
+    logs = []
+    day0 = datetime(year, 1, 1)
+    for i in range(n):
+        s = day0 + timedelta(days=i * 365 // max(n, 1), seconds=rng.randint(0, 86399))
+        e = s + timedelta(seconds=rng.randint(10 * 60, 15 * 3600))
+        approved = rng.random() < 0.9
+        logs.append({
+            "work_date": s.strftime("%Y-%m-%d"),
+            "start_time": s.strftime("%Y-%m-%d %H:%M:%S"),
+            "end_time": e.strftime("%Y-%m-%d %H:%M:%S") if rng.random() < 0.98 else None,
+            "approved_start": s.strftime("%Y-%m-%d %H:%M:%S") if approved else None,
+            "approved_end": e.strftime("%Y-%m-%d %H:%M:%S") if approved else None,
+        })
+    rng.shuffle(logs)
+    return logs
+
+
+def _python_path(calc, logs):
+    return calc.calculate_parsed(*calc.parse_logs(logs))
+
+
+def bench_payroll(workers=30, logs_per_worker=300):
+    rng = random.Random(11)
+    staff = [(SalaryCalculator(10000 + i * 10), _random_logs(rng, logs_per_worker)) for i in range(workers)]
+    t_py = timeit.timeit(lambda: [_python_path(c, l) for c, l in staff], number=3) / 3
+    t_np = timeit.timeit(lambda: [c.calculate_period(l) for c, l in staff], number=3) / 3
+    print(f"1년 정산 {workers}명 x {logs_per_worker}건: python {t_py * 1000:.1f} ms / numpy {t_np * 1000:.1f} ms "
+          f"({t_py / t_np:.1f}x)")
+
+
+def main():
+    bench()
+
+    if salary.HAS_NUMPY:
+        print()
+        bench_payroll()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 # timeclock/ui/async_helper.py
 # -*- coding: utf-8 -*-
+import threading
+
 from PyQt5 import QtWidgets, QtCore, QtGui
 
+from timeclock.settings import JOB_POOL_MAX_THREADS
+
 
 class ProgressDialog(QtWidgets.QDialog):
     def __init__(self, parent, title):
@@ -204,30 +208,6 @@ def run_job_with_progress_async(owner: QtWidgets.QWidget, title: str, job, *, ta
     except Exception:
         pass
 
-    class _Worker(QtCore.QObject):
-        progress = QtCore.pyqtSignal(dict)
-        finished = QtCore.pyqtSignal(object, object)
-
-        @QtCore.pyqtSlot()
-        def run(self):
-            payload = None
-            err = None
-            try:
-                def on_progress(info: dict):
-                    if not isinstance(info, dict):
-                        info = {"msg": str(info)}
-                    self.progress.emit(info)
-
-                payload = job(on_progress)
-            except Exception as ex:
-                err = ex
-            finally:
-                self.finished.emit(payload, err)
-
-    obj = _Worker()
-    th = QtCore.QThread(dlg)
-    obj.moveToThread(th)
-
     def _on_progress(info: dict):
         try:
             on_progress_ui(info)
@@ -256,48 +236,260 @@ def run_job_with_progress_async(owner: QtWidgets.QWidget, title: str, job, *, ta
             except Exception:
                 pass
 
+    # 진행창 작업은 사용자가 누른 작업이므로 폴링보다 먼저 실행
+    JobExecutor.instance().submit(
+        job, _on_finished, kind="progress", priority=PRIORITY_USER, on_progress=_on_progress
+    )
+
+
+# ----------------------------------------------------------------
+# 공용 작업 풀 (진행창 작업 / 로딩창 없는 백그라운드 작업)
+# - 작업마다 QThread 를 새로 만들지 않고 QThreadPool 스레드를 재사용한다. (최대 JOB_POOL_MAX_THREADS 개)
+# - 대기 중인 작업은 priority 가 큰 것부터 시작 (사용자 조작 > 주기 폴링)
+# - kind 별 동시 실행 상한(max_inflight): 같은 kind 가 이미 그만큼 돌고 있으면 새 작업은 버린다.
+#   (2초 폴링이 느린 네트워크에서 겹쳐 쌓이지 않도록)
+# - on_done(result, error) / on_progress(dict) 는 항상 GUI 스레드에서 호출
+# - submit() 은 어느 스레드에서 불러도 된다. (DB 쓰기 스레드의 대화 피드 업로드 등)
+# ----------------------------------------------------------------
+PRIORITY_POLL = 0
+PRIORITY_USER = 10
+
+
+class _JobSignals(QtCore.QObject):
+    progress = QtCore.pyqtSignal(int, dict)            # job_id, info
+    finished = QtCore.pyqtSignal(int, object, object)  # job_id, result, error
+
+
+class _Job(QtCore.QRunnable):
+    def __init__(self, job_id, fn, signals, with_progress):
+        super().__init__()
+        self.setAutoDelete(True)
+        self._job_id = job_id
+        self._fn = fn
+        self._signals = signals
+        self._with_progress = with_progress
+
+    def _report(self, info):
+        if not isinstance(info, dict):
+            info = {"msg": str(info)}
+        self._signals.progress.emit(self._job_id, info)
+
+    def run(self):
+        result = err = None
         try:
-            th.quit()
-            th.wait(100)
-        except Exception:
-            pass
+            if self._with_progress:
+                result = self._fn(self._report)
+            else:
+                result = self._fn()
+        except Exception as e:
+            err = e
+        self._signals.finished.emit(self._job_id, result, err)
+
+
+class JobExecutor(QtCore.QObject):
+    _instance = None
+    _instance_lock = threading.Lock()
+
+    @classmethod
+    def instance(cls):
+        """앱 전체 공용 인스턴스 (완료 콜백이 GUI 스레드로 오도록 GUI 스레드 소속)"""
+        with cls._instance_lock:
+            if cls._instance is None:
+                inst = cls()
+                app = QtWidgets.QApplication.instance()
+                if app is not None and inst.thread() is not app.thread():
+                    inst.moveToThread(app.thread())
+                cls._instance = inst
+        return cls._instance
+
+    def __init__(self, parent=None, max_threads=None):
+        super().__init__(parent)
+        self._pool = QtCore.QThreadPool(self)
+        self._pool.setMaxThreadCount(max(1, int(max_threads or JOB_POOL_MAX_THREADS)))
+        self._jobs = {}      # job_id -> (kind, on_done, on_progress)
+        self._inflight = {}  # kind -> 대기+실행 중 개수
+        self._seq = 0
+        self._lock = threading.Lock()
+
+        self._signals = _JobSignals()
+        self._signals.progress.connect(self._on_progress)
+        self._signals.finished.connect(self._on_finished)
+
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    def inflight(self, kind) -> int:
+        return self._inflight.get(kind, 0)
+
+    def submit(self, fn, on_done=None, *, kind="job", priority=PRIORITY_USER,
+               max_inflight=None, on_progress=None) -> bool:
+        """
+        fn 을 풀 스레드에서 실행 (on_progress 를 주면 fn(report) 형태로 호출).
+        같은 kind 가 max_inflight 개 이상 대기/실행 중이면 실행하지 않고 False 반환.
+        """
+        with self._lock:
+            if max_inflight is not None and self.inflight(kind) >= max_inflight:
+                return False
+
+            self._seq += 1
+            job_id = self._seq
+            self._jobs[job_id] = (kind, on_done, on_progress)
+            self._inflight[kind] = self.inflight(kind) + 1
+        self._pool.start(_Job(job_id, fn, self._signals, on_progress is not None), priority)
+        return True
+
+    @QtCore.pyqtSlot(int, dict)
+    def _on_progress(self, job_id, info):
+        with self._lock:
+            _kind, _on_done, on_progress = self._jobs.get(job_id, (None, None, None))
+        if callable(on_progress):
+            try:
+                on_progress(info)
+            except Exception:
+                pass
+
+    @QtCore.pyqtSlot(int, object, object)
+    def _on_finished(self, job_id, result, err):
+        with self._lock:
+            kind, on_done, _on_progress = self._jobs.pop(job_id, (None, None, None))
+            if kind is None:
+                return
+            left = self.inflight(kind) - 1
+            if left > 0:
+                self._inflight[kind] = left
+            else:
+                self._inflight.pop(kind, None)
+
+        try:
+            if callable(on_done):
+                on_done(result, err)
+            elif err is not None:
+                print(f"⚠️ [Job] {kind} 실패: {err}")
+        except Exception as e:
+            print(f"⚠️ [Job] {kind} 결과 처리 실패: {e}")
 
+    def stop(self):
+        """종료 시: 아직 시작 안 한 작업은 버리고 실행 중인 작업만 잠깐 기다린다."""
         try:
-            jobss = getattr(owner, "_progress_jobs", [])
-            if th in jobss:
-                jobss.remove(th)
-            setattr(owner, "_progress_jobs", jobss)
+            self._pool.clear()
+            self._pool.waitForDone(2000)
         except Exception:
             pass
 
-    obj.progress.connect(_on_progress)
-    obj.finished.connect(_on_finished)
-    th.started.connect(obj.run)
 
-    try:
-        jobs = getattr(owner, "_progress_jobs", None)
-        if not isinstance(jobs, list):
-            jobs = []
-        jobs.append(th)
-        setattr(owner, "_progress_jobs", jobs)
-        setattr(th, "_worker_ref", obj)
-    except Exception:
-        pass
+def run_silent_async(fn, on_done=None, *, kind="silent", priority=PRIORITY_POLL, max_inflight=None) -> bool:
+    """로딩창 없는 백그라운드 작업: JobExecutor.instance().submit() 단축형 (on_done(result, error))"""
+    return JobExecutor.instance().submit(fn, on_done, kind=kind, priority=priority, max_inflight=max_inflight)
+
+# ----------------------------------------------------------------
+# 백그라운드 조회 서비스 (목록 새로고침용)
+# - 조회 + 행 가공을 전용 스레드 1개에서 순서대로 실행한다.
+#   (DB.conn 은 스레드별 연결이라 이 스레드는 자기 읽기 연결을 계속 재사용)
+# - 같은 key 로 새 요청이 들어오면 이전 요청은 낡은 것(superseded):
+#   아직 대기 중이면 실행하지 않고, 이미 실행 중이면 결과를 버린다.
+#   fn(cancelled) 에서 cancelled() 로 중간 확인도 가능
+# ----------------------------------------------------------------
+class _QueryWorker(QtCore.QObject):
+    done = QtCore.pyqtSignal(str, int, object, object)  # key, token, result, error
+
+    def __init__(self, service):
+        super().__init__()
+        self._service = service
+
+    @QtCore.pyqtSlot(str, int, object)
+    def run(self, key, token, fn):
+        def cancelled():
+            return self._service.latest_token(key) != token
+
+        if cancelled():
+            return
+        result = err = None
+        try:
+            result = fn(cancelled)
+        except Exception as e:
+            err = e
+        if not cancelled():
+            self.done.emit(key, token, result, err)
 
-    th.start()
 
+class QueryService(QtCore.QObject):
+    _submit = QtCore.pyqtSignal(str, int, object)
 
-class _SilentWorker(QtCore.QObject):
-    finished = QtCore.pyqtSignal(bool, str)
+    _instance = None
 
-    def __init__(self, fn, parent=None):
-        super().__init__(parent)
-        self._fn = fn
+    @classmethod
+    def instance(cls):
+        """앱 전체 공용 인스턴스 (조회 스레드 1개)"""
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
 
-    @QtCore.pyqtSlot()
-    def run(self):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._tokens = {}
+        self._callbacks = {}
+        self._seq = 0
+
+        self._thread = QtCore.QThread()
+        self._thread.setObjectName("QueryService")
+        self._worker = _QueryWorker(self)
+        self._worker.moveToThread(self._thread)
+        self._submit.connect(self._worker.run)
+        self._worker.done.connect(self._on_done)
+        self._thread.start()
+
+        app = QtWidgets.QApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    def latest_token(self, key):
+        return self._tokens.get(key)
+
+    def submit(self, key, fn, on_done, on_error=None) -> int:
+        """
+        fn(cancelled) 을 조회 스레드에서 실행하고, 끝나면 GUI 스레드에서 on_done(result) 호출.
+        같은 key 의 이전 요청은 자동으로 취소된다. 반환: 요청 번호
+        """
+        self._seq += 1
+        token = self._seq
+        self._tokens[key] = token
+        self._callbacks[key] = (on_done, on_error)
+        self._submit.emit(key, token, fn)
+        return token
+
+    def cancel(self, key):
+        """key 의 대기/실행 중 요청 결과를 버린다."""
+        self._seq += 1
+        self._tokens[key] = -self._seq
+        self._callbacks.pop(key, None)
+
+    @QtCore.pyqtSlot(str, int, object, object)
+    def _on_done(self, key, token, result, err):
+        if self._tokens.get(key) != token:
+            return  # 그 사이 새 요청이 들어옴
+        on_done, on_error = self._callbacks.pop(key, (None, None))
         try:
-            ok = bool(self._fn())
-            self.finished.emit(ok, "")
+            if err is None:
+                if callable(on_done):
+                    on_done(result)
+            elif callable(on_error):
+                on_error(err)
+            else:
+                print(f"⚠️ [Query] {key} 실패: {err}")
         except Exception as e:
-            self.finished.emit(False, str(e))
\ No newline at end of file
+            print(f"⚠️ [Query] {key} 결과 처리 실패: {e}")
+
+    def stop(self):
+        for key in list(self._tokens):
+            self.cancel(key)
+        try:
+            self._thread.quit()
+            self._thread.wait(2000)
+        except Exception:
+            pass
+
+
+def run_query_async(key, fn, on_done, on_error=None) -> int:
+    """QueryService.instance().submit() 단축형"""
+    return QueryService.instance().submit(key, fn, on_done, on_error)
@@ -1,30 +1,10 @@
 # timeclock/ui/dialogs.py
 # -*- coding: utf-8 -*-
 from PyQt5 import QtWidgets, QtCore
-import sqlite3
 import logging
-import os
 from timeclock.utils import Message
-from timeclock import sync_manager
-from ui.async_helper import run_job_with_progress_async
-# 기존 임포트 코드 아래에 추가합니다.
-from timeclock.settings import _MIN_CALL_INTERVAL_SEC
-
-class _SilentWorker(QtCore.QObject):
-    finished = QtCore.pyqtSignal(bool, str)
-
-    def __init__(self, fn, parent=None):
-        super().__init__(parent)
-        self._fn = fn
-
-    @QtCore.pyqtSlot()
-    def run(self):
-        try:
-            ok = bool(self._fn())
-            self.finished.emit(ok, "")
-        except Exception as e:
-            self.finished.emit(False, str(e))
-
+from timeclock import sync_scheduler
+from ui.async_helper import run_job_with_progress_async, run_silent_async, PRIORITY_USER, PRIORITY_POLL
 
 # timeclock/ui/dialogs.py 내 ChangePasswordDialog 클래스 전체
 
@@ -155,10 +135,6 @@ class DisputeTimelineDialog(QtWidgets.QDialog):
         self.setWindowTitle("이의 제기 대화방")
         self.resize(550, 800)
 
-        # --- 내부 상태(카톡식) ---
-        self._sync_in_progress = False
-        self._pending_upload = False  # 업로드 실패/대기 플래그
-
         # ---------------- 레이아웃 구성 ----------------
         layout = QtWidgets.QVBoxLayout()
         layout.setContentsMargins(0, 0, 0, 0)
@@ -233,28 +209,10 @@ class DisputeTimelineDialog(QtWidgets.QDialog):
         self._poll_timer.timeout.connect(self._silent_poll_refresh)
         self._poll_timer.start()
 
-    def _ensure_db_conn(self) -> bool:
-        """
-        conn이 None인 상태(=DB가 닫힌 상태)에서 execute가 불리면 바로 터진다.
-        대화방에서는 항상 '사용 직전'에 연결을 보장한다.
-        """
-        if not self.db:
-            return False
-        try:
-            if getattr(self.db, "conn", None) is None:
-                self.db.reconnect()
-            return True
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "오류", f"DB 재연결 실패: {e}\n프로그램을 재시작하세요.")
-            return False
-
     def _load_data(self):
         if not self.db or not self.dispute_id:
             return
 
-        if not self._ensure_db_conn():
-            return
-
         try:
             row = self.db.conn.execute(
                 "SELECT work_log_id, dispute_type, status FROM disputes WHERE id=?",
@@ -320,76 +278,18 @@ class DisputeTimelineDialog(QtWidgets.QDialog):
         else:
             self.cb_status.setCurrentIndex(0)
 
-    def _silent_upload(self, tag="dispute_chat"):
-        # 중복 업로드 방지
-        if getattr(self, "_uploading", False):
-            return
-        self._uploading = True
-
-        def _do():
-            try:
-                from timeclock import backup_manager, sync_manager
-                backup_manager.run_backup(tag)
-                ok = sync_manager.upload_current_db()
-                return ok, None
-            except Exception as e:
-                return False, str(e)
-
-        def _done(result):
-            # ✅ 성공 여부와 관계없이 작업이 끝났으므로 플래그를 해제합니다.
-            self._uploading = False
-            ok, err = result
-            if ok:
-                self.lbl_sync.setText("") # 성공 시 라벨 비움
-            elif err:
-                # 조용히 실패 로그만 남기고, UX는 유지
-                try:
-                    import logging
-                    logging.exception("[DisputeChat] silent upload failed: %s", err)
-                except Exception:
-                    pass
-                self.lbl_sync.setText("동기화 대기중…")
-
-        self._run_silent(_do, _done)
-
-    def _run_silent(self, work_fn, done_fn):
+    def _run_silent(self, work_fn, done_fn, *, kind="dispute_chat", priority=PRIORITY_USER, max_inflight=None):
         """
-        dialogs.py 내부 전용: 조용히(로딩창 없이) 백그라운드 작업 실행
-        - PyInstaller 환경에서도 깨지지 않도록 외부 SilentWorker 의존 제거
-        - Qt 이벤트 루프를 통해 done_fn은 항상 메인스레드에서 호출
+        dialogs.py 내부 전용: 조용히(로딩창 없이) 공용 작업 풀에서 실행
+        - done_fn 은 GUI 스레드에서 (ok, payload) 형태로 호출
+        - 같은 kind 가 max_inflight 개 이상 돌고 있으면 실행하지 않고 False 반환
         """
-        thread = QtCore.QThread(self)
-
-        worker = _SilentWorker(lambda: work_fn(), parent=None)
-        worker.moveToThread(thread)
-
-        def _finish(ok: bool, err: str):
-            try:
-                # work_fn이 (ok, err) 튜플을 반환하는 형태도 있으니 그대로 전달
-                # _SilentWorker는 bool(fn())만 보는데, 여기서는 work_fn을 래핑해서 예외만 잡는다.
-                pass
-            finally:
-                thread.quit()
-                thread.wait(1500)
-                worker.deleteLater()
-                thread.deleteLater()
-
-        def _on_started():
-            # work_fn 결과를 그대로 done_fn으로 전달
-            try:
-                res = work_fn()
-            except Exception as e:
-                res = (False, str(e))
-            QtCore.QTimer.singleShot(0, lambda: done_fn(res))
-            _finish(True, "")
-
-        thread.started.connect(_on_started)
-        thread.start()
+        def _done(res, err):
+            if err is not None:
+                res = (False, str(err))
+            done_fn(res)
 
-        # GC 방지
-        if not hasattr(self, "_silent_threads"):
-            self._silent_threads = []
-        self._silent_threads.append(thread)
+        return run_silent_async(work_fn, _done, kind=kind, priority=priority, max_inflight=max_inflight)
 
     def send_message(self):
         msg = self.le_input.text().strip()
@@ -429,11 +329,9 @@ class DisputeTimelineDialog(QtWidgets.QDialog):
                         message=msg
                     )
 
-                # 최신 DB 업로드
-                from timeclock import sync_manager
-                ok_up = sync_manager.upload_current_db()
-
-                return True, ok_up
+                # 최신 DB 업로드 (상대방은 대화 피드로 먼저 받으므로 스케줄러에 맡긴다)
+                sync_scheduler.notify(self.db, "dispute_message")
+                return True, True
             except Exception as e:
                 return False, str(e)
 
@@ -467,11 +365,6 @@ class DisputeTimelineDialog(QtWidgets.QDialog):
         except Exception:
             pass
 
-        if getattr(self, "_sync_in_progress", False):
-            return
-
-        self._sync_in_progress = True
-
         def _work():
             try:
                 # DB에서 원격 데이터를 병합합니다.
@@ -488,128 +381,12 @@ class DisputeTimelineDialog(QtWidgets.QDialog):
                 if ok and payload:
                     # ✅ 데이터 변경이 있다면 타임라인을 새로 고침하여 종료 배너 등을 표시합니다.
                     self.refresh_timeline()
-            finally:
-                self._sync_in_progress = False
-
-        self._run_silent(_work, _done)
-
-    def _merge_remote_messages_from_temp_db(self, temp_db_path: str) -> int:
-        """
-        temp DB에서 dispute_messages를 읽어서,
-        로컬 DB의 dispute_messages에 INSERT OR IGNORE로 병합한다.
-
-        return: 병합된(삽입 시도된) row 수(대략치)
-        """
-        import sqlite3
-
-        if not temp_db_path or not os.path.exists(temp_db_path):
-            return 0
-
-        # 로컬 커넥션이 없으면 불가
-        if getattr(self.db, "conn", None) is None:
-            return 0
-
-        # 로컬 최신 created_at을 기준으로 필터(없으면 전체)
-        try:
-            cur = self.db.conn.execute(
-                "SELECT COALESCE(MAX(created_at), '') FROM dispute_messages WHERE dispute_id=?",
-                (self.dispute_id,)
-            )
-            local_max_at = cur.fetchone()[0] or ""
-        except Exception:
-            local_max_at = ""
-
-        remote = sqlite3.connect(temp_db_path)
-        remote.row_factory = sqlite3.Row
-
-        inserted = 0
-        try:
-            # 원격에서 해당 dispute_id 메시지 가져오기
-            # created_at이 local_max_at보다 큰 것만 우선(빠름)
-            if local_max_at:
-                rows = remote.execute(
-                    """
-                    SELECT id, dispute_id, sender_user_id, sender_role, message, created_at, status_code
-                    FROM dispute_messages
-                    WHERE dispute_id=? AND created_at > ?
-                    ORDER BY created_at ASC
-                    """,
-                    (self.dispute_id, local_max_at)
-                ).fetchall()
-            else:
-                rows = remote.execute(
-                    """
-                    SELECT id, dispute_id, sender_user_id, sender_role, message, created_at, status_code
-                    FROM dispute_messages
-                    WHERE dispute_id=?
-                    ORDER BY created_at ASC
-                    """,
-                    (self.dispute_id,)
-                ).fetchall()
-
-            if not rows:
-                return 0
-
-            # 로컬에 병합
-            # (PK 충돌/중복은 IGNORE)
-            for r in rows:
-                try:
-                    self.db.conn.execute(
-                        """
-                        INSERT OR IGNORE INTO dispute_messages
-                        (id, dispute_id, sender_user_id, sender_role, message, created_at, status_code)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                        """,
-                        (
-                            r["id"], r["dispute_id"], r["sender_user_id"], r["sender_role"],
-                            r["message"], r["created_at"], r["status_code"]
-                        )
-                    )
-                    inserted += 1
-                except Exception:
-                    # 한 줄 실패해도 전체는 계속
-                    continue
-
-            self.db.conn.commit()
-            return inserted
-
-        finally:
-            try:
-                remote.close()
             except Exception:
                 pass
 
-    def _on_upload_done(self, ok: bool, err: str):
-        self._sync_in_progress = False
-
-        if ok:
-            self.lbl_sync.setText("")  # 조용히 성공
-            # 업로드 성공이면 “대기 업로드” 플래그는 해제
-            self._pending_upload = False
-            self._upload_retry_count = 0
-            return
-
-        # 업로드 실패: 팝업 대신 라벨만 표시 + 대기 상태로 전환
-        self.lbl_sync.setText("동기화 실패(대기)…")
-        self._pending_upload = True
-
-        # 과도한 재시도(200ms 연타) 방지: 점진적 백오프
-        cnt = getattr(self, "_upload_retry_count", 0) + 1
-        self._upload_retry_count = cnt
-
-        # 1회: 1초, 2~3회: 3초, 4회 이상: 8초
-        if cnt <= 1:
-            delay_ms = 1000
-        elif cnt <= 3:
-            delay_ms = 3000
-        else:
-            delay_ms = 8000
-
-        # 타이핑 중이면 재시도 안 함(다음 전송/유휴 때 자연스럽게)
-        if self.le_input.hasFocus() or (self.le_input.text().strip() != ""):
-            return
-
-        QtCore.QTimer.singleShot(delay_ms, self._silent_upload)
+        # 이전 폴링이 아직 끝나지 않았으면 이번 회차는 건너뜀 (사용자 전송보다 뒤로)
+        self._run_silent(_work, _done, kind=f"dispute_poll:{self.dispute_id}",
+                         priority=PRIORITY_POLL, max_inflight=1)
 
     def _poll_refresh(self):
         """
@@ -625,22 +402,12 @@ class DisputeTimelineDialog(QtWidgets.QDialog):
             return
 
         # 다운로드가 실패해도(클라우드 DB 없음 등) 화면은 로컬 기준으로 유지
-        try:
-            self.db.close_connection()
-        except Exception:
-            pass
-
         def job_fn(progress_callback):
             # 폴링은 조용히 처리(메시지 최소)
-            ok, msg = sync_manager.download_latest_db()
+            ok, msg = self.db.sync_from_cloud()
             return ok, msg
 
         def on_done(ok_thread, result_data, err):
-            try:
-                self.db.reconnect()
-            except Exception:
-                return
-
             # 최신 DB 반영 후 화면 갱신
             try:
                 self._load_data()
@@ -1309,10 +1076,7 @@ class PersonalInfoDialog(QtWidgets.QDialog):
                 try:
                     # DB 잠금 방지를 위해 연결 해제 후 최신본 다운로드
                     progress_callback({"msg": "☁️ 서버 데이터와 대조 중..."})
-                    self.db.close_connection()
-                    from timeclock import sync_manager
-                    sync_manager.download_latest_db()
-                    self.db.reconnect()
+                    self.db.sync_from_cloud()
 
                     # 데이터 업데이트
                     progress_callback({"msg": "💾 개인정보를 저장하는 중..."})
@@ -1331,10 +1095,12 @@ class PersonalInfoDialog(QtWidgets.QDialog):
                         progress_callback({"msg": "🔐 비밀번호 보안 업데이트 중..."})
                         self.db.change_password(self.user_id, new_pw)
 
-                    # 서버 업로드
+                    # 서버 업로드 (비밀번호는 다른 PC 로그인에 바로 쓰이므로 즉시 전송)
                     progress_callback({"msg": "🚀 변경 사항을 서버에 반영 중..."})
-                    ok_up = sync_manager.upload_current_db()
-                    return ok_up, None
+                    sync_scheduler.notify(self.db, "profile_edit")
+                    if new_pw:
+                        sync_scheduler.flush()
+                    return True, None
                 except Exception as e:
                     return False, str(e)
 
@@ -13,15 +13,17 @@ import git
 
 from timeclock.excel_maker import generate_payslip, create_default_template
 from ui.dialogs import ConfirmPasswordDialog, ProfileEditDialog
-from ui.async_helper import run_job_with_progress_async
+from ui.async_helper import run_job_with_progress_async, run_query_async, run_silent_async, PRIORITY_USER
 
 from timeclock.utils import Message
-from ui.widgets import DateRangeBar, Table
+from ui.widgets import DateRangeBar, Table, ModelTable
 from timeclock.settings import WORK_STATUS, SIGNUP_STATUS
 from ui.dialogs import ChangePasswordDialog, DisputeTimelineDialog, DateRangeDialog
-from timeclock.salary import SalaryCalculator
+from timeclock import payroll
+from timeclock import payslip_batch
 from ui.dialogs import PersonalInfoDialog
 from timeclock import sync_manager  # [Sync] 동기화 모듈 추가
+from timeclock import sync_scheduler
 
 
 class OwnerPage(QtWidgets.QWidget):
@@ -192,7 +194,7 @@ class OwnerPage(QtWidgets.QWidget):
             QPushButton[variant="danger_outline"]:hover { background: #fff5f5; }
             QPushButton[variant="warn"] { background: #FFF3E0; color: #E65100; border: 1px solid #FFE0B2; }
             QPushButton[variant="warn"]:hover { background: #FFE0B2; }
-            QTableWidget {
+            QTableView {
                 background: #ffffff; border: 1px solid #e9e9e9; border-radius: 12px; gridline-color: #f1f1f1;
                 selection-background-color: #FFE0B2; selection-color: #2b2b2b;
             }
@@ -200,8 +202,8 @@ class OwnerPage(QtWidgets.QWidget):
                 background: #fafafa; border: none; border-bottom: 1px solid #e9e9e9; padding: 8px 10px;
                 font-weight: 900; color: #5D4037;
             }
-            QTableWidget::item { padding-left: 6px; padding-right: 6px; }
-            QTableWidget::item:selected { background: #FFE0B2; }
+            QTableView::item { padding-left: 6px; padding-right: 6px; }
+            QTableView::item:selected { background: #FFE0B2; }
             QScrollBar:vertical { background: transparent; width: 10px; margin: 2px; }
             QScrollBar::handle:vertical { background: #dcdcdc; border-radius: 5px; min-height: 30px; }
             QScrollBar::handle:vertical:hover { background: #cfcfcf; }
@@ -241,9 +243,10 @@ class OwnerPage(QtWidgets.QWidget):
             "hint": lb_hint,
         }
 
-    def _refresh_kpis(self) -> None:
+    def _refresh_kpis(self, counts=None) -> None:
         try:
-            counts = self.db.get_pending_counts() or {}
+            if counts is None:
+                counts = self.db.get_pending_counts() or {}
             self.kpi_work["value"].setText(str(int(counts.get("work", 0) or 0)))
             self.kpi_dispute["value"].setText(str(int(counts.get("dispute", 0) or 0)))
             self.kpi_signup["value"].setText(str(int(counts.get("signup", 0) or 0)))
@@ -301,12 +304,18 @@ class OwnerPage(QtWidgets.QWidget):
         self.btn_edit_end.clicked.connect(lambda: self.approve_selected_log(mode="END"))
         self._set_btn_variant(self.btn_edit_end, "warn")
 
-        self.work_table = Table([
+        self.btn_bulk_approve = QtWidgets.QPushButton("📋 선택 일괄 승인")
+        self.btn_bulk_approve.clicked.connect(self.approve_selected_logs_bulk)
+        self._set_btn_variant(self.btn_bulk_approve, "secondary")
+
+        self.work_table = ModelTable([
             "ID", "일자", "근로자",
             "작업시작요청시간", "작업종료요청시간", "상태",
             "작업시작확정시간", "작업종료확정시간", "비고(코멘트)"
         ])
         self.work_table.setColumnWidth(0, 0)
+        # Ctrl/Shift 로 여러 건 선택 → 일괄 승인
+        self.work_table.setSelectionMode(QtWidgets.QAbstractItemView.ExtendedSelection)
 
         # 상단 툴바(카드)
         toolbar = self._mk_toolbar_card()
@@ -319,8 +328,10 @@ class OwnerPage(QtWidgets.QWidget):
         tlay.addWidget(self.btn_edit_start)
         tlay.addWidget(self.btn_reject_start)
         tlay.addWidget(self.btn_edit_end)
+        tlay.addWidget(self.btn_bulk_approve)
 
-        hint = QtWidgets.QLabel("※ ‘반려’ 시 기록은 보존되며, 근로자는 다시 요청할 수 있습니다.")
+        hint = QtWidgets.QLabel("※ ‘반려’ 시 기록은 보존되며, 근로자는 다시 요청할 수 있습니다.  "
+                                "Ctrl/Shift 로 여러 건을 골라 요청 시각 그대로 일괄 승인할 수 있습니다.")
         hint.setObjectName("OwnerHint")
 
         l = QtWidgets.QVBoxLayout()
@@ -336,58 +347,72 @@ class OwnerPage(QtWidgets.QWidget):
     def refresh_work_logs(self):
         d1, d2 = self.filter_work.get_range()
         status_filter = self.cb_work_status.currentData()
+        db = self.db
 
-        try:
-            rows = self.db.list_all_work_logs(None, d1, d2, status_filter=status_filter)
-            self._work_rows = rows
+        # 첫 페이지는 조회 스레드에서 읽고, 나머지는 스크롤이 끝에 닿을 때 (work_date, id) 커서로 이어서 읽는다
+        def load_page(after):
+            rows, cursor = db.list_all_work_logs_page(None, d1, d2, status_filter=status_filter, after=after)
+            return rows, [self._work_row_cells(r) for r in rows], cursor
 
-            out = []
-            for r in rows:
-                rr = dict(r)
-                st = rr["status"]
-                st_str = WORK_STATUS.get(st, st)
+        def on_done(res):
+            rows, out, cursor = res
+            self._work_rows = list(rows)
+            state = {"cursor": cursor}
 
-                name = rr.get("worker_name")
-                uid = rr["worker_username"]
-                display_name = f"{name} ({uid})" if name else f"{uid} ({uid})"
+            def fetch_page():
+                # 조회 스레드에서 실행 → 목록/커서 갱신은 on_page(GUI 스레드)에서
+                more_rows, more_out, next_cursor = load_page(state["cursor"])
+                return more_out, next_cursor is not None, (more_rows, next_cursor)
 
-                out.append([
-                    str(rr["id"]),
-                    rr["work_date"],
-                    display_name,
-                    rr["start_time"] or "",
-                    rr["end_time"] or "",
-                    st_str,
-                    rr["approved_start"] or "",
-                    rr["approved_end"] or "",
-                    rr["owner_comment"] or ""
-                ])
-            self.work_table.set_rows(out)
+            def on_page(res):
+                more_rows, state["cursor"] = res[2]
+                self._work_rows.extend(more_rows)
+
+            self.work_table.set_rows(out, fetch_more=fetch_page if cursor is not None else None,
+                                     on_fetched=on_page)
             self.update_badges()
 
-        except Exception as e:
-            logging.exception("refresh_work_logs failed")
+        def on_error(e):
+            logging.error(f"refresh_work_logs failed: {e}")
             Message.err(self, "오류", f"근무 기록 조회 실패: {e}")
 
+        run_query_async("owner.work_logs", lambda cancelled: load_page(None), on_done, on_error)
+
+    @staticmethod
+    def _work_row_cells(r):
+        rr = dict(r)
+        st = rr["status"]
+        st_str = WORK_STATUS.get(st, st)
+
+        name = rr.get("worker_name")
+        uid = rr["worker_username"]
+        display_name = f"{name} ({uid})" if name else f"{uid} ({uid})"
+
+        return [
+            str(rr["id"]),
+            rr["work_date"],
+            display_name,
+            rr["start_time"] or "",
+            rr["end_time"] or "",
+            st_str,
+            rr["approved_start"] or "",
+            rr["approved_end"] or "",
+            rr["owner_comment"] or ""
+        ]
+
     def sync_and_refresh(self):
         """
-        [수정] DB 파일 잠금(WinError 32) 해결을 위해
-        다운로드 전에 DB 연결을 끊고(close), 완료 후 다시 연결(reconnect)합니다.
+        클라우드 최신 데이터 반영 후 전체 목록 갱신.
+        DB 연결은 db.sync_from_cloud()가 관리한다. (파일 교체가 필요할 때만 잠깐 정리)
         """
-
-        # 1. [핵심] 다운로드 전에 DB 연결을 잠시 끊어줍니다.
-        #    이 코드가 없으면 "다른 프로세스가 사용 중"이라며 에러가 납니다.
-        print("🔄 동기화 시작: DB 연결 잠시 해제...")
-        self.db.close_connection()
+        print("🔄 동기화 시작...")
 
         # 작업 함수 (별도 스레드에서 실행)
         def job_fn(progress_callback):
             progress_callback({"msg": "🚀 구글 드라이브 접속 중..."})
 
-            # sync_manager가 최신 파일을 받아옵니다.
-            # (이제 DB 연결이 끊겨 있으므로 덮어쓰기에 성공할 것입니다)
-            from timeclock import sync_manager
-            ok, msg = sync_manager.download_latest_db()
+            # 최신 기준본/변경분 반영
+            ok, msg = self.db.sync_from_cloud()
 
             if ok:
                 progress_callback({"msg": f"✅ 다운로드 완료: {msg}"})
@@ -408,11 +433,9 @@ class OwnerPage(QtWidgets.QWidget):
             else:
                 info, download_ok, download_msg = None, False, "스레드 오류"
 
-            # 2. [핵심] 작업이 끝났으니 DB에 다시 연결합니다.
-            print("✅ 동기화 종료: DB 재연결...")
-            self.db.reconnect()
+            print("✅ 동기화 종료")
 
-            # 3. 화면 갱신 (이제 최신 데이터가 보입니다)
+            # 화면 갱신 (이제 최신 데이터가 보입니다)
             self.refresh_work_logs()
             self.refresh_members()
             self.refresh_disputes()
@@ -438,7 +461,7 @@ class OwnerPage(QtWidgets.QWidget):
         # 비동기 실행
         run_job_with_progress_async(
             self,
-            "데이터 동기화 중... (DB 연결 해제됨)",
+            "데이터 동기화 중...",
             job_fn,
             on_done=on_done
         )
@@ -461,7 +484,7 @@ class OwnerPage(QtWidgets.QWidget):
         set_tab_style(1, "이의 제기", counts.get("dispute", 0))
         set_tab_style(2, "직원 가입 승인", counts.get("signup", 0))
 
-        self._refresh_kpis()
+        self._refresh_kpis(counts)
 
     def approve_selected_log(self, mode="START"):
         row_idx = self.work_table.selected_first_row_index()
@@ -482,9 +505,7 @@ class OwnerPage(QtWidgets.QWidget):
             def job_fn(progress_callback):
                 # 1. 최신 데이터 동기화
                 progress_callback({"msg": "☁️ 서버 최신 데이터를 가져오는 중..."})
-                self.db.close_connection()
-                sync_manager.download_latest_db()
-                self.db.reconnect()
+                self.db.sync_from_cloud()
 
                 # 2. DB 승인 처리
                 progress_callback({"msg": "💾 근무 승인 정보를 저장하는 중..."})
@@ -496,10 +517,9 @@ class OwnerPage(QtWidgets.QWidget):
                     final_comment
                 )
 
-                # 3. 서버 업로드
-                progress_callback({"msg": "🚀 승인 결과를 서버에 전송 중..."})
-                ok_up = sync_manager.upload_current_db()
-                return ok_up
+                # 3. 서버 업로드 (동기화 스케줄러가 모아서 전송)
+                sync_scheduler.notify(self.db, "approve")
+                return True
 
             def on_done(ok, res, err):
                 if not ok:
@@ -514,6 +534,54 @@ class OwnerPage(QtWidgets.QWidget):
                 on_done=on_done
             )
 
+    def approve_selected_logs_bulk(self):
+        """
+        선택한 여러 건을 근로자가 요청한 시각 그대로 한 번에 승인.
+        (시간 정정이 필요한 건은 기존 개별 승인 버튼 사용)
+        """
+        row_idxs = self.work_table.selected_row_indexes()
+        if not row_idxs:
+            Message.warn(self, "알림", "승인할 항목을 선택하세요. (Ctrl/Shift 로 여러 건 선택)")
+            return
+
+        items = []
+        skipped = 0
+        for i in row_idxs:
+            r = dict(self._work_rows[i])
+            app_start = r["approved_start"] or r["start_time"]
+            app_end = r["approved_end"] or r["end_time"]
+            if r["status"] not in ("PENDING", "WORKING") or not app_start:
+                skipped += 1
+                continue
+            items.append((r["id"], app_start, app_end, r["owner_comment"] or ""))
+
+        if not items:
+            Message.warn(self, "알림", "선택한 항목 중 승인 대기/근무 중인 기록이 없습니다.")
+            return
+
+        msg = f"선택한 {len(items)}건을 요청 시각 그대로 승인하시겠습니까?"
+        if skipped:
+            msg += f"\n(이미 확정/반려된 {skipped}건은 제외됩니다)"
+        if not Message.confirm(self, "일괄 승인", msg):
+            return
+
+        def job_fn(progress_callback):
+            progress_callback({"msg": "☁️ 서버 최신 데이터를 가져오는 중..."})
+            self.db.sync_from_cloud()
+
+            # 한 트랜잭션 + 동기화 1회
+            progress_callback({"msg": f"💾 {len(items)}건 승인 정보를 저장하는 중..."})
+            return self.db.approve_work_logs_bulk(items, self.session.user_id)
+
+        def on_done(ok, res, err):
+            if not ok:
+                Message.err(self, "오류", f"일괄 승인 처리 중 오류가 발생했습니다: {err}")
+            else:
+                Message.info(self, "완료", f"{res}건 승인 처리했습니다.")
+            self.refresh_work_logs()
+
+        run_job_with_progress_async(self, "근무 일괄 승인 처리 중", job_fn, on_done=on_done)
+
     def reject_start_request(self):
         row_idx = self.work_table.selected_first_row_index()
         if row_idx < 0:
@@ -532,15 +600,13 @@ class OwnerPage(QtWidgets.QWidget):
 
         def job_fn(progress_callback):
             progress_callback({"msg": "☁️ 서버 동기화 중..."})
-            self.db.close_connection()
-            sync_manager.download_latest_db()
-            self.db.reconnect()
+            self.db.sync_from_cloud()
 
             progress_callback({"msg": "💾 반려 상태를 저장 중..."})
             self.db.reject_work_log(target_row["id"])
 
-            progress_callback({"msg": "🚀 서버에 결과 전송 중..."})
-            return sync_manager.upload_current_db()
+            sync_scheduler.notify(self.db, "reject_work_log")
+            return True
 
         def on_done(ok, res, err):
             if not ok:
@@ -554,6 +620,7 @@ class OwnerPage(QtWidgets.QWidget):
         self.le_member_search = QtWidgets.QLineEdit()
         self.le_member_search.setPlaceholderText("이름 검색...")
         self.le_member_search.returnPressed.connect(self.refresh_members)
+        self.le_member_search.textChanged.connect(lambda *_: self.refresh_members())
 
         self.cb_member_filter = QtWidgets.QComboBox()
         self.cb_member_filter.addItem("재직자 보기", "ACTIVE")
@@ -581,6 +648,10 @@ class OwnerPage(QtWidgets.QWidget):
         self.btn_calc_salary.clicked.connect(self.calculate_salary)
         self._set_btn_variant(self.btn_calc_salary, "warn")
 
+        self.btn_payroll_all = QtWidgets.QPushButton("🧮 전체 일괄 정산")
+        self.btn_payroll_all.clicked.connect(self.run_payroll_all)
+        self._set_btn_variant(self.btn_payroll_all, "secondary")
+
         self.btn_export_payslip = QtWidgets.QPushButton("📄 명세서 발급(Excel)")
         try:
             self.btn_export_payslip.clicked.disconnect()
@@ -589,11 +660,15 @@ class OwnerPage(QtWidgets.QWidget):
         self.btn_export_payslip.clicked.connect(self.export_payslip)
         self._set_btn_variant(self.btn_export_payslip, "primary")
 
+        self.btn_payslip_batch = QtWidgets.QPushButton("📦 명세서 일괄 발급")
+        self.btn_payslip_batch.clicked.connect(self.export_payslips_all)
+        self._set_btn_variant(self.btn_payslip_batch, "secondary")
+
         self.btn_resign = QtWidgets.QPushButton("🧯 퇴사 처리")
         self.btn_resign.clicked.connect(self.resign_worker)
         self._set_btn_variant(self.btn_resign, "danger_outline")
 
-        self.member_table = Table([
+        self.member_table = ModelTable([
             "ID", "아이디", "성함", "직급", "전화번호", "생년월일", "시급", "가입일", "상태"
         ])
         self.member_table.setColumnWidth(0, 0)
@@ -610,7 +685,9 @@ class OwnerPage(QtWidgets.QWidget):
         tlay.addWidget(self.btn_edit_job_title)
         tlay.addWidget(self.btn_reset_pw)  # ✅ 초기화 버튼 툴바 추가
         tlay.addWidget(self.btn_calc_salary)
+        tlay.addWidget(self.btn_payroll_all)
         tlay.addWidget(self.btn_export_payslip)
+        tlay.addWidget(self.btn_payslip_batch)
         tlay.addWidget(self.btn_resign)
 
         l = QtWidgets.QVBoxLayout()
@@ -624,12 +701,14 @@ class OwnerPage(QtWidgets.QWidget):
     def refresh_members(self):
         keyword = self.le_member_search.text().strip()
         status_filter = self.cb_member_filter.currentData()
+        db = self.db
 
-        try:
-            rows = self.db.list_workers(keyword=keyword, status_filter=status_filter)
-            self._member_rows = rows
+        def job(cancelled):
+            rows = db.list_workers(keyword=keyword, status_filter=status_filter)
             out = []
             for r in rows:
+                if cancelled():
+                    return None
                 rr = dict(r)
                 wage_str = f"{rr['hourly_wage']:,}" if rr['hourly_wage'] else "0"
                 status = "재직중" if rr['is_active'] else "퇴사"
@@ -645,11 +724,18 @@ class OwnerPage(QtWidgets.QWidget):
                     rr['created_at'],
                     status
                 ])
+            return rows, out
 
+        def on_done(res):
+            rows, out = res
+            self._member_rows = rows
             self.member_table.set_rows(out)
-        except Exception as e:
+
+        def on_error(e):
             Message.err(self, "오류", f"회원 목록 로드 실패: {e}")
 
+        run_query_async("owner.members", job, on_done, on_error)
+
     def resign_worker(self):
         row = self.member_table.selected_first_row_index()
         if row < 0:
@@ -663,15 +749,13 @@ class OwnerPage(QtWidgets.QWidget):
         if Message.confirm(self, "퇴사 확인", f"정말 '{username}' 님을 퇴사 처리하시겠습니까?"):
             def job_fn(progress_callback):
                 progress_callback({"msg": "☁️ 직원 명부 대조 중..."})
-                self.db.close_connection()
-                sync_manager.download_latest_db()
-                self.db.reconnect()
+                self.db.sync_from_cloud()
 
                 progress_callback({"msg": "💾 퇴사 상태로 전환 중..."})
                 self.db.resign_user(user_id)
 
-                progress_callback({"msg": "🚀 서버 동기화 중..."})
-                return sync_manager.upload_current_db()
+                sync_scheduler.notify(self.db, "admin_resign_user")
+                return True
 
             def on_done(ok, res, err):
                 if ok:
@@ -696,15 +780,13 @@ class OwnerPage(QtWidgets.QWidget):
         if ok:
             def job_fn(progress_callback):
                 progress_callback({"msg": "☁️ 최신 시급 정보 확인 중..."})
-                self.db.close_connection()
-                sync_manager.download_latest_db()
-                self.db.reconnect()
+                self.db.sync_from_cloud()
 
                 progress_callback({"msg": "💾 시급 업데이트 중..."})
                 self.db.update_user_wage(user_id, val)
 
-                progress_callback({"msg": "🚀 서버 전송 중..."})
-                return sync_manager.upload_current_db()
+                sync_scheduler.notify(self.db, "admin_update_wage")
+                return True
 
             def on_done(ok, res, err):
                 if ok:
@@ -733,15 +815,13 @@ class OwnerPage(QtWidgets.QWidget):
         if ok and val:
             def job_fn(progress_callback):
                 progress_callback({"msg": "☁️ 인사 정보 확인 중..."})
-                self.db.close_connection()
-                sync_manager.download_latest_db()
-                self.db.reconnect()
+                self.db.sync_from_cloud()
 
                 progress_callback({"msg": "💾 직급 정보 수정 중..."})
                 self.db.update_user_job_title(user_id, val)
 
-                progress_callback({"msg": "🚀 서버 동기화 중..."})
-                return sync_manager.upload_current_db()
+                sync_scheduler.notify(self.db, "admin_update_job")
+                return True
 
             def on_done(ok, res, err):
                 if ok:
@@ -769,17 +849,16 @@ class OwnerPage(QtWidgets.QWidget):
             def job_fn(progress_callback):
                 try:
                     progress_callback({"msg": "☁️ 서버 데이터 확인 중..."})
-                    self.db.close_connection()
-                    from timeclock import sync_manager
-                    sync_manager.download_latest_db()
-                    self.db.reconnect()
+                    self.db.sync_from_cloud()
 
                     progress_callback({"msg": "🔐 비밀번호 초기화 중..."})
                     self.db.change_password(user_id, "111111")
 
+                    # 다른 PC 로그인에 바로 쓰이므로 즉시 전송
                     progress_callback({"msg": "🚀 변경 사항을 서버에 반영 중..."})
-                    ok_up = sync_manager.upload_current_db()
-                    return ok_up, None
+                    sync_scheduler.notify(self.db, "change_password")
+                    sync_scheduler.flush()
+                    return True, None
                 except Exception as e:
                     return False, str(e)
 
@@ -813,7 +892,7 @@ class OwnerPage(QtWidgets.QWidget):
         self.btn_open_chat.clicked.connect(self.open_dispute_chat)
         self._set_btn_variant(self.btn_open_chat, "primary")
 
-        self.dispute_table = Table([
+        self.dispute_table = ModelTable([
             "ID", "근로자", "근무일자", "이의유형", "상태", "최근대화", "등록일"
         ])
         self.dispute_table.setColumnWidth(0, 0)
@@ -838,29 +917,25 @@ class OwnerPage(QtWidgets.QWidget):
         return w
 
     def refresh_disputes(self):
-        # ✅ “새로고침” = 서버 최신 DB 다운로드 후 목록 갱신
+        # ✅ “새로고침” = 서버 최신 DB 반영(작업 풀) → 끝나면 목록 갱신(조회 스레드)
+        #    네트워크 대기가 조회 스레드를 붙잡아 다른 탭 목록이 밀리지 않도록 둘을 나눈다.
+        def on_synced(_res, err):
+            if err is not None:
+                logging.error(f"refresh_disputes sync failed: {err}")
+            self._load_disputes()
+
+        if not run_silent_async(self.db.sync_from_cloud, on_synced, kind="owner.disputes_sync",
+                                priority=PRIORITY_USER, max_inflight=1):
+            # 이미 동기화 중이면 그 완료 시 다시 읽으므로 지금은 로컬 기준으로 먼저 보여준다
+            self._load_disputes()
+
+    def _load_disputes(self):
         d1, d2 = self.filter_disputes.get_range()
         filter_type = self.cb_dispute_filter.currentData()
+        db = self.db
 
-        try:
-            # 1) DB 잠금 방지: 반드시 close -> download -> reconnect
-            try:
-                self.db.close_connection()
-            except Exception:
-                pass
-
-            try:
-                sync_manager.download_latest_db()
-            finally:
-                try:
-                    self.db.reconnect()
-                except Exception as e:
-                    Message.err(self, "오류", f"DB 재연결 실패: {e}\n프로그램을 재시작하세요.")
-                    return
-
-            # 2) 최신 DB 기준 목록 로드
-            rows = self.db.list_disputes(d1, d2, filter_type)
-            self._dispute_rows = rows
+        def job(cancelled):
+            rows = db.list_disputes(d1, d2, filter_type)
 
             out = []
             for r in rows:
@@ -881,14 +956,20 @@ class OwnerPage(QtWidgets.QWidget):
                     summary,
                     rr["created_at"]
                 ])
+            return rows, out
 
+        def on_done(res):
+            rows, out = res
+            self._dispute_rows = rows
             self.dispute_table.set_rows(out)
             self.update_badges()
 
-        except Exception as e:
-            logging.exception("refresh_disputes failed")
+        def on_error(e):
+            logging.error(f"refresh_disputes failed: {e}")
             Message.err(self, "오류", f"이의제기 로드 실패: {e}")
 
+        run_query_async("owner.disputes", job, on_done, on_error)
+
     def _wire_dispute_doubleclick(self):
         try:
             self.dispute_table.itemDoubleClicked.disconnect()
@@ -897,20 +978,11 @@ class OwnerPage(QtWidgets.QWidget):
         self.dispute_table.itemDoubleClicked.connect(self.open_dispute_chat)
 
     def open_dispute_chat(self):
-        # [Sync] 이의제기 대화 열기 전 최신 DB 다운로드 (DB 잠금 방지: 반드시 close -> download -> reconnect)
-        try:
-            self.db.close_connection()
-        except Exception:
-            pass
-
+        # [Sync] 이의제기 대화 열기 전 최신 DB 반영
         try:
-            sync_manager.download_latest_db()
-        finally:
-            try:
-                self.db.reconnect()
-            except Exception as e:
-                Message.err(self, "오류", f"DB 재연결 실패: {e}\n프로그램을 재시작하세요.")
-                return
+            self.db.sync_from_cloud()
+        except Exception as e:
+            print(f"[Sync Error] {e}")
 
         row = self.dispute_table.selected_first_row_index()
         if row < 0 or row >= len(self._dispute_rows):
@@ -971,8 +1043,10 @@ class OwnerPage(QtWidgets.QWidget):
         return w
 
     def refresh_signup_requests(self):
-        try:
-            rows = self.db.list_pending_signup_requests()
+        db = self.db
+
+        def job(cancelled):
+            rows = db.list_pending_signup_requests()
             data = []
 
             for r in rows:
@@ -989,11 +1063,13 @@ class OwnerPage(QtWidgets.QWidget):
                     rr["created_at"],
                     status_str
                 ])
+            return data
+
+        def on_done(data):
             self.signup_table.set_rows(data)
             self.update_badges()
 
-        except Exception as e:
-            Message.err(self, "오류", str(e))
+        run_query_async("owner.signup_requests", job, on_done, lambda e: Message.err(self, "오류", str(e)))
 
     def approve_signup(self):
         row = self.signup_table.selected_first_row_index()
@@ -1004,15 +1080,13 @@ class OwnerPage(QtWidgets.QWidget):
         if Message.confirm(self, "승인", f"'{name}'님의 가입을 승인하시겠습니까?"):
             def job_fn(progress_callback):
                 progress_callback({"msg": "☁️ 신청서 확인 중..."})
-                self.db.close_connection()
-                sync_manager.download_latest_db()
-                self.db.reconnect()
+                self.db.sync_from_cloud()
 
                 progress_callback({"msg": "💾 계정 생성 중..."})
                 self.db.approve_signup_request(sid, self.session.user_id, "Approved")
 
-                progress_callback({"msg": "🚀 서버 동기화 중..."})
-                return sync_manager.upload_current_db()
+                sync_scheduler.notify(self.db, "signup_approve")
+                return True
 
             def on_done(ok, res, err):
                 if ok:
@@ -1033,15 +1107,13 @@ class OwnerPage(QtWidgets.QWidget):
         if ok:
             def job_fn(progress_callback):
                 progress_callback({"msg": "☁️ 데이터 확인 중..."})
-                self.db.close_connection()
-                sync_manager.download_latest_db()
-                self.db.reconnect()
+                self.db.sync_from_cloud()
 
                 progress_callback({"msg": "💾 거절 사유 기록 중..."})
                 self.db.reject_signup_request(sid, self.session.user_id, text)
 
-                progress_callback({"msg": "🚀 서버 전송 중..."})
-                return sync_manager.upload_current_db()
+                sync_scheduler.notify(self.db, "reject_signup")
+                return True
 
             def on_done(ok, res, err):
                 if ok:
@@ -1063,8 +1135,11 @@ class OwnerPage(QtWidgets.QWidget):
                     progress_callback({"msg": "💾 새 비밀번호 암호화 및 저장 중..."})
                     self.db.change_password(self.session.user_id, pw)
 
+                    # 다른 PC 로그인에 바로 쓰이므로 즉시 전송
                     progress_callback({"msg": "🚀 보안 정보 서버 동기화 중..."})
-                    return sync_manager.upload_current_db()
+                    sync_scheduler.notify(self.db, "change_password")
+                    sync_scheduler.flush()
+                    return True
 
                 def on_done(ok, res, err):
                     if ok:
@@ -1090,17 +1165,10 @@ class OwnerPage(QtWidgets.QWidget):
                 return
 
             d1, d2 = dlg.get_range()
-            logs = self.db.list_all_work_logs(user_id, d1, d2, status_filter='APPROVED')
-
-            if not logs:
-                Message.info(self, "결과", "해당 기간에 승인된 근무 기록이 없습니다.")
-                return
-
-            calc = SalaryCalculator(wage_per_hour=hourly_wage)
-            res = calc.calculate_period([dict(r) for r in logs])
+            res = payroll.calculate_user_period(self.db, user_id, hourly_wage, d1, d2)
 
             if not res:
-                Message.info(self, "결과", "계산할 데이터가 없습니다.")
+                Message.info(self, "결과", "해당 기간에 승인된 근무 기록이 없습니다.")
                 return
 
             final_pay = res['grand_total']
@@ -1129,6 +1197,86 @@ class OwnerPage(QtWidgets.QWidget):
             traceback.print_exc()
             Message.err(self, "오류", f"계산 중 오류가 발생했습니다.\n{e}")
 
+    def run_payroll_all(self):
+        """전 직원 급여를 한 번에 계산해서 CSV 로 저장 (직원별 대화상자 반복 없음)"""
+        dlg = DateRangeDialog(self)
+        if dlg.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        d1, d2 = dlg.get_range()
+
+        def job_fn(progress_callback):
+            progress_callback({"msg": "🧮 전 직원 급여 계산 중..."})
+            return payroll.run_payroll(self.db, d1, d2)
+
+        def on_done(ok, results, err):
+            if not ok:
+                Message.err(self, "오류", f"일괄 정산 실패: {err}")
+                return
+            if not results:
+                Message.info(self, "결과", "해당 기간에 승인된 근무 기록이 없습니다.")
+                return
+
+            s = payroll.summarize(results)
+            save_dir = Path(r"C:\my_games\timeclock\pay_result")
+            target = save_dir / f"일괄정산_{d1.replace('-', '')}_{d2.replace('-', '')}.csv"
+            save_path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "일괄 정산 저장", str(target), "CSV Files (*.csv)")
+            if not save_path:
+                return
+            try:
+                payroll.export_payroll_csv(results, save_path)
+            except Exception as e:
+                Message.err(self, "오류", f"CSV 저장 실패: {e}")
+                return
+
+            Message.info(
+                self, "일괄 정산 완료",
+                f"[{d1} ~ {d2}]\n직원 {s['workers']}명 / 근무 {s['logs']}건\n"
+                f"💰 지급 총액: {s['grand_total']:,}원\n\n{save_path}"
+            )
+
+        run_job_with_progress_async(self, "전체 급여 일괄 정산", job_fn, on_done=on_done)
+
+    def export_payslips_all(self):
+        """전 직원 급여명세서를 폴더 하나에 일괄 발급 (백그라운드 + 프로세스 풀, 선택 시 ZIP)"""
+        dlg = DateRangeDialog(self)
+        if dlg.exec_() != QtWidgets.QDialog.Accepted:
+            return
+        d1, d2 = dlg.get_range()
+
+        base_dir = Path(r"C:\my_games\timeclock\pay_result")
+        out_dir = QtWidgets.QFileDialog.getExistingDirectory(self, "명세서 저장 폴더", str(base_dir))
+        if not out_dir:
+            return
+        out_dir = Path(out_dir) / f"급여명세서_{d1.replace('-', '')}_{d2.replace('-', '')}"
+
+        zip_path = None
+        if Message.confirm(self, "ZIP", "만든 명세서를 ZIP 파일 하나로도 묶을까요?"):
+            zip_path = out_dir.with_suffix(".zip")
+
+        def job_fn(progress_callback):
+            return payslip_batch.export_payslips(
+                self.db, d1, d2, out_dir, zip_path=zip_path, progress_callback=progress_callback
+            )
+
+        def on_done(ok, res, err):
+            if not ok:
+                Message.err(self, "오류", f"명세서 일괄 발급 실패: {err}")
+                return
+            if not res["count"]:
+                Message.info(self, "결과", "해당 기간에 승인된 근무 기록이 없습니다.")
+                return
+
+            msg = f"[{d1} ~ {d2}]\n명세서 {res['count']}장 발급 완료\n\n{out_dir}"
+            if res["zip"]:
+                msg += f"\n{res['zip']}"
+            Message.info(self, "완료", msg)
+            try:
+                os.startfile(str(out_dir))
+            except:
+                pass
+
+        run_job_with_progress_async(self, "급여명세서 일괄 발급", job_fn, on_done=on_done)
+
     def export_payslip(self):
         row = self.member_table.selected_first_row_index()
         if row < 0:
@@ -1150,107 +1298,12 @@ class OwnerPage(QtWidgets.QWidget):
             return
         d1, d2 = dlg.get_range()
 
-        logs = self.db.list_all_work_logs(user_id, d1, d2, status_filter='APPROVED')
-        if not logs:
+        res = payroll.calculate_user_period(self.db, user_id, hourly_wage, d1, d2)
+        if not res:
             Message.warn(self, "알림", "해당 기간에 승인된 근무 기록이 없습니다.")
             return
 
-        calc = SalaryCalculator(hourly_wage)
-        res = calc.calculate_period([dict(r) for r in logs])
-
-        friendly_text = calc.get_friendly_description(res)
-        total_pay = res['grand_total']
-
-        # --- [수정] 3.3% 세금 분리 계산 (소득세 3%, 지방세 0.3%) ---
-        # 1. 4대보험 관련은 0으로 설정 (프리랜서/아르바이트 3.3% 기준)
-        ei_tax = 0
-        pension = 0
-        health = 0
-        care = 0
-
-        # 2. 소득세 (3%) - 원 단위 절사
-        income_tax = int(total_pay * 0.03 / 10) * 10
-
-        # 3. 지방소득세 (소득세의 10% = 총액의 0.3%) - 원 단위 절사
-        local_tax = int(income_tax * 0.1 / 10) * 10
-
-        # 4. 공제 총액
-        total_deduction = income_tax + local_tax + ei_tax + pension + health + care
-
-        # 5. 실 수령액
-        net_pay = total_pay - total_deduction
-        # -----------------------------------------------------------
-
-        over_hours = 0
-        night_hours = 0
-        ju_hyu_hours = 0
-
-        if hourly_wage > 0:
-            over_hours = round(res['overtime_pay'] / (hourly_wage * 0.5), 1) if hourly_wage else 0
-            night_hours = round(res['night_pay'] / (hourly_wage * 0.5), 1) if hourly_wage else 0
-            ju_hyu_hours = round(res['ju_hyu_pay'] / hourly_wage, 1) if hourly_wage else 0
-
-        base_str = f"• 기본급: {res['actual_hours']}시간 × {hourly_wage:,}원 = {res['base_pay']:,}원"
-
-        if res['overtime_pay'] > 0 or res['night_pay'] > 0:
-            over_msg = []
-            if res['overtime_pay'] > 0:
-                over_msg.append(f"연장 {over_hours}h")
-            if res['night_pay'] > 0:
-                over_msg.append(f"야간 {night_hours}h")
-            sum_add_pay = res['overtime_pay'] + res['night_pay']
-            over_str = f"• 가산(0.5배): {' + '.join(over_msg)} = {sum_add_pay:,}원"
-        else:
-            over_str = "• 가산수당: 해당 없음"
-
-        if res['ju_hyu_pay'] > 0:
-            ju_hyu_str = f"• 주휴수당: {ju_hyu_hours}시간 (주 15시간↑ 개근) = {res['ju_hyu_pay']:,}원"
-        else:
-            ju_hyu_str = "• 주휴수당: 해당 없음 (조건 미충족)"
-
-        if res['ju_hyu_pay'] > 0:
-            note_text = (
-                "※ 주휴수당 지급 안내:\n"
-                "본 주는 일시적 업무 증가로 주 15시간 이상 근무하여\n"
-                "근로기준법에 의거 주휴수당을 지급하였습니다."
-            )
-        else:
-            note_text = "※ 본 명세서는 근로기준법 제48조에 따라 교부합니다."
-
-        data_ctx = {
-            "title": f"{d1[:4]}년 {d1[5:7]}월 급여명세서",
-            "name": real_name,
-            "period": f"{d1} ~ {d2}",
-            "pay_date": datetime.now().strftime("%Y-%m-%d"),
-            "rank": rank,
-            "company": "Hobby Brown",
-            "base_pay": res['base_pay'],
-            "ju_hyu_pay": res['ju_hyu_pay'],
-            "overtime_pay": res['overtime_pay'],
-            "night_pay": res['night_pay'],
-            "holiday_pay": res['holiday_pay'],
-            "other_pay": 0,
-            "total_pay": total_pay,
-            "ei_ins": ei_tax,
-            "pension": pension,
-            "health_ins": health,
-            "care_ins": care,
-
-            # [수정] 3.3% 분리 적용된 세금 항목
-            "income_tax": income_tax,
-            "local_tax": local_tax,
-
-            "total_deduction": total_deduction,
-            "net_pay": net_pay,
-            "calc_detail": friendly_text,
-            "base_detail": base_str,
-            "over_detail": over_str,
-            "ju_hyu_detail": ju_hyu_str,
-
-            # [수정] 하단 텍스트 변경
-            "tax_detail": "사업소득세 3% + 지방소득세 0.3% 적용",
-            "note": note_text
-        }
+        data_ctx = payslip_batch.build_payslip_context(res, real_name, rank, hourly_wage, d1, d2)
 
         try:
             template_path = DATA_DIR / "template.xlsx"
@@ -1261,10 +1314,7 @@ class OwnerPage(QtWidgets.QWidget):
             save_dir = Path(r"C:\my_games\timeclock\pay_result")
             save_dir.mkdir(parents=True, exist_ok=True)
 
-            safe_d1 = d1.replace("-", "")
-            safe_d2 = d2.replace("-", "")
-            filename = f"급여명세서_{real_name}_{safe_d1}_{safe_d2}.xlsx"
-            target_path = save_dir / filename
+            target_path = save_dir / payslip_batch.payslip_filename(real_name, d1, d2)
 
             save_path, _ = QtWidgets.QFileDialog.getSaveFileName(
                 self,
@@ -1419,7 +1469,7 @@ class OwnerPage(QtWidgets.QWidget):
 
     def open_profile_settings(self):
         # [Sync] 프로필 변경 전 최신화
-        sync_manager.download_latest_db()
+        self.db.sync_from_cloud()
 
         dlg = ConfirmPasswordDialog(self, title="개인정보 변경", message="개인정보 변경을 위해 현재 비밀번호를 다시 입력해 주세요.")
         if dlg.exec_() != QtWidgets.QDialog.Accepted:
@@ -1437,18 +1487,15 @@ class OwnerPage(QtWidgets.QWidget):
 
         edit = ProfileEditDialog(self.db, self.session.user_id, parent=self)
         if edit.exec_() == QtWidgets.QDialog.Accepted:
-            # [Sync] 변경 후 서버 업로드
-            sync_manager.upload_current_db()
+            # [Sync] 변경 후 서버 업로드 (동기화 스케줄러가 모아서 전송)
+            sync_scheduler.notify(self.db, "profile_edit")
 
     def open_personal_info(self):
         # 1. [다운로드] 다른 PC에서 변경된 정보가 있을 수 있으므로 먼저 다운로드
-        self.db.close_connection()
         try:
-            sync_manager.download_latest_db()
+            self.db.sync_from_cloud()
         except Exception as e:
             print(f"[Sync Error] {e}")
-        finally:
-            self.db.reconnect()
 
         # 2. 다이얼로그 열기
         # (저장은 다이얼로그 내부에서 DB 함수를 통해 자동 업로드됨)
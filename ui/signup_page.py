@@ -7,7 +7,7 @@ from PyQt5 import QtWidgets, QtCore, QtGui  # ⬅️ QtGui 모듈 추가
 import logging
 from timeclock.utils import Message
 from timeclock.auth import pbkdf2_hash_password  # 비밀번호 해시 함수 (submit 함수에서 사용)
-from timeclock import sync_manager
+from timeclock import sync_scheduler
 from ui.async_helper import run_job_with_progress_async
 
 ID_PATTERN = re.compile(r"^[a-zA-Z0-9_]{4,20}$")
@@ -283,9 +283,7 @@ class SignupPage(QtWidgets.QWidget):
             try:
                 # 1. 동기화 전 최신 DB 다운로드
                 progress_callback({"msg": "☁️ 서버 데이터 확인 중..."})
-                self.db.close_connection()
-                sync_manager.download_latest_db()
-                self.db.reconnect()
+                self.db.sync_from_cloud()
 
                 # 2. 가입 신청 데이터 로컬 DB 저장
                 progress_callback({"msg": "💾 가입 신청 정보를 저장하는 중..."})
@@ -300,21 +298,26 @@ class SignupPage(QtWidgets.QWidget):
                     address=address,
                 )
 
-                # 3. 서버 업로드
+                # 3. 서버 업로드: 사업주 PC에 바로 보이도록 즉시 전송
                 progress_callback({"msg": "🚀 서버에 가입 신청서 제출 중..."})
-                ok_up = sync_manager.upload_current_db()
+                sync_scheduler.notify(self.db, "signup_request")
+                ok_up = sync_scheduler.flush()
                 return ok_up, None
             except Exception as e:
                 return False, str(e)
 
-        # 비동기 작업 완료 후 콜백
+        # 비동기 작업 완료 후 콜백 (ok 는 예외 없이 끝났는지, 업로드 결과는 res[0])
         def on_done(ok, res, err):
-            if ok:
-                Message.info(self, "가입신청 완료", "가입신청이 완료되었습니다.\n사업주 승인 후 로그인 가능합니다.")
-                self.signup_done.emit()
-            else:
-                error_msg = res if res and isinstance(res, str) else err
+            ok_up, error_msg = res if ok and isinstance(res, tuple) else (False, err)
+            if error_msg:
                 Message.err(self, "가입신청 실패", f"오류가 발생했습니다: {error_msg}")
+                return
+
+            # 신청서는 로컬에 저장됐으므로 업로드가 늦어도 스케줄러가 자동 재전송한다.
+            if not ok_up:
+                Message.warn(self, "알림", "서버 업로드가 지연되고 있습니다. 자동으로 재전송됩니다.")
+            Message.info(self, "가입신청 완료", "가입신청이 완료되었습니다.\n사업주 승인 후 로그인 가능합니다.")
+            self.signup_done.emit()
 
         # ✅ 비동기 실행 (로딩창 표시)
         run_job_with_progress_async(
@@ -4,6 +4,9 @@
 # ui/widgets.py
 from PyQt5 import QtWidgets, QtCore
 
+from timeclock.settings import TABLE_SIZE_SAMPLE_ROWS
+from ui.async_helper import QueryService, run_query_async
+
 class DateRangeBar(QtWidgets.QWidget):
     applied = QtCore.pyqtSignal()
 
@@ -122,9 +125,210 @@ class Table(QtWidgets.QTableWidget):
             return -1
         return idxs[0].row()
 
+    def selected_row_indexes(self) -> list:
+        """
+        선택된 모든 행 인덱스를 위→아래 순서로 반환. 선택이 없으면 [].
+        (다중 선택은 setSelectionMode(ExtendedSelection) 으로 켠 테이블에서만 의미 있음)
+        """
+        return sorted(i.row() for i in self.selectionModel().selectedRows())
+
     def get_cell(self, row: int, col: int) -> str:
         """
         (row, col) 셀 텍스트 반환. 비어있으면 "".
         """
         it = self.item(row, col)
         return it.text() if it else ""
+
+
+class RowTableModel(QtCore.QAbstractTableModel):
+    """
+    행 목록(튜플)만 들고 있는 가벼운 테이블 모델.
+    셀 아이템 객체를 만들지 않고, 화면에 보이는 셀만 data() 로 그때그때 그린다.
+    fetch_more 를 주면 스크롤이 끝에 닿을 때 뷰가 fetchMore() 로 다음 페이지를 요청한다.
+      fetch_more() -> (추가 행 목록, 더 있는지 여부, ...)  조회 스레드(run_query_async)에서 실행
+      on_fetched(fetch_more 결과) 는 행을 붙이기 직전 GUI 스레드에서 호출 (호출한 쪽 상태 갱신용)
+    """
+
+    _ALIGN = QtCore.Qt.AlignVCenter | QtCore.Qt.AlignLeft
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._rows = []
+        self._fetch_more = None
+        self._on_fetched = None
+        self._fetching = False
+        self._query_key = f"table.fetch_more.{id(self)}"
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole or role == QtCore.Qt.ToolTipRole:
+            return self._rows[index.row()][index.column()]
+        if role == QtCore.Qt.TextAlignmentRole:
+            return self._ALIGN
+        return None
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role == QtCore.Qt.DisplayRole and orientation == QtCore.Qt.Horizontal:
+            return self._headers[section]
+        return None
+
+    @staticmethod
+    def _pack(rows):
+        return [tuple("" if v is None else str(v) for v in r) for r in rows]
+
+    def set_rows(self, rows, fetch_more=None, on_fetched=None):
+        if self._fetching:
+            QueryService.instance().cancel(self._query_key)  # 이전 목록의 다음 페이지 요청은 버림
+            self._fetching = False
+        self.beginResetModel()
+        self._rows = self._pack(rows)
+        self._fetch_more = fetch_more
+        self._on_fetched = on_fetched
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        return not parent.isValid() and self._fetch_more is not None
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        if parent.isValid() or self._fetch_more is None:
+            return
+        fetch, self._fetch_more = self._fetch_more, None  # 요청 중 중복 호출 방지
+        on_fetched = self._on_fetched
+
+        def on_done(res):
+            self._fetching = False
+            if callable(on_fetched):
+                on_fetched(res)
+            rows = self._pack(res[0])
+            if rows:
+                start = len(self._rows)
+                self.beginInsertRows(QtCore.QModelIndex(), start, start + len(rows) - 1)
+                self._rows.extend(rows)
+                self.endInsertRows()
+            if res[1]:
+                self._fetch_more = fetch
+
+        def on_error(e):
+            self._fetching = False
+            print(f"⚠️ [Table] 다음 페이지 로드 실패: {e}")
+
+        self._fetching = True
+        run_query_async(self._query_key, lambda cancelled: fetch(), on_done, on_error)
+
+    def cell(self, row: int, col: int) -> str:
+        try:
+            return self._rows[row][col]
+        except IndexError:
+            return ""
+
+
+class ModelTable(QtWidgets.QTableView):
+    """
+    Table(QTableWidget) 과 같은 사용법의 모델/뷰 테이블 (대용량 목록용)
+    - set_rows() 는 모델 리셋 1회로 끝나고, 셀은 보이는 부분만 그린다.
+    - 컬럼 폭은 전체 셀이 아니라 표본 행(TABLE_SIZE_SAMPLE_ROWS)만 재서 정한다.
+    - 더블클릭은 QTableWidget 과 같은 이름의 itemDoubleClicked 시그널로도 받을 수 있다. (인자: QModelIndex)
+    """
+
+    itemDoubleClicked = QtCore.pyqtSignal(QtCore.QModelIndex)
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self._model = RowTableModel(headers, self)
+        self.setModel(self._model)
+        self.doubleClicked.connect(self.itemDoubleClicked.emit)
+
+        self.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectRows)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.SingleSelection)
+        self.setEditTriggers(QtWidgets.QAbstractItemView.NoEditTriggers)
+
+        # ✅ UI 가독성 기본값 (Table 과 동일)
+        self.verticalHeader().setVisible(False)
+        self.horizontalHeader().setStretchLastSection(True)
+        self.setWordWrap(False)
+        # noinspection PyUnresolvedReferences
+        self.setTextElideMode(QtCore.Qt.ElideRight)
+
+        # 행 높이 고정 → 행마다 높이를 재지 않음
+        self.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.verticalHeader().setDefaultSectionSize(24)
+        self.setAlternatingRowColors(True)
+        self.setShowGrid(False)
+        self.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.horizontalHeader().setHighlightSections(False)
+        self.setFrameShape(QtWidgets.QFrame.NoFrame)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+
+    def rowCount(self) -> int:
+        return self._model.rowCount()
+
+    def columnCount(self) -> int:
+        return self._model.columnCount()
+
+    def set_rows(self, rows, fetch_more=None, on_fetched=None):
+        """fetch_more / on_fetched: 다음 페이지 함수와 완료 콜백 (RowTableModel 참고). 컬럼 폭은 첫 페이지 기준"""
+        self._model.set_rows(rows, fetch_more, on_fetched)
+        self.apply_default_column_policy()
+
+    def _sample_rows(self):
+        rows = self._model._rows
+        n = len(rows)
+        if n <= TABLE_SIZE_SAMPLE_ROWS:
+            return rows
+        step = n / float(TABLE_SIZE_SAMPLE_ROWS)
+        return [rows[int(i * step)] for i in range(TABLE_SIZE_SAMPLE_ROWS)]
+
+    def apply_default_column_policy(self):
+        """표본 행으로 '내용에 맞춤' 폭을 계산하고, 마지막 컬럼은 늘려서 화면을 채운다."""
+        h = self.horizontalHeader()
+        fm = self.fontMetrics()
+        hfm = h.fontMetrics()
+        pad = 24  # 셀 좌우 여백 (스타일시트 padding 포함 여유)
+
+        sample = self._sample_rows()
+        last = self.columnCount() - 1
+        for c in range(self.columnCount()):
+            if c == last:
+                break
+            w = hfm.horizontalAdvance(str(self._model.headerData(c, QtCore.Qt.Horizontal))) + pad
+            for r in sample:
+                w = max(w, fm.horizontalAdvance(r[c]) + pad)
+            h.setSectionResizeMode(c, QtWidgets.QHeaderView.Interactive)
+            h.resizeSection(c, w)
+
+        h.setSectionResizeMode(last, QtWidgets.QHeaderView.Stretch)
+
+    def set_column_widths(self, width_map: dict):
+        """
+        width_map: {col_index: width_px}
+        """
+        for col, w in width_map.items():
+            self.setColumnWidth(int(col), int(w))
+
+    def selected_first_row_index(self) -> int:
+        """
+        선택된 첫 번째 행 인덱스를 반환. 선택이 없으면 -1.
+        """
+        idxs = self.selectionModel().selectedRows()
+        if not idxs:
+            return -1
+        return idxs[0].row()
+
+    def selected_row_indexes(self) -> list:
+        """
+        선택된 모든 행 인덱스를 위→아래 순서로 반환. 선택이 없으면 [].
+        """
+        return sorted(i.row() for i in self.selectionModel().selectedRows())
+
+    def get_cell(self, row: int, col: int) -> str:
+        """
+        (row, col) 셀 텍스트 반환. 비어있으면 "".
+        """
+        return self._model.cell(row, col)
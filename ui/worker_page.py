@@ -2,16 +2,16 @@
 # -*- coding: utf-8 -*-
 from PyQt5 import QtWidgets, QtCore
 from datetime import datetime
-from timeclock.salary import SalaryCalculator
+from timeclock import payroll
 from timeclock import backup_manager
-from ui.async_helper import run_job_with_progress_async
+from ui.async_helper import run_job_with_progress_async, run_query_async
 
 from timeclock.utils import Message
 from timeclock.settings import WORK_STATUS
-from ui.widgets import DateRangeBar, Table
+from ui.widgets import DateRangeBar, Table, ModelTable
 from ui.dialogs import DisputeTimelineDialog, DateRangeDialog, ConfirmPasswordDialog, ProfileEditDialog
 from ui.dialogs import PersonalInfoDialog
-from timeclock import sync_manager  # [추가] 동기화 모듈 임포트
+from timeclock import sync_scheduler  # [추가] 동기화 스케줄러 임포트
 
 
 class WorkerPage(QtWidgets.QWidget):
@@ -100,7 +100,7 @@ class WorkerPage(QtWidgets.QWidget):
         ctrl_layout.addWidget(self.btn_refresh)
 
         # 테이블 스타일은 widgets.py에서 이미 정의됨
-        self.work_table = Table([
+        self.work_table = ModelTable([
             "ID", "일자", "작업시작(요청)", "퇴근(요청)", "상태",
             "확정 시작", "확정 종료", "관리자 승인/비고"
         ])
@@ -197,13 +197,10 @@ class WorkerPage(QtWidgets.QWidget):
 
             if msg_box.clickedButton() == btn_yes:
                 # ✅ [핵심 추가] 저장 전에 서버 최신 데이터를 가져와 동기화 상태를 맞춥니다.
-                self.db.close_connection()
                 try:
-                    sync_manager.download_latest_db()
+                    self.db.sync_from_cloud()
                 except Exception as e:
                     print(f"[Sync before Start] {e}")
-                finally:
-                    self.db.reconnect()
 
                 # 1. [로컬 저장]
                 try:
@@ -224,13 +221,10 @@ class WorkerPage(QtWidgets.QWidget):
         elif mode == "OUT":
             if Message.confirm(self, "퇴근 요청", "작업을 모두 마치고 퇴근 승인을 요청하시겠습니까?"):
                 # ✅ [핵심 추가] 저장 전에 서버 최신 데이터를 가져옵니다.
-                self.db.close_connection()
                 try:
-                    sync_manager.download_latest_db()
+                    self.db.sync_from_cloud()
                 except Exception as e:
                     print(f"[Sync before End] {e}")
-                finally:
-                    self.db.reconnect()
 
                 # 1. [로컬 저장]
                 try:
@@ -252,25 +246,18 @@ class WorkerPage(QtWidgets.QWidget):
 
     def sync_and_refresh(self):
         """
-        [새로고침 버튼] DB 연결 해제 -> 최신 파일 다운로드 -> DB 재연결 -> 화면 갱신
+        [새로고침 버튼] 최신 데이터 반영 -> 화면 갱신
         """
         print("🔄 근로자 데이터 동기화 시작...")
 
-        # 1. DB 연결 잠시 해제 (파일 잠금 방지)
-        self.db.close_connection()
-
         def job_fn(progress_callback):
             progress_callback({"msg": "☁️ 최신 데이터 가져오는 중..."})
-            ok, msg = sync_manager.download_latest_db()
+            ok, msg = self.db.sync_from_cloud()
             return ok, msg
 
         def on_done(ok, res, err):
-            # 2. 작업 후 DB 재연결
-            print("🔌 DB 재연결...")
-            self.db.reconnect()
-
             if ok:
-                # 3. 화면 갱신
+                # 화면 갱신
                 self.refresh()
                 self.refresh_my_disputes()
                 self._update_action_button()
@@ -288,55 +275,71 @@ class WorkerPage(QtWidgets.QWidget):
 
     def refresh(self):
         d1, d2 = self.filter.get_range()
-        rows = self.db.list_work_logs(self.session.user_id, d1, d2)
-
-        out = []
-        for r in rows:
-            rr = dict(r)
-            st = rr["status"]
-            status_str = WORK_STATUS.get(st, st)
-
-            out.append([
-                str(rr["id"]),
-                rr["work_date"],
-                rr["start_time"] or "",
-                rr["end_time"] or "",
-                status_str,
-                rr["approved_start"] or "",
-                rr["approved_end"] or "",
-                rr["owner_comment"] or ""
-            ])
-
-        self.work_table.set_rows(out)
-        self._update_action_button()
+        db, user_id = self.db, self.session.user_id
+
+        def job(cancelled):
+            rows = db.list_work_logs(user_id, d1, d2)
+
+            out = []
+            for r in rows:
+                rr = dict(r)
+                st = rr["status"]
+                status_str = WORK_STATUS.get(st, st)
+
+                out.append([
+                    str(rr["id"]),
+                    rr["work_date"],
+                    rr["start_time"] or "",
+                    rr["end_time"] or "",
+                    status_str,
+                    rr["approved_start"] or "",
+                    rr["approved_end"] or "",
+                    rr["owner_comment"] or ""
+                ])
+            return out
+
+        def on_done(out):
+            self.work_table.set_rows(out)
+            self._update_action_button()
+
+        run_query_async("worker.work_logs", job, on_done,
+                        lambda e: Message.err(self, "오류", f"근무 기록 조회 실패: {e}"))
 
     def refresh_my_disputes(self):
         d1, d2 = self.filter_disputes.get_range()
         filter_type = self.cb_dispute_filter.currentData()
-
-        rows = self.db.list_my_disputes(self.session.user_id, d1, d2, filter_type)
-        self._my_dispute_rows = rows
-
-        out = []
-        for r in rows:
-            rr = dict(r)
-            d_st = rr["status"]
-            st_map = {"PENDING": "미처리", "IN_REVIEW": "검토중", "RESOLVED": "완료", "REJECTED": "기각"}
-            d_st_str = st_map.get(d_st, d_st)
-
-            summary = (rr["comment"] or "").replace("\n", " ")
-            if len(summary) > 30: summary = summary[:30] + "..."
-
-            out.append([
-                str(rr["id"]),
-                rr["work_date"],
-                rr["dispute_type"],
-                d_st_str,
-                summary,
-                rr["created_at"]
-            ])
-
-        self.dispute_table.set_rows(out)
+        db, user_id = self.db, self.session.user_id
+
+        def job(cancelled):
+            rows = db.list_my_disputes(user_id, d1, d2, filter_type)
+
+            out = []
+            for r in rows:
+                rr = dict(r)
+                d_st = rr["status"]
+                st_map = {"PENDING": "미처리", "IN_REVIEW": "검토중", "RESOLVED": "완료", "REJECTED": "기각"}
+                d_st_str = st_map.get(d_st, d_st)
+
+                summary = (rr["comment"] or "").replace("\n", " ")
+                if len(summary) > 30: summary = summary[:30] + "..."
+
+                out.append([
+                    str(rr["id"]),
+                    rr["work_date"],
+                    rr["dispute_type"],
+                    d_st_str,
+                    summary,
+                    rr["created_at"]
+                ])
+            return rows, out
+
+        def on_done(res):
+            rows, out = res
+            self._my_dispute_rows = rows
+            self.dispute_table.set_rows(out)
+
+        run_query_async("worker.disputes", job, on_done,
+                        lambda e: Message.err(self, "오류", f"이의제기 조회 실패: {e}"))
 
     def _wire_double_click(self):
         try:
@@ -350,13 +353,10 @@ class WorkerPage(QtWidgets.QWidget):
 
     def open_dispute_chat(self):
         # [Sync] 대화방 열기 전 최신 DB 받기
-        self.db.close_connection()
         try:
-            sync_manager.download_latest_db()
+            self.db.sync_from_cloud()
         except Exception:
             pass
-        finally:
-            self.db.reconnect()
 
         row = self.dispute_table.selected_first_row_index()
         dispute_id = None
@@ -403,13 +403,10 @@ class WorkerPage(QtWidgets.QWidget):
 
                     def job_fn(progress_callback):
                         # DB 잠금 방지: 작업 전 최신 다운로드
-                        self.db.close_connection()
                         try:
-                            sync_manager.download_latest_db()
+                            self.db.sync_from_cloud()
                         except Exception:
                             pass
-                        finally:
-                            self.db.reconnect()
 
                         # ✅ [수정] worker_id를 user_id로 변경 (DB.create_dispute 인자명 일치)
                         dispute_id_local = self.db.create_dispute(
@@ -419,8 +416,9 @@ class WorkerPage(QtWidgets.QWidget):
                             comment=initial_msg
                         )
 
-                        # 업로드
-                        ok_up = sync_manager.upload_current_db()
+                        # 업로드: 사업주가 바로 볼 수 있도록 즉시 전송
+                        sync_scheduler.notify(self.db, "dispute_create")
+                        ok_up = sync_scheduler.flush()
                         return dispute_id_local, ok_up
 
                     def on_done(ok, res, err):
@@ -430,7 +428,7 @@ class WorkerPage(QtWidgets.QWidget):
 
                         dispute_id_local, ok_up = res
                         if not ok_up:
-                            Message.warn(self, "알림", "서버 업로드가 실패했습니다. 채팅창에서 재전송될 수 있습니다.")
+                            Message.warn(self, "알림", "서버 업로드가 지연되고 있습니다. 자동으로 재전송됩니다.")
 
                         self.refresh_my_disputes()
 
@@ -489,18 +487,10 @@ class WorkerPage(QtWidgets.QWidget):
             Message.err(self, "오류", "날짜 형식이 올바르지 않습니다.")
             return
 
-        logs = self.db.list_all_work_logs(self.session.user_id, d1, d2, status_filter='APPROVED')
-
-        if not logs:
-            Message.info(self, "조회 결과", "해당 기간에 확정(승인)된 근무 기록이 없습니다.\n(아직 승인 대기 중인 기록은 계산에 포함되지 않습니다.)")
-            return
-
-        log_dicts = [dict(r) for r in logs]
-        calc = SalaryCalculator(wage_per_hour=hourly_wage)
-        res = calc.calculate_period(log_dicts)
+        res = payroll.calculate_user_period(self.db, self.session.user_id, hourly_wage, d1, d2)
 
         if not res:
-            Message.info(self, "결과", "계산할 데이터가 없습니다.")
+            Message.info(self, "조회 결과", "해당 기간에 확정(승인)된 근무 기록이 없습니다.\n(아직 승인 대기 중인 기록은 계산에 포함되지 않습니다.)")
             return
 
         final_pay = res['grand_total']
@@ -527,13 +517,10 @@ class WorkerPage(QtWidgets.QWidget):
 
     def open_profile_settings(self):
         # 1. [다운로드] 변경 전 최신 정보 가져오기
-        self.db.close_connection()
         try:
-            sync_manager.download_latest_db()
+            self.db.sync_from_cloud()
         except Exception as e:
             print(f"[Sync Error] {e}")
-        finally:
-            self.db.reconnect()
 
         # 2. [다이얼로그 실행]
         # ProfileEditDialog 내부에서 'update_user_profile'을 호출하면
@@ -566,24 +553,18 @@ class WorkerPage(QtWidgets.QWidget):
     def process_async_action(self, action_func, success_callback=None):
         """
         [공통 해결사]
-        1. DB 잠금 해제 -> 2. 로딩창 띄우고 업로드 -> 3. DB 재연결 -> 4. 다음 작업 실행
+        1. 로딩창 띄우고 업로드 -> 2. 다음 작업 실행
+        (로컬 저장은 이미 커밋된 상태이므로 DB 연결은 그대로 둔다)
         """
-        # 1. 일단 로컬 DB에 저장된 내용을 확정짓기 위해 연결을 끊습니다.
-        print("💾 데이터 패키징 중 (Close)...")
-        self.db.close_connection()
-
-        # 2. 비동기 작업 정의 (업로드)
+        # 1. 비동기 작업 정의 (업로드)
         def job_fn(progress_callback):
             progress_callback({"msg": "☁️ 서버에 데이터 전송 중..."})
-            ok = sync_manager.upload_current_db()
-            return ok, "업로드 완료"
+            sync_scheduler.notify(self.db, "worker_action")
+            return sync_scheduler.flush()
 
-        # 3. 완료 후 처리 (재연결 -> 콜백 실행)
+        # 2. 완료 후 처리 (콜백 실행, ok 는 예외 없이 끝났는지 / res 는 업로드 성공 여부)
         def on_done(ok, res, err):
-            print("🔌 DB 재연결...")
-            self.db.reconnect()  # 👈 [중요] 여기서 문을 다시 열어줍니다! (튕김 해결)
-
-            if ok:
+            if ok and res:
                 if success_callback:
                     success_callback()  # 다음 작업(예: 채팅방 열기) 실행
                 self.refresh()